@@ -45,28 +45,37 @@
 This is the main module of the application, it connects everything into complete program -
 PyQtAccounts.
 """
-import signal
-
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
-
-from core import keyboard
-from core.testutils import QWidget
-import sys
-import os
-import setproctitle
-import time
+# profiler must be imported first, so it counts time of all other imports
+from core.profiler import profiler
 
-from core.db_forms import *
-from core.account_forms import *
-from core.utils import *
-from core.widgets import *
-from core.windows import *
-from core.updates import *
+import signal
 
-from core.const import *
-import core.const
+with profiler.phase("imports"):
+    from PyQt5.QtWidgets import *
+    from PyQt5.QtCore import *
+    from PyQt5.QtGui import *
+
+# keyboard module connects to X server when it's imported
+with profiler.phase("x connection"):
+    from core import keyboard
+
+with profiler.phase("imports"):
+    from core.testutils import QWidget
+    import sys
+    import os
+    import setproctitle
+    import time
+    from functools import cached_property
+
+    from core.db_forms import *
+    from core.account_forms import *
+    from core.utils import *
+    from core.widgets import *
+    from core.windows import *
+    from core.updates import *
+
+    from core.const import *
+    import core.const
 
 SRC_DIR = core.const.SRC_DIR
 
@@ -101,9 +110,15 @@ class Window(QMainWindow):
         self.windows = windows
         self.res = None
 
+        # here we load list of databases, databases of older versions (.db and .bin files) we
+        # migrate to .dba files
+        with profiler.phase("databases"):
+            registry.migrate()
+            has_dbs = bool(registry)
+
         # here we create all tips
         helpTip = HelpTip(HELP_TIP_DB)
-        if getDbList():
+        if has_dbs:
             helpTip = HelpTip("Виберіть базу данних")
         helpTip.show()
 
@@ -123,41 +138,42 @@ class Window(QMainWindow):
             "delete": deleteTip,
         }
 
-        # and here we create all forms
-        create_db_form = CreateDbForm(helpTip, parent=self)
-        open_db_form = OpenDbForm(helpTip, windows, parent=self)
-        edit_db_form = EditDbForm(tips, windows, parent=self)
-
-        forms = {"create": create_db_form, "edit": edit_db_form, "open": open_db_form}
+        # and here are all forms, they are created only when user needs them for the first time
+        # (see LazyForms)
+        forms = LazyForms(
+            {
+                "create": lambda: CreateDbForm(helpTip, parent=self),
+                "edit": lambda: EditDbForm(tips, windows, parent=self),
+                "open": lambda: OpenDbForm(helpTip, windows, parent=self),
+                "unlock": lambda: UnlockDbsForm(helpTip, windows, parent=self),
+            }
+        )
 
-        # settings
-        sets = QSettings(f'{os.getenv("HOME")}/PyTools', "PyQtAccounts")
+        # settings, here we also obtain the main database feature settings
+        with profiler.phase("settings"):
+            sets = QSettings(f'{os.getenv("HOME")}/PyTools', "PyQtAccounts")
+            list_width = sets.value("advanced/list_width", 200, type=int)
+            is_main_db = sets.value("advanced/is_main_db", False, type=bool)
+            main_db = sets.value("advanced/main_db", "", type=str)
 
         # here we instantiate Dbs class and add it to splitter which will split Dbs and forms
         dbs = Dbs(forms, windows, tips)
-        list_width = sets.value("advanced/list_width", 200, type=int)
         dbs.setMaximumWidth(list_width)
 
         splitter = QSplitter()
         for tip in tips:
             splitter.addWidget(tips[tip])
 
-        for form in forms:
-            splitter.addWidget(forms[form])
-
         splitter.addWidget(dbs)
         self.dbs = dbs
-
-        # here we obtain the main database feature settings
-        is_main_db = sets.value("advanced/is_main_db", False, type=bool)
-        main_db = sets.value("advanced/main_db", "", type=str)
+        self.splitter = splitter
+        forms.setup(self.setupForm)
 
         # if user has main database feature turned on we auto select main database
-        if is_main_db and main_db in getDbList():
+        if is_main_db and main_db in registry:
             self.dbs.list.selected(Index(main_db))
 
-        # here we create about dialog and menu bar of the main window
-        self.about = About()
+        # here we create menu bar of the main window
         menuBar = AppMenuBar(self)
         self.setMenuBar(menuBar)
         self.setCentralWidget(splitter)
@@ -176,8 +192,35 @@ class Window(QMainWindow):
         thread.started.connect(updating.run)
         thread.start()
 
-        # here we create settings dialog
-        self.settings = Settings(self)
+        # here we keep checking process, otherwise it would be garbage collected before thread
+        # runs it
+        self._thread = thread
+        self.updating = updating
+
+    @cached_property
+    def about(self):
+        """
+        This is about dialog, we create it when user opens it for the first time, because it
+        reads license and credits and runs git to get version.
+        """
+        return About()
+
+    @cached_property
+    def settings(self):
+        """
+        This is settings dialog, we create it when user opens it for the first time.
+        """
+        return Settings(self)
+
+    def setupForm(self, name, form):
+        """
+        This method places database form near database list when form is created.
+        :param name:
+        name of the form
+        :param form:
+        the form
+        """
+        self.splitter.insertWidget(self.splitter.indexOf(self.dbs), form)
 
     def closeEvent(self, event):
         """
@@ -262,7 +305,9 @@ def main():
 
     # here we check whether all dependencies are installed, if not we show warning
     for req in sys_reqs:
-        if os.system(f"which {req}"):
+        with profiler.phase("requirements"):
+            missing = os.system(f"which {req}")
+        if missing:
             return WarningWindow(
                 """
                 <h3>Не всі пакети встановлено!</h3>
@@ -278,9 +323,11 @@ def main():
     try:
         # here we create application window, if any errors occur during lifetime of the program
         # we will catch them below
-        import git
+        with profiler.phase("imports"):
+            import git
 
-        window = Window()
+        with profiler.phase("widgets"):
+            window = Window()
     except ImportError as err:
         # if we caught import error it means that not all dependencies are satisfied
         # so we show error message and give user proper advice about how to install dependencies
@@ -309,10 +356,15 @@ def main():
             raise
 
 
-# here we create application instance and set proper font size, because by default it might be small
-app = QApplication(sys.argv)
-app.setStyleSheet(
-    """
+# fork server of the process pool that opens databases (see core.getaki.unlockDatabases) imports
+# this module as __mp_main__, it doesn't need application
+if __name__ != "__mp_main__":
+    # here we create application instance and set proper font size, because by default it might
+    # be small
+    with profiler.phase("application"):
+        app = QApplication(sys.argv)
+    app.setStyleSheet(
+        """
 *{
     font-size: 24px;
 }
@@ -321,9 +373,9 @@ QLineEdit, QLabel, QLineEdit{
     font-family: Ubuntu Mono, Ubuntu;
 }
 """
-)
-# also above we set monospace font for all line edit fields, so user could read passwords from them
-# easily
+    )
+    # also above we set monospace font for all line edit fields, so user could read passwords
+    # from them easily
 
 if __name__ == "__main__":
     # here we check whether user runs PyQtAccounts under sudo
@@ -348,4 +400,10 @@ if __name__ == "__main__":
     timer.timeout.connect(lambda: None)
 
     main()
+
+    # if profiler is on we write trace when event loop starts (i.e. when startup is over), and
+    # on exit again, so it has phases that run in other threads too (e.g. checking for updates)
+    if profiler.enabled:
+        QTimer.singleShot(0, lambda: (profiler.mark("event loop"), profiler.write()))
+        app.aboutToQuit.connect(profiler.write)
     sys.exit(app.exec_())
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+"""
+This script measures how fast databases are serialized, saved and opened in every
+serialization format we have.
+It also measures how long it takes to build database window after database is opened, and
+latency of search in all opened databases (a dozen of databases with 10k accounts each by
+default), how much faster several databases are opened at once than one by one and
+throughput of every cipher compared to fernet (that older versions used) for databases from
+1 MB up to 500 MB, how much memory opening of a big database takes and how long cold start of
+PyQtAccounts takes.
+Run it from the root of the repository:
+`python3 benchmark.py [number of accounts] [number of databases to search in] [max size, MB]`
+"""
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import core.akidump as akidump
+import core.const
+from core.getaki import (
+    CIPHERS,
+    PBKDF2,
+    Key,
+    KdfParams,
+    calibrateKdf,
+    deriveKey,
+    newDatabase,
+    openDatabase,
+    readStream,
+    saveDatabase,
+    unlockDatabases,
+    writeStream,
+)
+from core.profiler import OPTION
+from core.search import GlobalSearch, SearchIndex
+from core.windows import DbWindow
+
+from cryptography.fernet import Fernet
+from PyQt5.QtWidgets import QApplication
+
+# latency budgets of search in all opened databases, in seconds: the first search builds
+# indexes of all databases, typing in search field must feel instant, and index update after
+# change of an account must not be noticeable
+BUILD_BUDGET = 10
+QUERY_BUDGET = 0.05
+UPDATE_BUDGET = 0.001
+
+# cold start of PyQtAccounts (from the very first import until event loop starts) must not take
+# longer than this many seconds
+STARTUP_BUDGET = 3
+
+# this script launches PyQtAccounts with given `src` folder and without checking for updates,
+# which fetches from the network
+STARTUP_SCRIPT = """
+import runpy
+import sys
+
+src = sys.argv.pop(1)
+sys.argv[0] = "PyQtAccounts.py"
+
+# profiler must be imported first, so it counts time of all other imports
+import core.profiler
+import core.const
+
+core.const.SRC_DIR = src
+
+from core.updates import Updating
+
+Updating.run = lambda self: self.result.emit(False, [])
+runpy.run_path("PyQtAccounts.py", run_name="__main__")
+"""
+
+# this script opens database in given `src` folder and prints max RSS of the process (in KiB)
+# before and after that, so memory of other benchmarks doesn't count, we read VmHWM because
+# unlike ru_maxrss it isn't inherited from the parent process
+MEMORY_SCRIPT = """
+import sys
+
+import core.const
+
+core.const.SRC_DIR = sys.argv[1]
+
+from core.getaki import openDatabase
+
+
+def maxRss():
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+
+
+before = maxRss()
+db = openDatabase("benchmark", b"password")
+print(before, maxRss())
+"""
+
+# sizes of databases (in MB) which we measure throughput of ciphers with
+SIZES = (1, 10, 100, 500)
+
+
+def createDatabase(count, files=True):
+    """
+    This function creates database with given number of accounts, every tenth account has
+    an attached file (if `files` is True).
+    """
+    db = {}
+    for i in range(count):
+        attached = files and i % 10 == 0
+        files_ = {f"file{i}.txt": os.urandom(4096)} if attached else {}
+        db[f"account{i}"] = akidump.Account(
+            f"account{i}",
+            f"name{i}",
+            f"email{i}@gmail.com",
+            os.urandom(12).hex().encode(),
+            "01.01.2021",
+            "Some comment about the account.",
+            True,
+            files_,
+        )
+    return db
+
+
+def measure(function, *args):
+    """
+    This function calls given function with given arguments and returns its result and time
+    it took in seconds.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def profileStartup(folder, timeout=30):
+    """
+    This function launches PyQtAccounts in new process with startup profiler turned on and
+    returns its trace, program uses given folder as home folder (so it doesn't touch settings of
+    user) and as parent of `src` folder, and doesn't check for updates.
+    :param folder:
+    path to temporary folder
+    :param timeout:
+    how many seconds we wait for program to start
+    :return:
+    trace of the startup (see core.profiler) or None if program didn't start in time
+    """
+    src = os.path.join(folder, "src")
+    os.makedirs(src, exist_ok=True)
+    path = os.path.join(folder, "startup-trace.json")
+
+    # program must really start, so we don't tell it that it's under test
+    env = dict(os.environ, HOME=folder)
+    env.pop("TESTING", None)
+    process = subprocess.Popen(
+        [sys.executable, "-c", STARTUP_SCRIPT, src, f"{OPTION}={path}"], env=env
+    )
+
+    # profiler writes trace as soon as event loop starts
+    try:
+        deadline = time.time() + timeout
+        while not os.path.exists(path) and time.time() < deadline:
+            time.sleep(0.1)
+    finally:
+        process.terminate()
+        process.wait()
+
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def benchmarkStartup():
+    """
+    This function measures how long cold start of PyQtAccounts takes and how long every its
+    phase takes.
+    """
+    folder = tempfile.mkdtemp()
+    try:
+        trace = profileStartup(folder)
+    finally:
+        shutil.rmtree(folder)
+
+    print(f"\n{'startup phase':<24}{'time, s':>12}{'budget, s':>12}")
+    if trace is None:
+        print("PyQtAccounts didn't start!")
+        return
+
+    for phase, seconds in trace["phases"].items():
+        print(f"{phase:<24}{seconds:>12.3f}")
+    total = trace["total"]
+    mark = "" if total <= STARTUP_BUDGET else "  over budget!"
+    print(f"{'total':<24}{total:>12.3f}{STARTUP_BUDGET:>12.3f}{mark}")
+
+
+def benchmarkWindow(count):
+    """
+    This function measures how long it takes to build database window, user waits for it after
+    database is decrypted.
+    :param count:
+    number of accounts in database
+    """
+    app = QApplication.instance() or QApplication(sys.argv)
+    # first is the main window
+    windows = [SimpleNamespace(name="", settings=None)]
+    key = Key(b"password", os.urandom(16))
+
+    print(f"\n{'database window':<24}{'time, s':>12}")
+    for db in ({}, createDatabase(count, files=False)):
+        window, seconds = measure(DbWindow, windows, "benchmark", db, b"password", key)
+        print(f"{f'{len(db)} accounts':<24}{seconds:>12.4f}")
+        app.processEvents()
+
+
+def benchmarkSearch(vaults, count):
+    """
+    This function measures latency of search in all opened databases.
+    :param vaults:
+    number of opened databases
+    :param count:
+    number of accounts in every database
+    """
+    # first is the main window
+    windows = [SimpleNamespace(name="")]
+    for i in range(vaults):
+        db = createDatabase(count, files=False)
+        windows.append(
+            SimpleNamespace(name=f"database{i}", db=db, search=SearchIndex(db))
+        )
+    search = GlobalSearch(windows)
+
+    print(f"\nsearch in {vaults} databases with {count} accounts each")
+    print(f"{'operation':<24}{'time, s':>12}{'budget, s':>12}")
+
+    def report(operation, seconds, budget):
+        mark = "" if seconds <= budget else "  over budget!"
+        print(f"{operation:<24}{seconds:>12.4f}{budget:>12.4f}{mark}")
+
+    _, seconds = measure(search.search, "account1")
+    report("first search (build)", seconds, BUILD_BUDGET)
+
+    # here we measure queries that are typed one character after another, every of them is
+    # new so cache doesn't help
+    for query in ("a", "ac", "acc", "account12", "name345", "gmail.com", "acount99"):
+        _, seconds = measure(search.search, query)
+        report(f"query `{query}`", seconds, QUERY_BUDGET)
+
+    # and here we change an account in one of databases
+    window = windows[1]
+    window.db["account1"].comment = "Changed comment."
+    _, seconds = measure(window.search.update, window.db, ["account1"])
+    report("update of account", seconds, UPDATE_BUDGET)
+    _, seconds = measure(search.search, "account12")
+    report("query after update", seconds, QUERY_BUDGET)
+
+
+def benchmarkUnlock(vaults, count):
+    """
+    This function measures how long it takes to open several databases one by one and all of
+    them at once (see unlockDatabases).
+    :param vaults:
+    number of databases
+    :param count:
+    number of accounts in every database
+    """
+    folder = tempfile.mkdtemp()
+    src = core.const.SRC_DIR
+    core.const.SRC_DIR = folder
+    try:
+        # all databases are created with key derivation calibrated for this machine
+        params = calibrateKdf()
+        db = createDatabase(count, files=False)
+        names = [f"database{i}" for i in range(vaults)]
+        for name in names:
+            newDatabase(
+                name, b"password", deriveKey(b"password", os.urandom(16), params), db
+            )
+
+        print(f"\nopening of {vaults} databases with {count} accounts each")
+        print(f"{'operation':<24}{'time, s':>12}")
+        _, serial = measure(lambda: [openDatabase(name, b"password") for name in names])
+        print(f"{'one by one':<24}{serial:>12.3f}")
+        _, parallel = measure(lambda: list(unlockDatabases(names, [b"password"])))
+        print(f"{'at once':<24}{parallel:>12.3f}")
+        print(f"speedup {serial / parallel:.1f}x on {os.cpu_count()} cores")
+    finally:
+        core.const.SRC_DIR = src
+        shutil.rmtree(folder)
+
+
+def benchmarkMemory(count):
+    """
+    This function measures peak memory that opening of database takes compared to the size of
+    its .dba file, both traced by tracemalloc and max RSS of a fresh process.
+    :param count:
+    number of accounts in database
+    """
+    folder = tempfile.mkdtemp()
+    src = core.const.SRC_DIR
+    core.const.SRC_DIR = folder
+    try:
+        # here we use cheap key derivation, we measure only decryption and deserialization
+        key = deriveKey(b"password", os.urandom(16), KdfParams(PBKDF2, 1000))
+        db = createDatabase(count, files=False)
+        for account in db.values():
+            account.comment *= 30
+        saveDatabase("benchmark", db, key)
+        size = os.path.getsize(f"{folder}/benchmark.dba") / 2**20
+        del db
+
+        tracemalloc.start()
+        db = openDatabase("benchmark", key)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"\nopening of {count} accounts ({size:.1f} MB)")
+        print(f"{'peak memory, MB':<24}{peak / 2**20:>12.1f}")
+        print(f"{'database in memory, MB':<24}{current / 2**20:>12.1f}")
+
+        output = subprocess.run(
+            [sys.executable, "-c", MEMORY_SCRIPT, folder],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        before, after = map(int, output.split())
+        print(f"{'max RSS growth, MB':<24}{(after - before) / 2**10:>12.1f}")
+    finally:
+        core.const.SRC_DIR = src
+        shutil.rmtree(folder)
+
+
+def benchmarkCiphers(limit):
+    """
+    This function measures how fast databases of different sizes are saved (encrypted) and
+    opened (decrypted) with every cipher and with fernet.
+    :param limit:
+    maximal size of database, in MB
+    """
+    print(
+        f"\n{'cipher':<20}{'size, MB':>10}{'file, MB':>10}{'save, MB/s':>12}{'open, MB/s':>12}"
+    )
+
+    def report(name, size, file, save, open_):
+        print(
+            f"{name:<20}{size:>10}{file / 2**20:>10.1f}{size / save:>12.0f}"
+            f"{size / open_:>12.0f}"
+        )
+
+    for size in (size for size in SIZES if size <= limit):
+        data = os.urandom(size * 2**20)
+
+        # fernet encrypts the whole database at once and encodes it with base64
+        fernet = Fernet(Fernet.generate_key())
+        token, save = measure(fernet.encrypt, data)
+        _, open_ = measure(fernet.decrypt, token)
+        report("Fernet", size, len(token), save, open_)
+        del token
+
+        for cipher in CIPHERS:
+            key = Key.restore(os.urandom(32), os.urandom(16), None, cipher)
+
+            def save_():
+                file = io.BytesIO()
+                writeStream(file, key, data)
+                return file
+
+            file, save = measure(save_)
+            file.seek(0)
+            _, open_ = measure(readStream, file, key)
+            report(CIPHERS[cipher].name, size, len(file.getbuffer()), save, open_)
+            del file
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    vaults = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    db = createDatabase(count)
+    key = Key(b"password", os.urandom(16))
+
+    print(f"{count} accounts")
+    print(
+        f"{'format':<10}{'size, KiB':>12}{'dumps, s':>12}{'loads, s':>12}"
+        f"{'save, s':>12}{'open, s':>12}"
+    )
+    for name, serializer in akidump.SERIALIZERS.items():
+        data, dumps_time = measure(serializer.dumps, db)
+        loaded, loads_time = measure(akidump.loads, data)
+        assert loaded == db
+
+        # here we measure the whole save and open path, i.e. serialization and encryption
+        def save():
+            file = io.BytesIO()
+            writeStream(file, key, akidump.dumps(db, name))
+            return file
+
+        def open_():
+            file.seek(0)
+            return akidump.loads(readStream(file, key))
+
+        file, save_time = measure(save)
+        _, open_time = measure(open_)
+        print(
+            f"{name:<10}{len(data) / 1024:>12.0f}{dumps_time:>12.3f}{loads_time:>12.3f}"
+            f"{save_time:>12.3f}{open_time:>12.3f}"
+        )
+
+    benchmarkStartup()
+    benchmarkWindow(count)
+    benchmarkSearch(vaults, count)
+    benchmarkUnlock(vaults, count)
+    benchmarkMemory(count * 5)
+    benchmarkCiphers(int(sys.argv[3]) if len(sys.argv) > 3 else SIZES[-1])
+
+
+if __name__ == "__main__":
+    main()
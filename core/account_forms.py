@@ -46,6 +46,7 @@ import core.akidump as akidump
 from core.const import *
 from core.forms import *
 from core.widgets import *
+from core.getaki import loadBlob
 
 # This is mostly for testing
 SRC_DIR = core.const.SRC_DIR
@@ -56,7 +57,7 @@ class CreateAccount(CreateForm):
     This is a superclass which specifies CreateForm class to account forms needs.
     """
 
-    def __init__(self, title, db, helpTip, parent=None):
+    def __init__(self, title, db, helpTip, parent=None, names=None):
         """
         This constructor creates the form specifying all widgets parameters.
         :param title:
@@ -68,6 +69,9 @@ class CreateAccount(CreateForm):
         Tip that will be displayed when form is hidden.
         :param parent:
         The parent of the form.
+        :param names:
+        index of account names of the database (NameIndex) that database window shares between
+        account forms, if it isn't given form creates its own.
         """
         namePlaceholder = "ім'я акаунта"
         nameTip = ""  # there is no name characters validation for account names.
@@ -82,6 +86,15 @@ class CreateAccount(CreateForm):
         self.hide()
         self.db = db
 
+        # this is index of account names of the database
+        self.names = names if names is not None else NameIndex(db)
+
+        # warning that there is account with similar name (e.g. `Gmail` and `gmail`), unlike
+        # name error it doesn't prevent user from saving account
+        self.similarWarning = Warn()
+        self.similarWarning.hide()
+        self.errors.layout().addWidget(self.similarWarning)
+
         # Account create form needs more fields
         # here we create label and field for
         # account name (account name and nickname aren't same things!), e-mail, date of birth
@@ -176,6 +189,21 @@ class CreateAccount(CreateForm):
         self.mainLayout.addWidget(self.scrollArea)
         self.setLayout(self.mainLayout)
 
+    def checkSimilar(self, name, exclude=None):
+        """
+        This method shows warning if there is account with name similar to `name`.
+        :param name:
+        account name entered in the form
+        :param exclude:
+        name of the account being edited
+        """
+        similar = self.names.similar(name, exclude)
+        if similar is None:
+            self.similarWarning.hide()
+            return
+        self.similarWarning.setText(f"Є схожий акаунт: {similar}")
+        self.similarWarning.show()
+
     def clear(self):
         """
         This method called when we hide form, to clean up all fields.
@@ -295,7 +323,7 @@ class CreateAccountForm(CreateAccount):
     We use this class for creating account.
     """
 
-    def __init__(self, db, helpTip, parent=None):
+    def __init__(self, db, helpTip, parent=None, names=None):
         """
         This constructor creates the form specifying title parameter, everything else it
         inherits from CreateAccount superclass.
@@ -305,16 +333,20 @@ class CreateAccountForm(CreateAccount):
         Tip that will be displayed when form is hidden.
         :param parent:
         The parent of the form.
+        :param names:
+        index of account names of the database (NameIndex) that database window shares between
+        account forms, if it isn't given form creates its own.
         """
         title = "Створити акаунт"
-        CreateAccount.__init__(self, title, db, helpTip, parent)
+        CreateAccount.__init__(self, title, db, helpTip, parent, names)
 
     def validateName(self, event):
         """
         This method validates whether name entered in the field and is it unique.
         """
         name = self.accountInput.text()
-        if name in getAkiList(self.db):
+        self.checkSimilar(name)
+        if name in self.names:
             self.nameError.show()
             self.createButton.setEnabled(False)
             self.createButton.setStyleSheet(APPLY_BUTTON_DISABLED)
@@ -371,6 +403,7 @@ class CreateAccountForm(CreateAccount):
             attached_files,
         )
         self.db[accountname] = account
+        self.window().changed(accountname)
         self.clear()
 
         # Here we update accounts list, hide form and show help tip
@@ -378,11 +411,6 @@ class CreateAccountForm(CreateAccount):
         self.clear()
         self.tips["help"].setText("Виберіть акаунт")
 
-        # also here we update completion of the form because we created new
-        # account
-        set_form_completers(self, self.db)
-        set_form_completers(self.forms["edit"], self.db)
-
 
 class EditAccountForm(CreateAccount):
     """
@@ -390,7 +418,7 @@ class EditAccountForm(CreateAccount):
     We use this class for editing account.
     """
 
-    def __init__(self, db, helpTip):
+    def __init__(self, db, helpTip, names=None):
         """
         This constructor creates the form specifying title parameter, adds `Delete` button
         and changes create buttons text to `Save`, everything else it inherits from CreateAccount
@@ -399,9 +427,12 @@ class EditAccountForm(CreateAccount):
         Database where we will save account once we create one.
         :param helpTip:
         Tip that will be displayed when form is hidden.
+        :param names:
+        index of account names of the database (NameIndex) that database window shares between
+        account forms, if it isn't given form creates its own.
         """
         title = "Редагувати акаунт"
-        CreateAccount.__init__(self, title, db, helpTip)
+        CreateAccount.__init__(self, title, db, helpTip, names=names)
         self.createButton.setText("Зберегти")
         self.deleteButton = GTKButton(DELETE_BUTTON, "Видалити")
         self.deleteButton.clicked.connect(self.delete)
@@ -413,7 +444,8 @@ class EditAccountForm(CreateAccount):
         the name didn't changed it's okay!).
         """
         name = self.accountInput.text()
-        if name in getAkiList(self.db) and name != self.account.account:
+        self.checkSimilar(name, self.account.account)
+        if name in self.names and name != self.account.account:
             self.nameError.show()
             self.createButton.setEnabled(False)
             self.createButton.setStyleSheet(APPLY_BUTTON_DISABLED)
@@ -455,13 +487,14 @@ class EditAccountForm(CreateAccount):
         # If users answer is `Yes` we delete account
         if action == QMessageBox.Yes:
             del self.db[self.account.account]
+            self.window().changed(self.account.account)
 
             # and we delete it form accounts list
             self.remove_item(self.account.account)
             self.clear()
 
             # if database is empty now, we update help tip
-            if not getAkiList(self.db):
+            if not self.names:
                 self.tips["help"].setText(HELP_TIP_ACCS)
 
     def set_account(self, index):
@@ -547,8 +580,14 @@ class EditAccountForm(CreateAccount):
             copy_email,
             attached_files,
         )
+        # if user didn't change anything then there is no need to mark database as changed
+        changed = (
+            accountname != self.old_account or account != self.db[self.old_account]
+        )
         del self.db[self.old_account]
         self.db[accountname] = account
+        if changed:
+            self.window().changed(self.old_account, accountname)
         self.clear()
 
         # here we update accounts list and clear the edit account form
@@ -556,10 +595,6 @@ class EditAccountForm(CreateAccount):
         self.add_item(accountname)
         self.clear()
 
-        # also here we update completion of the form because we edited account
-        set_form_completers(self, self.db)
-        set_form_completers(self.forms["create"], self.db)
-
 
 class ShowAccountForm(QWidget):
     """
@@ -702,7 +737,14 @@ class ShowAccountForm(QWidget):
 
         try:
             saved_file = open(path, "wb")
-            saved_file.write(self._account.attached_files[file.data()])
+
+            # content of the file might be in blob store of the database, then we load it
+            # only now
+            content = self._account.attached_files[file.data()]
+            if isinstance(content, akidump.Blob):
+                window = self.window()
+                content = loadBlob(window.name, window.key, content)
+            saved_file.write(content)
         except Exception:
             QMessageBox.critical(self.parent(), "Помилка!", "Операція не успішна!")
         else:
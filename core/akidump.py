@@ -48,16 +48,63 @@ This module has replaced pickle module from standard library because of security
 
 import json
 import base64
+import struct
 
 # NOTE: this separator is now obsolete because we use json to serialize our databases
 SEPARATOR = "s" + "-=" * 30 + "e"  # this is a separator between accounts in .db file.
 
 
+class Blob:
+    """
+    This class is a reference to attached file which content is stored in blob store of the
+    database (see core.getaki), so we don't need to load content of all attached files when we
+    open database, we load it only when user wants to download the file.
+    """
+
+    __slots__ = ("id",)
+
+    def __init__(self, id):
+        """
+        :param id:
+        id of the file in blob store, it is computed from content of the file.
+        """
+        self.id = id
+
+    def __eq__(self, other):
+        """
+        Two blobs are equal if they reference the same file.
+        """
+        return isinstance(other, Blob) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"Blob({self.id!r})"
+
+
 class Account:
     """
     This class stores data about account.
+    We use __slots__ here, so accounts don't have per-instance __dict__ and databases with lots
+    of accounts take much less memory.
+    Password and attached files of accounts loaded from disk are kept in the form they are
+    serialized in (string or base64 string) and decoded only when they are accessed first
+    time, so opening and comparing of databases doesn't decode what nobody looks at.
     """
 
+    __slots__ = (
+        "account",
+        "name",
+        "email",
+        "_password",
+        "date",
+        "comment",
+        "copy_email",
+        "_files",
+        "_encoded",
+    )
+
     def __init__(
         self,
         account,
@@ -75,39 +122,115 @@ class Account:
         self.account = account
         self.name = name
         self.email = email
-        self.password = password
+        self._password = password
         self.date = date
         self.comment = comment
         self.copy_email = copy_email
         # here we check whether attached_files argument is supplied if yes we
         # assign it to self.attached_files attribute else we assign empty
         # dictionary to self.attached_files
+        # NOTE: attached files map to their content (byte string) or, if they are
+        # already stored in blob store, to Blob instances
         # NOTE: that we do this in that strange way because we dict is mutable
         # type and we can't just write attached_files={} in __init__ constructor
-        self.attached_files = attach_files if attach_files else {}
+        self._files = attach_files if attach_files else {}
+        self._encoded = False
+
+    @classmethod
+    def encoded(cls, account, name, email, password, date, comment, copy_email, files):
+        """
+        This method creates account from fields as they are serialized, i.e. password might
+        be a string and content of attached files might be base64 strings, they will be
+        decoded on first access.
+        """
+        self = cls(account, name, email, password, date, comment, copy_email, files)
+        self._encoded = bool(files)
+        return self
+
+    @property
+    def password(self):
+        """
+        Password of the account, type: byte string
+        """
+        if isinstance(self._password, str):
+            self._password = self._password.encode()
+        return self._password
+
+    @password.setter
+    def password(self, password):
+        self._password = password
+
+    @property
+    def attached_files(self):
+        """
+        Attached files of the account, dict that maps names of files to their content (byte
+        string) or to Blob instances if files are in blob store.
+        """
+        if self._encoded:
+            files = self._files
+            for file in files:
+                files[file] = decode_file(files[file])
+            self._encoded = False
+        return self._files
+
+    @attached_files.setter
+    def attached_files(self, files):
+        self._files = files
+        self._encoded = False
+
+    def copy(self):
+        """
+        This method returns copy of the account that has its own dict of attached files, so
+        when attached files of the copy are moved to blob store the account doesn't change.
+        """
+        account = object.__new__(Account)
+        for slot in self.__slots__:
+            setattr(account, slot, getattr(self, slot))
+        account._files = dict(self._files)
+        return account
 
     def __eq__(self, other):
         """
         This method compares attributes of two accounts and returns True if all of them are equal.
         """
-        attrs = (
-            "account",
-            "name",
-            "email",
-            "password",
-            "date",
-            "comment",
-            "copy_email",
-            "attached_files",
+        if self is other:
+            return True
+        if not isinstance(other, Account):
+            return NotImplemented
+
+        # here we first compare cheap fields, then password and only then attached files
+        if (
+            self.account != other.account
+            or self.name != other.name
+            or self.email != other.email
+            or self.date != other.date
+            or self.comment != other.comment
+            or self.copy_email != other.copy_email
+            or self.password != other.password
+        ):
+            return False
+
+        # attached files that are encoded the same way are equal if their encoded forms are
+        # equal, so we decode them only if they differ
+        return (
+            self._files == other._files or self.attached_files == other.attached_files
         )
 
-        for a in attrs:
-            my = getattr(self, a)
-            his = getattr(other, a)
-            if my != his:
-                return False
-        else:
-            return True
+    def __hash__(self):
+        """
+        Hash of the account, it doesn't include password and attached files, so it is cheap
+        and consistent with __eq__.
+        """
+        return hash(
+            (
+                self.account,
+                self.name,
+                self.email,
+                self.date,
+                self.comment,
+                self.copy_email,
+            )
+        )
 
     def to_dict(self):
         """
@@ -116,13 +239,21 @@ class Account:
         """
         # JSON can't encode byte like strings which we have in our
         # attached_files dict, so we encode those byte strings to ascii using
-        # b64encode
+        # b64encode, files that are in blob store are saved as their ids,
+        # files that are still base64 encoded we don't need to touch
         attach = {}
-        for file in self.attached_files:
-            encoded = base64.b64encode(self.attached_files[file])
-            attach[file] = encoded.decode("ascii")
+        blobs = {}
+        for file in self._files:
+            content = self._files[file]
+            if isinstance(content, Blob):
+                blobs[file] = content.id
+            elif isinstance(content, str):
+                attach[file] = content
+            else:
+                encoded = base64.b64encode(content)
+                attach[file] = encoded.decode("ascii")
 
-        return {
+        result = {
             "account": self.account,
             "name": self.name,
             "email": self.email,
@@ -132,9 +263,38 @@ class Account:
             "copy_email": self.copy_email,
             "attach_files": attach,
         }
+        if blobs:
+            result["attach_blobs"] = blobs
+        return result
+
+
+def decode_file(content):
+    """
+    This function decodes content of attached file from the form it is serialized in.
+    :param content:
+    base64 string (json format), byte string or Blob
+    :return:
+    byte string or Blob
+    """
+    if isinstance(content, str):
+        return base64.b64decode(content)
+    return content
+
+
+def dumps(data, format="json"):
+    """
+    This function serializes database to string.
+    :param data:
+    represents database, type: dict
+    :param format:
+    name of serializer to use (see SERIALIZERS), json by default
+    :return:
+    serialized string, type: byte string
+    """
+    return SERIALIZERS[format].dumps(data)
 
 
-def dumps(data):
+def dumps_json(data):
     """
     This function serializes database to string using json module.
     :param data:
@@ -186,35 +346,198 @@ def loads_json(data):
 
     # here we convert dicts in `db` to Account instances
     for account in db:
-        # here we first encode password value of account dict to byte string,
-        # because password in Account class must be a byte string
-        password = db[account]["password"].encode()
-        db[account]["password"] = password
-
-        # here we also recode attached files from ascii base64 to byte string if
-        # account have any
-        attached_files = db[account].get("attach_files")
-        if attached_files:
-            for file in attached_files:
-                data = attached_files[file].encode()
-                recoded = base64.b64decode(data)
-                db[account]["attach_files"][file] = recoded
-
-        # then we unpack account dict as arguments for Account constructor to
-        # create Account instance from account dict, then we save freshly
+        fields = db[account]
+
+        # NOTE: password and attached files (ascii base64) we don't decode here, Account
+        # decodes them only when they are accessed
+        attached_files = fields.get("attach_files") or {}
+
+        # files that are in blob store we load lazily, so here we only create
+        # references to them
+        blobs = fields.get("attach_blobs")
+        if blobs:
+            for file in blobs:
+                attached_files[file] = Blob(blobs[file])
+
+        # then we create Account instance from account dict, then we save freshly
         # created Account instance back to the database
-        db[account] = Account(**db[account])
+        db[account] = Account.encoded(
+            fields["account"],
+            fields["name"],
+            fields["email"],
+            fields["password"],
+            fields["date"],
+            fields["comment"],
+            fields.get("copy_email", True),
+            attached_files,
+        )
 
     # finally we return deserialized database
     return db
 
 
+# Here are constants of the binary format, data of such format consists of:
+# tag – marks data serialized in binary format, json can't start with it;
+# number of accounts;
+# accounts – every account starts with header that contains lengths of its fields,
+# `copy_email` flag and number of attached files, then go the fields themselves (strings are
+# utf-8 encoded), then attached files, every attached file is a header with length of its
+# name, its kind (content or reference to blob store) and length of content or blob id, then
+# go name and content (or blob id).
+# We don't need base64 here, so attached files aren't inflated and loading is much faster
+# than parsing json.
+BINARY_TAG = b"\x00AKB\x01"
+COUNT = struct.Struct(">I")
+ACCOUNT_HEADER = struct.Struct(">7IBI")
+FILE_HEADER = struct.Struct(">IBI")
+INLINE_FILE = 0
+BLOB_FILE = 1
+
+
+def dumps_binary(data):
+    """
+    This function serializes database to string using binary format.
+    :param data:
+    represents database, type: dict
+    :return:
+    serialized string, type: byte string
+    """
+    parts = [BINARY_TAG, COUNT.pack(len(data))]
+    append = parts.append
+    for key in data:
+        account = data[key]
+        fields = (
+            key.encode(),
+            account.account.encode(),
+            account.name.encode(),
+            account.email.encode(),
+            account.password,
+            account.date.encode(),
+            account.comment.encode(),
+        )
+        # here we take attached files as they are, without decoding them, files that are
+        # loaded from binary format are byte strings we can write unchanged
+        files = account._files
+        append(
+            ACCOUNT_HEADER.pack(*map(len, fields), bool(account.copy_email), len(files))
+        )
+        parts += fields
+
+        for file in files:
+            name = file.encode()
+            content = files[file]
+            if isinstance(content, Blob):
+                kind = BLOB_FILE
+                content = content.id.encode()
+            else:
+                kind = INLINE_FILE
+                if isinstance(content, str):
+                    content = base64.b64decode(content)
+            append(FILE_HEADER.pack(len(name), kind, len(content)))
+            append(name)
+            append(content)
+    return b"".join(parts)
+
+
+def loads_binary(data):
+    """
+    This function deserializes string in binary format to database.
+    :param data:
+    string to deserialize, type: byte string, bytearray or memoryview
+    :raises ValueError:
+    if data is corrupted
+    """
+    # here we work with view of the data, so data itself is never copied, we copy only
+    # fields of accounts and content of attached files, so that nothing refers to the data
+    # after it's deserialized and it can be wiped (big files are in blob store anyway)
+    view = memoryview(data)
+    if view[: len(BINARY_TAG)] != BINARY_TAG:
+        raise ValueError("Data isn't serialized in binary format!")
+    offset = len(BINARY_TAG)
+
+    try:
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        db = {}
+        for _ in range(count):
+            # here we read lengths of all fields of account at once and then slice them
+            *lengths, copy_email, files = ACCOUNT_HEADER.unpack_from(view, offset)
+            offset += ACCOUNT_HEADER.size
+            fields = []
+            for length in lengths:
+                fields.append(view[offset : offset + length])
+                offset += length
+            key, account, name, email, password, date, comment = fields
+
+            attached_files = {}
+            for _ in range(files):
+                name_length, kind, length = FILE_HEADER.unpack_from(view, offset)
+                offset += FILE_HEADER.size
+                file = str(view[offset : offset + name_length], "utf-8")
+                offset += name_length
+                if kind == BLOB_FILE:
+                    content = Blob(str(view[offset : offset + length], "utf-8"))
+                else:
+                    content = bytes(view[offset : offset + length])
+                offset += length
+                attached_files[file] = content
+
+            db[str(key, "utf-8")] = Account.encoded(
+                str(account, "utf-8"),
+                str(name, "utf-8"),
+                str(email, "utf-8"),
+                bytes(password),
+                str(date, "utf-8"),
+                str(comment, "utf-8"),
+                bool(copy_email),
+                attached_files,
+            )
+    except struct.error as err:
+        raise ValueError("Data is truncated!") from err
+
+    # slices silently stop at the end of data, so here we also check that nothing is missing
+    # or left
+    if offset != len(view):
+        raise ValueError("Data is corrupted!")
+    return db
+
+
+class Serializer:
+    """
+    This class describes serialization format of the database, `tag` is bytes with which
+    serialized data starts, so `loads` can recognize the format of data, formats without tag
+    are tried only when no tagged format fits.
+    """
+
+    def __init__(self, dumps, loads, tag=None):
+        self.dumps = dumps
+        self.loads = loads
+        self.tag = tag
+
+
+# Here are all serializers we have, to add new format just add it here (with a unique tag).
+SERIALIZERS = {
+    "json": Serializer(dumps_json, loads_json),
+    "binary": Serializer(dumps_binary, loads_binary, BINARY_TAG),
+}
+
+
 def loads(data):
     """
-    This function is an interface to `loads_old` and `loads_json` functions.
-    `loads` will use `loads_old` for databases serialized in the
-    obsolete way and `loads_json` for those serialized json way.
+    This function is an interface to all of deserializers.
+    `loads` will use serializer which tag the data starts with, `loads_old` for databases
+    serialized in the obsolete way and `loads_json` for those serialized json way.
     """
+    # here we look for serializer which tag marks the data
+    for serializer in SERIALIZERS.values():
+        tag = serializer.tag
+        if tag and data[: len(tag)] == tag:
+            return serializer.loads(data)
+
+    # json and obsolete format can't be parsed from memoryview
+    if isinstance(data, memoryview):
+        data = bytes(data)
+
     # here we first try to deserialize `data` using `loads_json`
     try:
         db = loads_json(data)
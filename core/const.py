@@ -58,6 +58,23 @@ reqs_pip = ("setuptools", "cryptography", "gitpython", "pyshortcuts")
 SRC_DIR = "src"
 SRC_PATH = "."
 
+# Database window decides whether there are unsaved changes by counting changes, if this constant
+# is True it verifies that by comparing database on disk with database in memory (slow).
+VERIFY_CLOSE = False
+
+# When auto-save is turned on, database window saves database this many seconds after the last
+# change, but no later than the second number of seconds after the first unsaved change.
+AUTOSAVE_DELAY = 2
+AUTOSAVE_LATENCY = 30
+
+# File where PyQtAccounts remembers its version together with commit it was resolved for, so
+# that we don't have to ask git about it on every start.
+VERSION_FILE = ".version"
+
+# Key derivation parameters of new databases are chosen so that key derivation (and so opening
+# of the database) takes about this many seconds on this machine.
+KDF_TIME = 0.5
+
 # This constant stores information message that PyQtAccounts shows when you have no databases
 # created yet.
 HELP_TIP_DB = (
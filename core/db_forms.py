@@ -52,19 +52,122 @@ from core.widgets import *
 from core.getaki import *
 from core.windows import *
 from core.utils import *
+import core.akidump as akidump
 import core.const
 from core.const import *
 from cryptography.exceptions import InvalidSignature
 from cryptography.fernet import InvalidToken
+from functools import partial
 
 SRC_DIR = core.const.SRC_DIR
 
 
+def errorMessage(err):
+    """
+    This function returns message that we show to user when database can't be opened or saved
+    because of the given error.
+    :param err:
+    the error, type: Exception
+    """
+    if isinstance(err, UnsupportedKdf):
+        return (
+            f"Алгоритм обчислення ключа {err.name} не підтримується на цьому комп'ютері.\n"
+            "Оновіть бібліотеку cryptography."
+        )
+    return str(err) or type(err).__name__
+
+
+def journalWarning(parent, path):
+    """
+    This function warns user that journal of the database can't be read, so database is
+    opened without changes saved in it.
+    :param parent:
+    parent of the warning, i.e. window of the database
+    :param path:
+    path where the journal is set aside
+    """
+    QMessageBox.warning(
+        parent,
+        "Увага!",
+        "Журнал змін бази данних пошкоджений або зашифрований іншим ключем, "
+        "тому останні збережені зміни не завантажено.\n"
+        f"Журнал збережено у файлі {path}",
+    )
+
+
+class Creating(QObject):
+    """
+    This class represents process that creates database or saves edited database under new name
+    or with new password, we run it in another thread, because calibration and derivation of
+    the key and encryption of the database take long enough to freeze UI.
+    """
+
+    # this signal is emitted with key of the database when the process successfully ends
+    result = pyqtSignal(object)
+    # this signal is emitted with error message when database can't be created
+    error = pyqtSignal(str)
+    # this signal is emitted when the process ends no matter how
+    finished = pyqtSignal()
+
+    def __init__(self, create):
+        """
+        :param create:
+        function that creates database and returns its key
+        """
+        QObject.__init__(self)
+        self.create = create
+
+    def run(self):
+        """
+        This method creates database emitting result or error signal.
+        """
+        try:
+            key = self.create()
+        except Exception as err:
+            self.error.emit(errorMessage(err))
+        else:
+            self.result.emit(key)
+        finally:
+            self.finished.emit()
+
+
+def startCreating(form, create, done, failed):
+    """
+    This function runs process that creates database in another thread, form is disabled
+    until the process ends.
+    :param form:
+    form that creates database
+    :param create:
+    function that creates database and returns its key
+    :param done:
+    function that we call with key of the database when it's created
+    :param failed:
+    function that we call with error message when database can't be created
+    """
+    thread = QThread(parent=form)
+    creating = Creating(create)
+    creating.moveToThread(thread)
+    creating.result.connect(done)
+    creating.error.connect(failed)
+    creating.finished.connect(thread.quit)
+    thread.started.connect(creating.run)
+
+    # thread keeps the process alive, and when it finishes we destroy both of them
+    thread.creating = creating
+    thread.finished.connect(creating.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    form.setEnabled(False)
+    thread.start()
+
+
 class CreateDbForm(CreateForm):
     """
     This is a superclass which specifies CreateForm class for create database form needs.
     """
 
+    # this signal is emitted when creating process of the database ends
+    finished = pyqtSignal()
+
     def __init__(self, helpTip, parent=None):
         """
         This constructor creates the form specifying all widgets parameters.
@@ -89,29 +192,67 @@ class CreateDbForm(CreateForm):
             self, title, namePlaceholder, nameError, nameTip, passTip, helpTip, parent
         )
 
+        # here user chooses cipher of the database, it can't be changed later
+        self.cipherLabel = QLabel("Шифр:")
+        self.cipherInput = QComboBox()
+        for cipher in CIPHERS:
+            self.cipherInput.addItem(CIPHERS[cipher].name, cipher)
+        self.cipherInput.setCurrentIndex(self.cipherInput.findData(CIPHER))
+        self.layout.insertWidget(self.layout.indexOf(self.errors), self.cipherLabel)
+        self.layout.insertWidget(self.layout.indexOf(self.errors), self.cipherInput)
+
     def create(self, event):
         """
         This method called when user presses `Create` button.
         It create database from data that user entered in form and saves it to file called
-        `<database name>.db`, it also creates salt file of the database called `<database
-        name>.bin`.
+        `<database name>.dba`, salt of the database is saved in header of this file.
         """
-        # Here we get validated name and password, create database and clear form
+        # Here we get validated name and password and create database in another thread
         name = validName(self.nameInput.text())
         password = self.passField.passInput.text().encode()
-        newDatabase(name, password)
+        cipher = self.cipherInput.currentData()
+        startCreating(
+            self,
+            lambda: newDatabase(name, password, cipher=cipher),
+            partial(self.created, name),
+            self.createFailed,
+        )
+
+    def created(self, name, key):
+        """
+        This method called when database is created.
+        :param name:
+        name of the database
+        :param key:
+        key of the database, we don't need it until user opens the database
+        """
+        key.zeroize()
+        self.setEnabled(True)
         self.clear()
 
-        # here we update database list and help tip
-        self.add_item(name)
+        # here we update database list (i.e. the registry) and help tip
+        registry.update(name, 0)
         self.tips["help"].setText("Виберіть базу данних")
+        self.finished.emit()
+
+    def createFailed(self, error):
+        """
+        This method called when database can't be created.
+        :param error:
+        error message
+        """
+        self.setEnabled(True)
+        self.finished.emit()
+        QMessageBox.critical(
+            self, "Помилка!", f"Не вдалося створити базу данних!\n{error}"
+        )
 
     def validateName(self, event):
         """
         This method validates whether name entered in the field and is it unique.
         """
         name = validName(self.nameInput.text())
-        if name in getDbList():
+        if name in registry:
             self.nameError.show()
             self.createButton.setEnabled(False)
             self.createButton.setStyleSheet(APPLY_BUTTON_DISABLED)
@@ -138,6 +279,9 @@ class EditDbForm(CreateForm):
     This is a superclass which specifies CreateForm class for edit database form needs.
     """
 
+    # this signal is emitted when saving process of the database ends
+    finished = pyqtSignal()
+
     def __init__(self, tips, windows, parent=None):
         """
         This constructor creates the form specifying all widgets parameters appropriately to
@@ -208,7 +352,7 @@ class EditDbForm(CreateForm):
         the name didn't changed it's okay!).
         """
         name = validName(self.nameInput.text())
-        if name in getDbList() and name != self.db.name:
+        if name in registry and name != self.db.name:
             self.nameError.show()
             self.createButton.setEnabled(False)
             self.createButton.setStyleSheet(APPLY_BUTTON_DISABLED)
@@ -243,11 +387,13 @@ class EditDbForm(CreateForm):
 
         # If users answer is `Yes` we delete database
         if action == QMessageBox.Yes:
-            os.remove(f"{core.const.SRC_DIR}/{name}.db")
-            os.remove(f"{core.const.SRC_DIR}/{name}.bin")
+            # database window can't save database anymore, otherwise it could bring database
+            # back
+            self.db.teardown()
+            removeDatabase(name)
 
             # and we update database list
-            self.remove_item(name)
+            registry.remove(name)
             self.clear()
             self.db.ask = False
 
@@ -259,7 +405,7 @@ class EditDbForm(CreateForm):
             self.db.close()
 
             # if there is no databases left we show appropriate tip
-            if not getDbList():
+            if not registry:
                 self.tips["help"].setText(HELP_TIP_DB)
 
     def create(self):
@@ -274,30 +420,192 @@ class EditDbForm(CreateForm):
         # Here we get validated name and password
         name = validName(self.nameInput.text())
         password = self.passField.passInput.text().encode()
+        window = self.db
+        oldName = self.old_name
+        db = window.db
+        oldKey = window.key
+
+        # if password isn't changed we reuse key of the database instead of deriving new one
+        key = oldKey if password == window.password else None
+
+        # database window can't save database anymore, so that nothing is saved with the old
+        # key over the new database, and user can't change database until it's saved
+        window.teardown()
+        window.setEnabled(False)
+
+        def save():
+            # old database must stay as it is until the new one is on disk, because window
+            # keeps it if new database can't be saved, so we save copies of accounts (saving
+            # replaces attached files with references to blob store of the new database) and
+            # we copy blob store instead of moving it
+            accounts = {account: db[account].copy() for account in db}
+            created = name != oldName and not os.path.exists(blobsFolder(name))
+            try:
+                # attached files in blob store are encrypted with the old key, so if the key
+                # changes we load them all to reencrypt them with the new one
+                if not key:
+                    loadBlobs(oldName, accounts, oldKey)
+                elif name != oldName:
+                    copyBlobs(oldName, name)
 
-        # Then we remove old database
-        os.remove(f"{core.const.SRC_DIR}/{self.old_name}.db")
-        os.remove(f"{core.const.SRC_DIR}/{self.old_name}.bin")
+                # And we create new database based on the data of the form, salt and accounts
+                # are written at once atomically, cipher of the database stays the same
+                return newDatabase(name, password, key, accounts, oldKey.cipher)
+            except Exception:
+                # here we remove blob store that we've made for the new database
+                if created:
+                    removeBlobs(name)
+                raise
 
-        # And we create new database based on the data of the form
-        newDatabase(name, password)
+        startCreating(
+            self,
+            save,
+            partial(self.saved, window, name, oldName),
+            partial(self.saveFailed, window),
+        )
+
+    def saved(self, window, name, oldName, key):
+        """
+        This method called when edited database is saved.
+        :param window:
+        window of the database
+        :param name:
+        new name of the database
+        :param oldName:
+        old name of the database
+        :param key:
+        key of the saved database
+        """
+        self.setEnabled(True)
         self.clear()
 
-        # then we save encrypted database to freshly created database
-        token = encryptDatabase(name, self.db.db, password)
-        with open(f"{core.const.SRC_DIR}/{name}.db", "wb") as dbfile:
-            dbfile.write(token)
+        # only when new database is on disk we remove the old one
+        if name != oldName:
+            removeDatabase(oldName)
+            registry.remove(oldName)
 
-        # Here we delete old database name from list and add new name to it
-        self.remove_item(self.old_name)
-        self.add_item(name)
+        # Here we add new name to the database list (or update the old one)
+        registry.update(name, len(window.db))
 
         # to avoid errors that occurs because of close behavior
-        self.windows.remove(self.db)
-        self.db.closeEvent = lambda *args: None
+        self.windows.remove(window)
+        window.closeEvent = lambda *args: None
+
+        # Then we close database window, user will open database with its new password
+        window.close()
+        key.zeroize()
+        window.key.zeroize()
+        self.finished.emit()
+
+    def saveFailed(self, window, error):
+        """
+        This method called when edited database can't be saved, database window stays opened
+        and keeps saving the database as before.
+        :param window:
+        window of the database
+        :param error:
+        error message
+        """
+        self.setEnabled(True)
+        window.resume()
+        window.setEnabled(True)
+        self.finished.emit()
+        QMessageBox.critical(
+            self, "Помилка!", f"Не вдалося зберегти базу данних!\n{error}"
+        )
+
+
+class Unlocking(QObject):
+    """
+    This class represents process that opens database, we run it in another thread, because
+    key derivation, decryption and deserialization of database take long enough to freeze UI.
+    """
 
-        # Then we close database window
-        self.db.close()
+    # this signal is emitted before each stage of opening, it carries number and name of the stage
+    stage = pyqtSignal(int, str)
+    # this signal is emitted with opened database and its key when the process successfully ends
+    result = pyqtSignal(object, object)
+    # this signal is emitted when password is incorrect
+    failed = pyqtSignal()
+    # this signal is emitted with error message when database can't be opened for another reason
+    # (e.g. its file is damaged)
+    error = pyqtSignal(str)
+    # this signal is emitted when the process ends no matter how (even if it is cancelled)
+    finished = pyqtSignal()
+
+    # here are stages of the process
+    STAGES = ("Обчислення ключа...", "Розшифрування...", "Завантаження акаунтів...")
+
+    def __init__(self, name, password):
+        """
+        :param name:
+        name of the database to open
+        :param password:
+        password of the database, type: byte string
+        """
+        QObject.__init__(self)
+        self.name = name
+        self.password = password
+        self.cancelled = False
+
+        # here is path where journal of the database is moved if it can't be read
+        self.asideJournal = None
+
+    def cancel(self):
+        """
+        This method cancels the process, key derivation can't be interrupted, but once the
+        current stage ends the process stops and its result is thrown away.
+        """
+        self.cancelled = True
+
+    def run(self):
+        """
+        This method does all opening work, emitting stage signal before each stage.
+        """
+        try:
+            db, key = self.open()
+        except (InvalidSignature, InvalidToken):
+            if not self.cancelled:
+                self.failed.emit()
+        except Exception as err:
+            # whatever happens in the thread, form must not stay busy forever
+            if not self.cancelled:
+                self.error.emit(errorMessage(err))
+        else:
+            if not self.cancelled:
+                self.result.emit(db, key)
+        finally:
+            self.finished.emit()
+
+    def open(self):
+        """
+        This method opens database stage by stage, it returns opened database and its key or
+        Nones if process is cancelled.
+        """
+        self.stage.emit(1, self.STAGES[0])
+        key = loadKey(self.name, self.password)
+        if self.cancelled:
+            return None, None
+
+        self.stage.emit(2, self.STAGES[1])
+        data = decryptDatabase(self.name, key)
+        if self.cancelled:
+            wipeMemory(data)
+            return None, None
+
+        self.stage.emit(3, self.STAGES[2])
+        try:
+            db = akidump.loads(memoryview(data))
+        finally:
+            wipeMemory(data)
+        db = replayJournal(self.name, db, key, self.journalSetAside)
+        return db, key
+
+    def journalSetAside(self, path):
+        """
+        This method called when journal of the database can't be read and is moved to `path`.
+        """
+        self.asideJournal = path
 
 
 class OpenDbForm(QWidget):
@@ -305,6 +613,9 @@ class OpenDbForm(QWidget):
     This class represents form that we use to open databases
     """
 
+    # this signal is emitted when opening process of the database ends
+    finished = pyqtSignal()
+
     def __init__(self, helpTip, windows, parent=None):
         """
         This is constructor of the form, it creates all widgets.
@@ -320,6 +631,7 @@ class OpenDbForm(QWidget):
         self.name = None
         self.windows = windows
         self.helpTip = helpTip
+        self.unlocking = None
 
         # Here we define title, password label and field of the form
         self.title = Title()
@@ -331,8 +643,22 @@ class OpenDbForm(QWidget):
         self.incorrectPass = Error("Неправильний пароль!")
         self.incorrectPass.hide()
 
+        # here is progress of opening and its current stage
+        self.progress = QProgressBar()
+        self.progress.setRange(0, len(Unlocking.STAGES))
+        self.progress.hide()
+        self.stageTip = Tip()
+        self.stageTip.hide()
+
         self.openButton = QPushButton("Відкрити")
         self.openButton.clicked.connect(self.open)
+        self.cancelButton = QPushButton("Скасувати")
+        self.cancelButton.clicked.connect(self.cancel)
+        self.cancelButton.hide()
+
+        buttonsLayout = QHBoxLayout()
+        buttonsLayout.addWidget(self.cancelButton)
+        buttonsLayout.addWidget(self.openButton)
 
         layout = QVBoxLayout()
         self.setLayout(layout)
@@ -340,7 +666,9 @@ class OpenDbForm(QWidget):
         layout.addWidget(self.passLabel)
         layout.addLayout(self.passField)
         layout.addWidget(self.incorrectPass)
-        layout.addWidget(self.openButton)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.stageTip)
+        layout.addLayout(buttonsLayout)
 
     def setDb(self, index):
         """
@@ -348,6 +676,9 @@ class OpenDbForm(QWidget):
         :param index:
         the index of the database being chosen, it stores database name.
         """
+        # if another database is opening right now we cancel it
+        self.cancel()
+
         # Here we set title according to the name of database being chosen
         self.name = index.data()
         self.title.setText("Відкрити базу данних <i><b>{}</b></i>".format(self.name))
@@ -355,24 +686,123 @@ class OpenDbForm(QWidget):
     def open(self):
         """
         This method called when user presses `Open` button.
-        It opens database creating its window.
-        :return:
+        It starts opening process of the database in another thread, database window is
+        created when the process ends.
         """
+        # to prevent opening database twice when user presses Enter several times
+        if self.unlocking:
+            return
+
         # we obtain name and password of the database
         name = self.name
         password = self.passField.passInput.text().encode()
 
-        # Here we trying to open database
-        try:
-            db = openDatabase(self.name, password)
-        except (InvalidSignature, InvalidToken):
-            # if something goes wrong (i.e. password is incorrect)
-            # we show appropriate error message
-            self.incorrectPass.show()
+        # here we create process and start it in another thread
+        thread = QThread(parent=self)
+        unlocking = Unlocking(name, password)
+        unlocking.moveToThread(thread)
+        unlocking.stage.connect(self.setStage)
+        unlocking.result.connect(self.opened)
+        unlocking.failed.connect(self.wrongPassword)
+        unlocking.error.connect(self.openFailed)
+        unlocking.finished.connect(thread.quit)
+        thread.started.connect(unlocking.run)
+
+        # thread keeps the process alive even if it is cancelled, and when it finishes we
+        # destroy both of them
+        thread.unlocking = unlocking
+        thread.finished.connect(unlocking.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        self.unlocking = unlocking
+        self.setBusy(True)
+        thread.start()
+
+    def cancel(self):
+        """
+        This method called when user presses `Cancel` button while database is opening.
+        """
+        if not self.unlocking:
             return
-        else:
-            # if everything is alright we hide error message in case if it showed
-            self.incorrectPass.hide()
+
+        self.unlocking.cancel()
+        self.unlocking = None
+        self.setBusy(False)
+        self.finished.emit()
+
+    def setBusy(self, busy):
+        """
+        This method shows or hides progress of opening and disables or enables form while
+        database is opening.
+        """
+        self.progress.setValue(0)
+        # we use show and hide, so tests know whether widgets are visible (see testutils)
+        for widget in (self.progress, self.stageTip, self.cancelButton):
+            if busy:
+                widget.show()
+            else:
+                widget.hide()
+        self.openButton.setEnabled(not busy)
+        self.passField.passInput.setEnabled(not busy)
+
+    def setStage(self, number, stage):
+        """
+        This method called when opening process starts new stage.
+        """
+        if self.sender() is not self.unlocking:
+            return
+        self.progress.setValue(number)
+        self.stageTip.setText(stage)
+
+    def wrongPassword(self):
+        """
+        This method called when opening process fails because password is incorrect.
+        """
+        if self.sender() is not self.unlocking:
+            return
+
+        # we show appropriate error message
+        self.unlocking = None
+        self.setBusy(False)
+        self.incorrectPass.show()
+        self.passField.passInput.setFocus()
+        self.finished.emit()
+
+    def openFailed(self, error):
+        """
+        This method called when opening process fails not because of password.
+        :param error:
+        error message
+        """
+        if self.sender() is not self.unlocking:
+            return
+
+        self.unlocking = None
+        self.setBusy(False)
+        self.finished.emit()
+        QMessageBox.critical(
+            self, "Помилка!", f"Не вдалося відкрити базу данних!\n{error}"
+        )
+
+    def opened(self, db, key):
+        """
+        This method called when opening process successfully ends.
+        It creates database window.
+        :param db:
+        opened database
+        :param key:
+        key of the database, database window will reuse it to save database
+        """
+        if self.sender() is not self.unlocking:
+            return
+
+        name = self.unlocking.name
+        password = self.unlocking.password
+        asideJournal = self.unlocking.asideJournal
+        self.unlocking = None
+        self.setBusy(False)
+
+        # if everything is alright we hide error message in case if it showed
+        self.incorrectPass.hide()
 
         # then we clear form, hide it and show help tip
         self.name = None
@@ -380,8 +810,322 @@ class OpenDbForm(QWidget):
         self.hide()
         self.helpTip.show()
 
+        # now we know how many accounts database has, so we save it to the registry
+        registry.update(name, len(db))
+
+        # and create database window saving it to the windows list
+        win = DbWindow(self.windows, name, db, password, key)
+        self.windows.append(win)
+        # when main window is closed we close all database windows
+        win.setAttribute(Qt.WA_QuitOnClose)
+        self.finished.emit()
+
+        # if journal of the database can't be read, database is opened without changes saved
+        # in it and user should know about it
+        if asideJournal:
+            journalWarning(win, asideJournal)
+
+
+class UnlockingSeveral(QObject):
+    """
+    This class represents process that opens several databases at once, we run it in another
+    thread and it opens databases in process pool (see unlockDatabases).
+    """
+
+    # this signal is emitted with name of the database, opened database, its key, password
+    # that fits and path where its journal is set aside (or None) as soon as the database is
+    # opened
+    result = pyqtSignal(str, object, object, bytes, object)
+    # this signal is emitted with name of the database that can't be opened with given passwords
+    failed = pyqtSignal(str)
+    # this signal is emitted when the process ends no matter how (even if it is cancelled)
+    finished = pyqtSignal()
+
+    def __init__(self, names, passwords):
+        """
+        :param names:
+        names of the databases to open
+        :param passwords:
+        passwords to try for every database, type: list of byte strings
+        """
+        QObject.__init__(self)
+        self.names = names
+        self.passwords = passwords
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        This method cancels the process, databases that are already opening can't be
+        interrupted, but others aren't opened and all results are thrown away.
+        """
+        self.cancelled = True
+
+    def run(self):
+        """
+        This method opens databases emitting result or failed signal for every database.
+        """
+        opening = unlockDatabases(self.names, self.passwords)
+        try:
+            for name, result in opening:
+                if self.cancelled:
+                    break
+                if result is None:
+                    self.failed.emit(name)
+                else:
+                    i, db, key, aside = result
+                    self.result.emit(name, db, key, self.passwords[i], aside)
+        finally:
+            opening.close()
+            self.finished.emit()
+
+
+class UnlockDbsForm(QWidget):
+    """
+    This class represents form that we use to open several databases at once.
+    """
+
+    # this signal is emitted when opening process of the databases ends
+    finished = pyqtSignal()
+
+    def __init__(self, helpTip, windows, parent=None):
+        """
+        This is constructor of the form, it creates all widgets.
+        :param helpTip:
+        Tip that will be displayed when form is hidden.
+        :param windows:
+        list of all windows
+        :param parent:
+        The parent of the form.
+        """
+        QWidget.__init__(self, parent)
+        self.hide()
+        self.windows = windows
+        self.helpTip = helpTip
+        self.unlocking = None
+        self.notOpened = []
+        # here are windows of databases which journals are set aside and paths of the journals
+        self.asideJournals = []
+
+        self.title = Title("Відкрити декілька баз данних")
+
+        # here is list of databases, user checks databases that he wants to open
+        self.dbsLabel = QLabel("Бази данних:")
+        self.dbsList = QListWidget()
+
+        # user can give several passwords, each of them is tried for every database
+        self.passLabel = QLabel("Паролі:")
+        self.passLayout = QVBoxLayout()
+        self.passFields = []
+        self.addPassField()
+        self.addPassButton = QPushButton("Ще пароль")
+        self.addPassButton.clicked.connect(self.addPassField)
+
+        # This is error that we show when some databases can't be opened
+        self.notOpenedError = Error()
+        self.notOpenedError.hide()
+
+        # here is progress of opening, it counts opened databases
+        self.progress = QProgressBar()
+        self.progress.hide()
+
+        self.openButton = QPushButton("Відкрити")
+        self.openButton.clicked.connect(self.open)
+        self.cancelButton = QPushButton("Скасувати")
+        self.cancelButton.clicked.connect(self.cancel)
+        self.cancelButton.hide()
+
+        buttonsLayout = QHBoxLayout()
+        buttonsLayout.addWidget(self.cancelButton)
+        buttonsLayout.addWidget(self.openButton)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(self.title)
+        layout.addWidget(self.dbsLabel)
+        layout.addWidget(self.dbsList)
+        layout.addWidget(self.passLabel)
+        layout.addLayout(self.passLayout)
+        layout.addWidget(self.addPassButton)
+        layout.addWidget(self.notOpenedError)
+        layout.addWidget(self.progress)
+        layout.addLayout(buttonsLayout)
+
+    def addPassField(self):
+        """
+        This method adds one more password field to the form.
+        """
+        field = PasswordField("введіть пароль")
+        field.passInput.returnPressed.connect(self.open)
+        self.passLayout.addLayout(field)
+        self.passFields.append(field)
+
+    def setDbs(self):
+        """
+        This method fills list of databases with all databases that aren't opened yet.
+        """
+        opened = {win.name for win in self.windows}
+        self.dbsList.clear()
+        for name in registry:
+            if name in opened:
+                continue
+            item = QListWidgetItem(QIcon("img/icon.svg"), name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.dbsList.addItem(item)
+
+    def checked(self):
+        """
+        This method returns names of databases that user checked.
+        """
+        items = (self.dbsList.item(i) for i in range(self.dbsList.count()))
+        return [item.text() for item in items if item.checkState() == Qt.Checked]
+
+    def open(self):
+        """
+        This method called when user presses `Open` button.
+        It starts opening process of the databases in another thread, database windows are
+        created as soon as every database is opened.
+        """
+        # to prevent opening databases twice when user presses Enter several times
+        if self.unlocking:
+            return
+
+        names = self.checked()
+        passwords = [
+            field.passInput.text().encode()
+            for field in self.passFields
+            if field.passInput.text()
+        ]
+        if not names or not passwords:
+            return
+
+        # here we create process and start it in another thread
+        thread = QThread(parent=self)
+        unlocking = UnlockingSeveral(names, passwords)
+        unlocking.moveToThread(thread)
+        unlocking.result.connect(self.opened)
+        unlocking.failed.connect(self.failed)
+        unlocking.finished.connect(self.done)
+        unlocking.finished.connect(thread.quit)
+        thread.started.connect(unlocking.run)
+
+        # thread keeps the process alive even if it is cancelled, and when it finishes we
+        # destroy both of them
+        thread.unlocking = unlocking
+        thread.finished.connect(unlocking.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        self.unlocking = unlocking
+        self.notOpened = []
+        self.notOpenedError.hide()
+        self.progress.setRange(0, len(names))
+        self.setBusy(True)
+        thread.start()
+
+    def cancel(self):
+        """
+        This method called when user presses `Cancel` button while databases are opening.
+        """
+        if not self.unlocking:
+            return
+
+        self.unlocking.cancel()
+        self.unlocking = None
+        self.setBusy(False)
+        self.finished.emit()
+        self.warnAboutJournals()
+
+    def warnAboutJournals(self):
+        """
+        This method warns user about every opened database which journal can't be read, we do
+        it when opening ends, so warnings don't interrupt opening of other databases.
+        """
+        asideJournals, self.asideJournals = self.asideJournals, []
+        for win, path in asideJournals:
+            journalWarning(win, path)
+
+    def setBusy(self, busy):
+        """
+        This method shows or hides progress of opening and disables or enables form while
+        databases are opening.
+        """
+        self.progress.setValue(0)
+        for widget in (self.progress, self.cancelButton):
+            if busy:
+                widget.show()
+            else:
+                widget.hide()
+        self.openButton.setEnabled(not busy)
+        self.addPassButton.setEnabled(not busy)
+        self.dbsList.setEnabled(not busy)
+        for field in self.passFields:
+            field.passInput.setEnabled(not busy)
+
+    def opened(self, name, db, key, password, asideJournal):
+        """
+        This method called when one of the databases is opened, it creates database window.
+        :param name:
+        name of the database
+        :param db:
+        opened database
+        :param key:
+        key of the database, database window will reuse it to save database
+        :param password:
+        password of the database
+        :param asideJournal:
+        path where journal of the database is set aside if it can't be read, otherwise None
+        """
+        if self.sender() is not self.unlocking:
+            return
+        self.progress.setValue(self.progress.value() + 1)
+
+        # now we know how many accounts database has, so we save it to the registry
+        registry.update(name, len(db))
+
         # and create database window saving it to the windows list
-        win = DbWindow(self.windows, name, db, password)
+        win = DbWindow(self.windows, name, db, password, key)
         self.windows.append(win)
         # when main window is closed we close all database windows
         win.setAttribute(Qt.WA_QuitOnClose)
+
+        # database is opened without changes saved in journal, user will be warned about it
+        if asideJournal:
+            self.asideJournals.append((win, asideJournal))
+
+    def failed(self, name):
+        """
+        This method called when database can't be opened with given passwords.
+        :param name:
+        name of the database
+        """
+        if self.sender() is not self.unlocking:
+            return
+        self.progress.setValue(self.progress.value() + 1)
+        self.notOpened.append(name)
+
+    def done(self):
+        """
+        This method called when opening process ends.
+        """
+        if self.sender() is not self.unlocking:
+            return
+        self.unlocking = None
+        self.setBusy(False)
+
+        # if some databases aren't opened we show them, user can try other passwords
+        if self.notOpened:
+            self.notOpenedError.setText(
+                "Не вдалося відкрити: {}".format(", ".join(self.notOpened))
+            )
+            self.notOpenedError.show()
+            self.setDbs()
+            self.finished.emit()
+            self.warnAboutJournals()
+            return
+
+        # else we clear form, hide it and show help tip
+        for field in self.passFields:
+            field.passInput.clear()
+        self.hide()
+        self.helpTip.show()
+        self.finished.emit()
+        self.warnAboutJournals()
@@ -220,20 +220,12 @@ class CreateForm(QWidget):
         We use this function to add item `name` to list of form (the form has
         self.list attribute that is a list of Dbs or Accs instance).
         """
-        # here we create item for list using `name` and special icon of list
-        item = QStandardItem(self.list.icon, name)
-        # then we add created item to model of list
-        self.list.model.appendRow(item)
-        # finally we sort the list
-        self.list.model.sort(0)
+        # model of the list inserts name at its place, so list stays sorted
+        self.list.model.add(name)
 
     def remove_item(self, name):
         """
         We use this function to remove item `name` from list of form (the form has
         self.list attribute that is a list of Dbs or Accs instance).
         """
-        # here we find item specified in name, findItems() method returns list of
-        # find items, so we need to iterate trough it (it contains one item anyway)
-        for item in self.list.model.findItems(name):
-            self.list.model.removeRow(item.row())
-        self.list.model.sort(0)
+        self.list.model.remove(name)
@@ -45,15 +45,111 @@
 This module provides functions for creating, encrypting and decrypting databases.
 """
 
+import io
+import mmap
+import multiprocessing
 import os
 import base64
+import ctypes
+import hmac
+import hashlib
+import json
+import shutil
+import ctypes.util
+import struct
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import core.akidump as akidump
 import core.const
 
-from cryptography.fernet import Fernet
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+# Argon2id is available only in newer versions of cryptography
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:
+    Argon2id = None
+
+# Here are constants of the chunked format, encrypted database has this format, it consists of:
+# header – magic bytes, version of the format, size of chunks and nonce prefix;
+# chunks – each chunk is encrypted and authenticated independently, so we never need to
+# hold whole encrypted database in memory. Every chunk starts with flag that marks the last
+# chunk and length of the encrypted chunk.
+# NOTE: databases saved by older versions are single fernet tokens, we still can open them.
+MAGIC = b"\x89AKI"
+VERSION = 1
+CHUNK_SIZE = 64 * 1024
+HEADER = struct.Struct(">4sBI8s")
+CHUNK_HEADER = struct.Struct(">BI")
+
+# Here are constants of the journal of the database, journal is a file near the .dba file to
+# which we append changed accounts on save instead of rewriting the whole database.
+# Journal consists of records, every record is its length and encrypted (in chunked format)
+# operation type, number of the record, id of the .dba file (snapshot) the journal continues
+# and operation data. So the journal of the older snapshot is never applied to the newer one
+# and records can't be reordered or moved from one journal to another.
+JOURNAL_LENGTH = struct.Struct(">I")
+JOURNAL_RECORD = struct.Struct(">BI8s")
+JOURNAL_PUT = 1
+JOURNAL_DELETE = 2
+
+# Here are constants of the .bin file of the database, older versions saved only salt there,
+# then .bin file started with header that describes how key is derived from password:
+# magic bytes, version, algorithm, cost, memory and parallelism (see KdfParams), after
+# header goes salt.
+# NOTE: now databases are stored in .dba files, .db and .bin files are migrated to them.
+KDF_MAGIC = b"\x89AKK"
+KDF_VERSION = 1
+KDF_HEADER = struct.Struct(">4sBBIII")
+PBKDF2 = 0
+SCRYPT = 1
+ARGON2ID = 2
+
+# Here are constants of the .dba file, it's a single file that contains the whole database:
+# header – it has fixed size, so we can read it without reading the rest of the file, it
+# consists of magic bytes, version, cipher (see CIPHERS), key derivation parameters (see
+# KDF_HEADER), salt, number of chunks and offset of chunk index;
+# body – encrypted database (in chunked format, or a fernet token for databases migrated from
+# older versions);
+# chunk index – offsets of all chunks of the body, so we can decrypt chunks right from the
+# mapped file.
+DBA_MAGIC = b"\x89AKA"
+DBA_VERSION = 2
+DBA_HEADER = struct.Struct(">4sBBBIII16sIQ")
+# header of .dba files of version 1 has no cipher, such files are encrypted with AES-GCM
+DBA_HEADER_V1 = struct.Struct(">4sBBIII16sIQ")
+INDEX_ENTRY = struct.Struct(">Q")
+
+# Here are ciphers that chunks of databases (and their journals and attached files) are
+# encrypted with, all of them are AEAD ciphers with 256 bit key, 96 bit nonce and 128 bit tag,
+# so chunked format is the same for all of them. Cipher of the database is recorded in header
+# of its .dba file. Chunk key of every cipher is derived from the key of the database with its
+# own info (see Key).
+# AES-GCM is the fastest on processors with AES instructions (AES-NI), ChaCha20-Poly1305 is
+# faster on processors without them.
+AES_GCM = 0
+CHACHA20_POLY1305 = 1
+Cipher = namedtuple("Cipher", "name aead info")
+CIPHERS = {
+    AES_GCM: Cipher("AES-GCM", AESGCM, b"PyQtAccounts chunks"),
+    CHACHA20_POLY1305: Cipher(
+        "ChaCha20-Poly1305", ChaCha20Poly1305, b"PyQtAccounts chunks ChaCha20-Poly1305"
+    ),
+}
+# this is cipher of new databases
+CIPHER = AES_GCM
+
+# this is serialization format we save databases in (see core.akidump.SERIALIZERS), databases
+# are opened in whatever format they are saved
+SERIALIZER = "binary"
 
 
 def generateSalt(saltfile):
@@ -62,49 +158,913 @@ def generateSalt(saltfile):
     :param saltfile:
     represents path where file with salt will be located.
     """
+    writeFiles({saltfile: os.urandom(16)})
+
+
+def writeFiles(files):
+    """
+    This function writes files atomically, i.e. after crash or error (e.g. disk is full) every
+    file has either its old content or new one, never partially written.
+    Every file is written to temporary file first which is synced to disk, then all files
+    are renamed at once and their folders are synced, so renames are on disk too.
+    :param files:
+    dict that maps paths of files to their content (byte string) or to functions that take
+    file opened for binary writing and write content to it
+    """
+    written = []
+    try:
+        for path in files:
+            temp = f"{path}.tmp"
+            written.append(temp)
+            with open(temp, "wb") as file:
+                content = files[path]
+                if callable(content):
+                    content(file)
+                else:
+                    file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+    except BaseException:
+        # here we clean up, so there are no half written temporary files left
+        for temp in written:
+            try:
+                os.remove(temp)
+            except FileNotFoundError:
+                pass
+        raise
+
+    for path in files:
+        os.replace(f"{path}.tmp", path)
+
+    # every folder we sync only once, even if we write lots of files there
+    for folder in {os.path.dirname(path) for path in files}:
+        syncFolder(folder)
+
+
+def syncFolder(folder):
+    """
+    This function syncs folder to disk, we need it to make sure that created, renamed or
+    removed files of the folder are on disk.
+    """
+    try:
+        fd = os.open(folder or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # some file systems don't support syncing of folders
+        pass
+    finally:
+        os.close(fd)
+
+
+def getSalt(dbname):
+    """
+    This function reads salt of the database.
+    :param dbname:
+    name of the database
+    :return:
+    salt of the database, type: byte string
+    """
+    return readSaltFile(dbname)[0]
+
+
+def readSaltFile(dbname):
+    """
+    This function reads salt, key derivation parameters and cipher of the database from
+    header of its .dba file or, if database isn't migrated yet, from its .bin file.
+    :param dbname:
+    name of the database
+    :return:
+    salt, type: byte string, parameters, type: KdfParams, and cipher of the database (see
+    CIPHERS)
+    """
+    path = databaseFile(dbname)
+    if os.path.exists(path):
+        with open(path, "rb") as file:
+            salt, params, chunks, index, cipher, size = readContainerHeader(
+                file.read(DBA_HEADER.size)
+            )
+        return salt, params, cipher
+
+    # databases of older versions are always encrypted with AES-GCM
+    saltfile = f"{core.const.SRC_DIR}/" + dbname + ".bin"
+    with open(saltfile, "rb") as file:
+        data = file.read()
+    return (*unpackSalt(data), AES_GCM)
+
+
+def databaseFile(dbname):
+    """
+    This function returns path to .dba file of the database.
+    """
+    return f"{core.const.SRC_DIR}/" + dbname + ".dba"
+
+
+def legacyFiles(dbname):
+    """
+    This function returns paths to .db and .bin files of the database, older versions stored
+    databases in them.
+    """
+    return (
+        f"{core.const.SRC_DIR}/" + dbname + ".db",
+        f"{core.const.SRC_DIR}/" + dbname + ".bin",
+    )
+
+
+def packContainerHeader(salt, params, chunks, index, cipher=AES_GCM):
+    """
+    This function returns header of .dba file.
+    :param salt:
+    salt of the database, type: byte string
+    :param params:
+    key derivation parameters, type: KdfParams
+    :param chunks:
+    number of chunks in body of .dba file
+    :param index:
+    offset of chunk index
+    :param cipher:
+    cipher of the database (see CIPHERS)
+    """
+    if len(salt) != 16:
+        raise ValueError("Salt must be 16 bytes long!")
+    if cipher not in CIPHERS:
+        raise ValueError("Unsupported cipher!")
+    return DBA_HEADER.pack(
+        DBA_MAGIC,
+        DBA_VERSION,
+        cipher,
+        params.algorithm,
+        params.cost,
+        params.memory,
+        params.parallelism,
+        salt,
+        chunks,
+        index,
+    )
+
+
+def readContainerHeader(data):
+    """
+    This function parses header of .dba file.
+    :param data:
+    the beginning of .dba file, at least DBA_HEADER.size bytes (or DBA_HEADER_V1.size bytes
+    for .dba file of version 1)
+    :return:
+    salt, parameters (KdfParams), number of chunks, offset of chunk index, cipher (see CIPHERS)
+    and size of the header
+    :raises InvalidToken:
+    if it isn't .dba file or it's corrupted
+    """
+    if len(data) < DBA_HEADER_V1.size:
+        raise InvalidToken
+    magic, version = struct.unpack_from(">4sB", data)
+    if magic != DBA_MAGIC:
+        raise InvalidToken
+
+    if version == 1:
+        header = DBA_HEADER_V1
+        cipher = AES_GCM
+        fields = DBA_HEADER_V1.unpack_from(data)[2:]
+    elif version == DBA_VERSION and len(data) >= DBA_HEADER.size:
+        header = DBA_HEADER
+        cipher, *fields = DBA_HEADER.unpack_from(data)[2:]
+    else:
+        raise InvalidToken
+
+    algorithm, cost, memory, parallelism, salt, chunks, index = fields
+    if cipher not in CIPHERS:
+        raise InvalidToken
+    params = KdfParams(algorithm, cost, memory, parallelism)
+    return salt, params, chunks, index, cipher, header.size
+
+
+def packSalt(salt, params):
+    """
+    This function returns content of .bin file for given salt and key derivation parameters.
+    """
+    header = KDF_HEADER.pack(
+        KDF_MAGIC,
+        KDF_VERSION,
+        params.algorithm,
+        params.cost,
+        params.memory,
+        params.parallelism,
+    )
+    return header + salt
+
+
+def unpackSalt(data):
+    """
+    This function parses content of .bin file.
+    :return:
+    salt, type: byte string, and parameters, type: KdfParams
+    """
+    # .bin file of the old format contains only salt
+    if not data.startswith(KDF_MAGIC):
+        return data, KdfParams()
+
+    magic, version, algorithm, cost, memory, parallelism = KDF_HEADER.unpack_from(data)
+    if version != KDF_VERSION:
+        raise ValueError("Unsupported version of .bin file!")
+    params = KdfParams(algorithm, cost, memory, parallelism)
+    return data[KDF_HEADER.size :], params
+
+
+# here are names of key derivation algorithms that we show to user
+KDF_NAMES = {PBKDF2: "PBKDF2", SCRYPT: "scrypt", ARGON2ID: "Argon2id"}
+
+
+class UnsupportedKdf(ValueError):
+    """
+    This exception is raised when key of the database is derived with algorithm that isn't
+    available on this machine (e.g. Argon2id needs newer cryptography library).
+    """
+
+    def __init__(self, algorithm):
+        """
+        :param algorithm:
+        key derivation algorithm (see KDF_NAMES)
+        """
+        self.algorithm = algorithm
+        self.name = KDF_NAMES.get(algorithm, str(algorithm))
+        super().__init__(f"Unsupported key derivation algorithm {self.name}!")
+
+
+class KdfParams:
+    """
+    This class describes how key of the database is derived from its password.
+    Meaning of cost, memory and parallelism depends on algorithm:
+    PBKDF2 – cost is number of iterations, memory and parallelism aren't used;
+    SCRYPT – cost is binary logarithm of n (cpu/memory cost), memory is r (block size),
+    parallelism is p;
+    ARGON2ID – cost is number of iterations, memory is memory cost in KiB, parallelism is
+    number of lanes.
+    By default these are parameters that all databases were created with in older versions.
+    """
+
+    def __init__(self, algorithm=PBKDF2, cost=100000, memory=0, parallelism=1):
+        self.algorithm = algorithm
+        self.cost = cost
+        self.memory = memory
+        self.parallelism = parallelism
+
+    def kdf(self, salt):
+        """
+        This method creates key derivation function with these parameters.
+        """
+        if self.algorithm == PBKDF2:
+            return PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=salt,
+                iterations=self.cost,
+                backend=default_backend(),
+            )
+        if self.algorithm == SCRYPT:
+            return Scrypt(
+                salt=salt,
+                length=32,
+                n=2**self.cost,
+                r=self.memory,
+                p=self.parallelism,
+                backend=default_backend(),
+            )
+        if self.algorithm == ARGON2ID and Argon2id:
+            return Argon2id(
+                salt=salt,
+                length=32,
+                iterations=self.cost,
+                lanes=self.parallelism,
+                memory_cost=self.memory,
+            )
+        raise UnsupportedKdf(self.algorithm)
+
+    def __eq__(self, other):
+        return isinstance(other, KdfParams) and (
+            self.algorithm,
+            self.cost,
+            self.memory,
+            self.parallelism,
+        ) == (other.algorithm, other.cost, other.memory, other.parallelism)
+
+    def __repr__(self):
+        return (
+            f"KdfParams({self.algorithm}, {self.cost}, {self.memory}, "
+            f"{self.parallelism})"
+        )
+
+
+# here we remember parameters that calibrateKdf chose, so we calibrate only once
+_calibrated = {}
+
+
+def calibrateKdf(target=None):
+    """
+    This function chooses parameters of key derivation, so that key derivation takes about
+    `target` seconds on this machine. It uses Argon2id if it's available and scrypt otherwise,
+    both use all cores of the processor (up to 8), so we get stronger key for the same time.
+    :param target:
+    time in seconds, by default it's KDF_TIME constant from core.const
+    :return:
+    parameters, type: KdfParams
+    """
+    target = target or core.const.KDF_TIME
+    if target in _calibrated:
+        return _calibrated[target]
+
+    lanes = min(os.cpu_count() or 1, 8)
     salt = os.urandom(16)
-    with open(saltfile, "wb") as file:
-        file.write(salt)
 
+    def measure(params):
+        start = time.perf_counter()
+        params.kdf(salt).derive(b"calibration")
+        return time.perf_counter() - start
+
+    if Argon2id:
+        # here we measure one pass with 64 MiB of memory, if it's too slow we use less memory
+        # (but not less than 8 MiB), then we add passes to reach target time
+        params = KdfParams(ARGON2ID, 1, 64 * 1024, lanes)
+        elapsed = measure(params)
+        while elapsed > target and params.memory > 8 * 1024:
+            params.memory //= 2
+            elapsed = measure(params)
+        params.cost = max(1, int(target / elapsed))
+    else:
+        # time of scrypt is proportional to n, so here we double n until we reach target time
+        # (but use no more than 1 GiB of memory)
+        params = KdfParams(SCRYPT, 14, 8, lanes)
+        elapsed = measure(params)
+        while elapsed * 2 <= target and params.cost < 20:
+            params.cost += 1
+            elapsed *= 2
+
+    _calibrated[target] = params
+    return params
+
+
+def lockMemory(buffer):
+    """
+    This function tries to lock memory of the given buffer (bytearray) in RAM, so it will never
+    be swapped to disk. It does nothing on systems where it can't do so.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        address = ctypes.addressof((ctypes.c_char * len(buffer)).from_buffer(buffer))
+        libc.mlock(ctypes.c_void_p(address), ctypes.c_size_t(len(buffer)))
+    except (OSError, AttributeError, TypeError, ValueError):
+        pass
+
+
+def wipeMemory(buffer):
+    """
+    This function overwrites the given buffer (bytearray) with zeros, we call it when decrypted
+    data isn't needed anymore, so it doesn't stay in memory until memory is reused. Immutable
+    byte strings can't be wiped, so we leave them as they are.
+    """
+    if isinstance(buffer, bytearray) and buffer:
+        array = (ctypes.c_char * len(buffer)).from_buffer(buffer)
+        ctypes.memset(array, 0, len(buffer))
+        del array
+
+
+class Key:
+    """
+    This class stores salt and key derived from password of the database.
+    We derive key only once when we open database and then reuse it for every save, because
+    key derivation is the slowest part of encryption.
+    """
+
+    def __init__(self, password, salt, params=None, cipher=AES_GCM):
+        """
+        This constructor derives key from password and salt.
+        :param password:
+        password of the database, type: byte string
+        :param salt:
+        salt of the database, type: byte string
+        :param params:
+        parameters of key derivation, type: KdfParams, by default PBKDF2 of older versions
+        :param cipher:
+        cipher that encrypts chunks of the database (see CIPHERS)
+        """
+        self.salt = salt
+        self.params = params or KdfParams()
+        self.cipher = cipher
+        kdf = self.params.kdf(salt)
+
+        # here we derive key right into locked buffer, so we can wipe it later
+        self._key = bytearray(32)
+        lockMemory(self._key)
+        if hasattr(kdf, "derive_into"):
+            kdf.derive_into(password, self._key)
+        else:
+            self._key[:] = kdf.derive(password)
+        self._setup()
+
+    @classmethod
+    def restore(cls, key, salt, params, cipher=AES_GCM):
+        """
+        This method creates key from already derived key, without key derivation.
+        :param key:
+        derived key, type: byte string
+        :param salt:
+        salt of the database, type: byte string
+        :param params:
+        parameters of key derivation, type: KdfParams
+        :param cipher:
+        cipher that encrypts chunks of the database (see CIPHERS)
+        """
+        self = cls.__new__(cls)
+        self.salt = salt
+        self.params = params
+        self.cipher = cipher
+        self._key = bytearray(key)
+        lockMemory(self._key)
+        self._setup()
+        return self
+
+    def __reduce__(self):
+        """
+        Keys are passed between processes when several databases are opened at once (see
+        unlockDatabases), here we pickle derived key, so it isn't derived again.
+        """
+        return Key.restore, (bytes(self._key), self.salt, self.params, self.cipher)
+
+    def _setup(self):
+        """
+        This method creates ciphers that use derived key.
+        """
+        self._fernet = Fernet(base64.urlsafe_b64encode(self._key))
+
+        # chunked format uses its own key derived from our key, every cipher has its own
+        cipher = CIPHERS[self.cipher]
+        hkdf = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=cipher.info,
+            backend=default_backend(),
+        )
+        self._aead = cipher.aead(hkdf.derive(self._key))
+
+        # ids of attached files in blob store are keyed hashes of their content, so the same
+        # file is stored only once, and nobody can guess content of the file by its id
+        hkdf = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"PyQtAccounts blobs",
+            backend=default_backend(),
+        )
+        self._blob_key = hkdf.derive(self._key)
+
+    def blobId(self, content):
+        """
+        This method computes id of attached file in blob store.
+        :param content:
+        content of the file, type: byte string
+        :return:
+        id of the file, type: string
+        """
+        if not self._aead:
+            raise ValueError("Key is zeroized!")
+        return hmac.new(self._blob_key, content, hashlib.sha256).hexdigest()
+
+    def decrypt(self, token):
+        """
+        This method decrypts given fernet token (i.e. database of the old format).
+        """
+        if not self._fernet:
+            raise ValueError("Key is zeroized!")
+        return self._fernet.decrypt(token)
+
+    def encryptChunk(self, nonce, chunk, header):
+        """
+        This method encrypts chunk of the chunked format.
+        :param header:
+        data that isn't encrypted but is authenticated together with chunk
+        """
+        if not self._aead:
+            raise ValueError("Key is zeroized!")
+        return self._aead.encrypt(nonce, chunk, header)
+
+    def decryptChunk(self, nonce, chunk, header):
+        """
+        This method decrypts chunk of the chunked format.
+        """
+        if not self._aead:
+            raise ValueError("Key is zeroized!")
+        return self._aead.decrypt(nonce, chunk, header)
+
+    def decryptChunkInto(self, nonce, chunk, header, buffer):
+        """
+        This method decrypts chunk of the chunked format right into given buffer, so decrypted
+        chunk isn't copied.
+        :param buffer:
+        writable buffer (e.g. memoryview of bytearray) of exactly the size of decrypted chunk
+        """
+        if not self._aead:
+            raise ValueError("Key is zeroized!")
+        # older versions of cryptography can't decrypt into buffer
+        if hasattr(self._aead, "decrypt_into"):
+            self._aead.decrypt_into(nonce, chunk, header, buffer)
+        else:
+            buffer[:] = self._aead.decrypt(nonce, chunk, header)
+
+    def zeroize(self):
+        """
+        This method wipes key from memory, we call it when we close database, after that key
+        can't be used anymore.
+        """
+        self._key[:] = bytes(len(self._key))
+        self._fernet = None
+        self._aead = None
+        self._blob_key = None
+
+    def __del__(self):
+        if hasattr(self, "_key"):
+            self.zeroize()
+
+
+def deriveKey(password, salt, params=None, cipher=AES_GCM):
+    """
+    This function derives key from password and salt of the database.
+    NOTE: this is the slowest part of opening and saving the database, so never call it
+    from the GUI thread if you can avoid it.
+    :param password:
+    password of the database, type: byte string
+    :param salt:
+    salt of the database, type: byte string
+    :param params:
+    parameters of key derivation, type: KdfParams
+    :param cipher:
+    cipher of the database (see CIPHERS)
+    :return:
+    key, type: Key
+    """
+    return Key(password, salt, params, cipher)
+
+
+def loadKey(dbname, password):
+    """
+    This function derives key of the database using salt, key derivation parameters and
+    cipher from its .dba file (or .bin file if database isn't migrated yet).
+    :param dbname:
+    name of the database
+    :param password:
+    password of the database, type: byte string
+    :return:
+    key, type: Key
+    """
+    salt, params, cipher = readSaltFile(dbname)
+    return deriveKey(password, salt, params, cipher)
+
+
+def writeStream(file, key, data):
+    """
+    This function encrypts data chunk by chunk writing it to file in chunked format.
+    :param file:
+    file opened for binary writing
+    :param key:
+    key of the database
+    :param data:
+    data to encrypt, type: byte string
+    :return:
+    offsets of chunks from the beginning of written data, type: list
+    """
+    prefix = os.urandom(8)
+    header = HEADER.pack(MAGIC, VERSION, CHUNK_SIZE, prefix)
+    file.write(header)
+    offsets = []
+    offset = len(header)
+
+    # here we slice data without copying it, there is always at least one chunk, even if data
+    # is empty, because the last chunk marks the end of database
+    view = memoryview(data)
+    count = max(1, -(-len(view) // CHUNK_SIZE))
+    for i in range(count):
+        chunk = view[i * CHUNK_SIZE : (i + 1) * CHUNK_SIZE]
+        last = i == count - 1
+
+        # number of chunk is a part of nonce and together with last flag it is authenticated
+        # with header, so nobody can reorder, drop or append chunks unnoticed
+        nonce = prefix + i.to_bytes(4, "big")
+        encrypted = key.encryptChunk(nonce, chunk, header + CHUNK_HEADER.pack(last, i))
+        file.write(CHUNK_HEADER.pack(last, len(encrypted)))
+        file.write(encrypted)
+        offsets.append(offset)
+        offset += CHUNK_HEADER.size + len(encrypted)
+    return offsets
+
+
+def indexStream(data):
+    """
+    This function finds offsets of chunks of data in chunked format without decrypting it,
+    we need it to migrate databases of older versions to .dba files.
+    :param data:
+    data in chunked format, type: byte string
+    :return:
+    offsets of chunks, type: list
+    :raises InvalidToken:
+    if data is corrupted
+    """
+    offsets = []
+    offset = HEADER.size
+    while True:
+        record = data[offset : offset + CHUNK_HEADER.size]
+        if len(record) != CHUNK_HEADER.size:
+            raise InvalidToken
+        last, length = CHUNK_HEADER.unpack(record)
+        offsets.append(offset)
+        offset += CHUNK_HEADER.size + length
+        if last:
+            break
+    if offset != len(data):
+        raise InvalidToken
+    return offsets
+
+
+def readIndexed(view, offsets, key):
+    """
+    This function decrypts data in chunked format using offsets of its chunks, it doesn't copy
+    encrypted chunks, they are decrypted right from the view (e.g. of the mapped file) into
+    buffer that is allocated once.
+    :param view:
+    data in chunked format, type: memoryview
+    :param offsets:
+    offsets of chunks (see writeStream), type: list
+    :param key:
+    key of the database
+    :return:
+    decrypted data, type: bytearray
+    :raises InvalidToken:
+    if key is wrong, data or offsets are corrupted
+    """
+    header = bytes(view[: HEADER.size])
+    if len(header) != HEADER.size or not offsets:
+        raise InvalidToken
+    magic, version, chunk_size, prefix = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise InvalidToken
+
+    # here we check all chunks before decryption, so we know size of decrypted data,
+    # chunks must follow each other without gaps, and the last one must end data
+    chunks = []
+    size = 0
+    expected = HEADER.size
+    for i, offset in enumerate(offsets):
+        record = bytes(view[offset : offset + CHUNK_HEADER.size])
+        if offset != expected or len(record) != CHUNK_HEADER.size:
+            raise InvalidToken
+        last, length = CHUNK_HEADER.unpack(record)
+        if last != (i == len(offsets) - 1) or not 16 <= length <= chunk_size + 16:
+            raise InvalidToken
+
+        start = offset + CHUNK_HEADER.size
+        expected = start + length
+        if expected > len(view):
+            raise InvalidToken
+        chunks.append((last, start, expected))
+
+        # encrypted chunk is 16 bytes (authentication tag) longer than plain one
+        size += length - 16
+
+    if expected != len(view):
+        raise InvalidToken
+
+    # and here we decrypt every chunk right into its place in the buffer
+    data = bytearray(size)
+    buffer = memoryview(data)
+    position = 0
+    for i, (last, start, end) in enumerate(chunks):
+        nonce = prefix + i.to_bytes(4, "big")
+        length = end - start - 16
+        try:
+            key.decryptChunkInto(
+                nonce,
+                view[start:end],
+                header + CHUNK_HEADER.pack(last, i),
+                buffer[position : position + length],
+            )
+        except InvalidTag as err:
+            raise InvalidToken from err
+        position += length
+    return data
+
+
+def readRest(file):
+    """
+    This function reads the rest of the file into buffer that is allocated once, unlike
+    file.read() that grows its result while it reads.
+    :param file:
+    file opened for binary reading
+    :return:
+    content of the file from current position to the end, type: memoryview
+    """
+    start = file.tell()
+    size = file.seek(0, os.SEEK_END) - start
+    file.seek(start)
+
+    buffer = memoryview(bytearray(size))
+    read = 0
+    while read < size:
+        count = file.readinto(buffer[read:])
+        if not count:
+            break
+        read += count
+    return buffer[:read]
+
+
+def readStream(file, key):
+    """
+    This function reads and decrypts data that is written by writeStream.
+    :param file:
+    file opened for binary reading
+    :param key:
+    key of the database
+    :return:
+    decrypted data, type: bytearray
+    :raises InvalidToken:
+    if key is wrong or file is corrupted
+    """
+    # here we read encrypted data at once and decrypt chunks right from it
+    data = readRest(file)
+    return readIndexed(data, indexStream(data), key)
+
+
+def decryptDatabase(dbname, key):
+    """
+    This function reads .dba file (or .db file if database isn't migrated yet) of the database
+    and decrypts it.
+    :param dbname:
+    name of the database
+    :param key:
+    key of the database (see deriveKey)
+    :return:
+    decrypted serialized database, type: byte string
+    """
+    path = databaseFile(dbname)
+    if os.path.exists(path):
+        # here we map .dba file to memory, so we read only header and index at first and
+        # chunks are decrypted right from the mapped file.
+        # NOTE: we don't close the map explicitly, it is closed when all views of it are gone
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return decryptContainer(memoryview(mapped), key)
+
+    # here we construct path to database by concatenating SRC_DIR constant,
+    # database name and .db extension
+    dbfile = f"{core.const.SRC_DIR}/" + dbname + ".db"
+
+    with open(dbfile, "rb") as db:
+        # here we check format of the database
+        if db.read(len(MAGIC)) == MAGIC:
+            db.seek(0)
+            return readStream(db, key)
+
+        db.seek(0)
+        token = db.read()
+
+    # database saved by older version is a single fernet token
+    return key.decrypt(token)
 
-def openDatabase(dbname, password):
+
+def decryptContainer(view, key):
+    """
+    This function decrypts body of .dba file.
+    :param view:
+    content of .dba file, type: memoryview
+    :param key:
+    key of the database
+    :return:
+    decrypted serialized database, type: bytearray
+    :raises InvalidToken:
+    if key is wrong or file is corrupted
+    """
+    salt, params, chunks, index, cipher, size = readContainerHeader(view)
+    if not size <= index <= len(view):
+        raise InvalidToken
+    if len(view) - index != chunks * INDEX_ENTRY.size:
+        raise InvalidToken
+
+    # databases migrated from older versions can have body that is a fernet token, it has
+    # no chunks
+    body = view[size:index]
+    if not chunks:
+        return key.decrypt(bytes(body))
+
+    offsets = [offset for (offset,) in INDEX_ENTRY.iter_unpack(view[index:])]
+    return readIndexed(body, offsets, key)
+
+
+def openDatabase(dbname, password, aside=None):
     """
     This function opens database by its name and password.
     :param dbname:
     represents name of database
     :param password:
-    represents password of database, must be byte string
+    represents password of database, must be byte string, or already derived key of the
+    database, type: Key
+    :param aside:
+    function that we call with new path of the journal if it can't be read and we set it
+    aside (see replayJournal)
     :return:
     opened database, type: dict
     """
+    # here we derive key from password and salt, then we decrypt and deserialize database.
+    key = password
+    if not isinstance(key, Key):
+        key = loadKey(dbname, password)
+    # decrypted database isn't copied while it is deserialized, and nothing refers to it
+    # afterwards (see akidump.loads_binary), so we wipe it right away
+    data = decryptDatabase(dbname, key)
+    try:
+        db = akidump.loads(memoryview(data))
+    finally:
+        wipeMemory(data)
 
-    # here we construct path to database and its salt file by concatenating SRC_DIR constant,
-    # database name and .db or .bin extension,
-    # SRC_DIR represents name of folder in which database files are stored.
-    dbfile = f"{core.const.SRC_DIR}/" + dbname + ".db"
-    saltfile = f"{core.const.SRC_DIR}/" + dbname + ".bin"
+    # then we apply changes that are saved in journal of the database
+    return replayJournal(dbname, db, key, aside)
 
-    with open(saltfile, "rb") as file:
-        salt = file.read()
-
-    # here we using fernet encryption function to decrypt and deserialize database.
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-        backend=default_backend(),
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(password))
-    f = Fernet(key)
 
-    with open(dbfile, "rb") as db:
-        token = db.read()
+def unlockDatabase(dbname, passwords):
+    """
+    This function opens database trying given passwords one by one.
+    :param dbname:
+    name of the database
+    :param passwords:
+    list of passwords, type: list of byte strings
+    :return:
+    index of the password that fits, opened database, its key and path where journal of the
+    database is set aside if it can't be read (otherwise None), or None if none of the
+    passwords fits
+    """
+    for i, password in enumerate(passwords):
+        key = loadKey(dbname, password)
+        aside = []
+        try:
+            db = openDatabase(dbname, key, aside.append)
+        except (InvalidSignature, InvalidToken):
+            key.zeroize()
+            continue
+        return i, db, key, aside[0] if aside else None
+    return None
 
-    data = f.decrypt(token)
-    db = akidump.loads(data)
 
-    return db
+def unlockInFolder(folder, dbname, passwords):
+    """
+    This function opens database from given folder trying given passwords one by one, processes
+    of the process pool don't share constants of the program with it, so we tell them where
+    databases are.
+    :param folder:
+    absolute path to folder with databases
+    :return:
+    the same as unlockDatabase
+    """
+    core.const.SRC_DIR = folder
+    return unlockDatabase(dbname, passwords)
+
+
+def unlockDatabases(names, passwords, workers=None):
+    """
+    This function opens several databases at once in process pool, key derivation of every
+    database takes the whole core, so databases are opened almost as fast as one of them.
+    :param names:
+    names of the databases
+    :param passwords:
+    list of passwords to try for each database, type: list of byte strings
+    :param workers:
+    number of processes, by default number of cores
+    :return:
+    generator that yields name of the database and result of unlockDatabase as soon as the
+    database is opened, if generator is closed databases that aren't opened yet are skipped
+    """
+    workers = min(len(names), workers or os.cpu_count() or 1)
+    if not workers:
+        return
+
+    # NOTE: we can't fork the program itself, it has other threads running (Qt, saving and so
+    # on) and forked process could inherit lock that some of them holds, so processes are forked
+    # from fork server, that is a separate single threaded process, it imports main module of
+    # the program once, and processes only get their task
+    context = multiprocessing.get_context("forkserver")
+    pool = ProcessPoolExecutor(workers, mp_context=context)
+    folder = os.path.abspath(core.const.SRC_DIR)
+    try:
+        futures = {
+            pool.submit(unlockInFolder, folder, name, passwords): name for name in names
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception:
+                # damaged database shouldn't prevent others from opening, so we report it as
+                # not opened
+                result = None
+            yield futures[future], result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 def encryptDatabase(dbname, db, password):
@@ -115,50 +1075,551 @@ def encryptDatabase(dbname, db, password):
     :param db:
     database, type: dict
     :param password:
-    password of the database, type: byte string
+    password of the database, type: byte string, or already derived key of the database,
+    type: Key, if you have one use it to avoid slow key derivation
     :return:
     encrypted database string
+    NOTE: use saveDatabase to save database to disk, it doesn't hold whole encrypted database
+    in memory.
     """
-    # here we construct path to salt file of database by concatenating SRC_DIR constant,
-    # database name and .bin extension
-    saltfile = f"{core.const.SRC_DIR}/" + dbname + ".bin"
+    key = password
+    if not isinstance(key, Key):
+        key = loadKey(dbname, password)
 
-    with open(saltfile, "rb") as file:
-        salt = file.read()
-
-    # here we using fernet encryption function to encrypt and serialize database.
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-        backend=default_backend(),
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(password))
-    f = Fernet(key)
-    data = akidump.dumps(db)
-    return f.encrypt(data)
+    # here we serialize and encrypt database.
+    file = io.BytesIO()
+    writeStream(file, key, akidump.dumps(db, SERIALIZER))
+    return file.getvalue()
+
+
+def saveDatabase(dbname, db, key):
+    """
+    This function serializes, encrypts and saves database to its .dba file.
+    :param dbname:
+    name of the database
+    :param db:
+    database, type: dict
+    :param key:
+    key of the database, type: Key
+    """
+    # here we move newly attached files to blob store, so .dba file contains only
+    # references to them
+    storeBlobs(dbname, db, key)
+    data = akidump.dumps(db, SERIALIZER)
+
+    # here we write .dba file, header we write at the end, when we know where chunks are
+    def write(file):
+        file.write(bytes(DBA_HEADER.size))
+        offsets = writeStream(file, key, data)
+        index = file.tell()
+        file.write(b"".join(INDEX_ENTRY.pack(offset) for offset in offsets))
+        file.seek(0)
+        header = packContainerHeader(
+            key.salt, key.params, len(offsets), index, key.cipher
+        )
+        file.write(header)
+
+    # .dba file we write atomically, so we never leave a broken database
+    writeFiles({databaseFile(dbname): write})
+
+    # now all changes are in .dba file, so we don't need journal and files of older versions
+    # anymore
+    removeJournal(dbname)
+    removeLegacyFiles(dbname)
+
+    # attached files that aren't referenced by database anymore we remove from blob store
+    removeUnusedBlobs(dbname, db)
+
+
+def saveChanges(dbname, db, key, changes):
+    """
+    This function saves only changed accounts of the database appending them to journal of
+    the database, so saving takes time proportional to the size of changes, not to the size
+    of the database.
+    When journal becomes too big (compared to the .dba file) we save the whole database
+    instead, which also clears the journal.
+    :param dbname:
+    name of the database
+    :param db:
+    database, type: dict
+    :param key:
+    key of the database, type: Key
+    :param changes:
+    names of accounts that are created, changed or deleted since the last save
+    """
+    dbfile = databaseFile(dbname)
+    journal = journalFile(dbname)
+
+    # journal can continue only .dba file of chunked format, and it must continue current one
+    snapshot = snapshotId(dbname) if os.path.exists(dbfile) else None
+    if snapshot is None:
+        return saveDatabase(dbname, db, key)
+    if os.path.exists(journal):
+        try:
+            base = journalBase(journal, key)
+        except (InvalidSignature, InvalidToken):
+            # journal we can't read we don't continue, but we keep it
+            setJournalAside(dbname)
+            return saveDatabase(dbname, db, key)
+        if base != snapshot:
+            return saveDatabase(dbname, db, key)
+        if os.path.getsize(journal) > os.path.getsize(dbfile) // 2:
+            return saveDatabase(dbname, db, key)
+    if not changes:
+        return
+
+    # here we split changes to changed (or created) accounts and deleted ones
+    changed = {name: db[name] for name in changes if name in db}
+    deleted = [name for name in changes if name not in db]
+
+    # new attached files of changed accounts go to blob store, as usual
+    storeBlobs(dbname, changed, key)
+
+    records = []
+    if deleted:
+        records.append((JOURNAL_DELETE, json.dumps(deleted).encode()))
+    if changed:
+        records.append((JOURNAL_PUT, akidump.dumps(changed, SERIALIZER)))
+
+    number = countJournal(journal) if os.path.exists(journal) else 0
+    # we can't replace journal atomically, because we append to it, but incomplete records
+    # at the end of journal are ignored, so a crash here loses only the changes being saved
+    with open(journal, "ab") as file:
+        for i, (operation, data) in enumerate(records, number):
+            token = io.BytesIO()
+            record = JOURNAL_RECORD.pack(operation, i, snapshot)
+            writeStream(token, key, record + data)
+            token = token.getvalue()
+            file.write(JOURNAL_LENGTH.pack(len(token)) + token)
+        file.flush()
+        os.fsync(file.fileno())
+
+    # new journal must be in its folder on disk too
+    if not number:
+        syncFolder(core.const.SRC_DIR)
+
+
+def journalFile(dbname):
+    """
+    This function returns path to journal of the database.
+    """
+    return f"{core.const.SRC_DIR}/" + dbname + ".log"
+
+
+def snapshotId(dbname):
+    """
+    This function returns id of .dba file of the database, it is nonce prefix from the header
+    of the chunked format and it is different every time database is saved.
+    :return:
+    id of the .dba file, type: byte string, or None if database is of the old format
+    """
+    dbfile = databaseFile(dbname)
+    if not os.path.exists(dbfile):
+        with open(legacyFiles(dbname)[0], "rb") as file:
+            header = file.read(HEADER.size)
+    else:
+        # body of .dba file starts right after its header, size of which depends on version
+        with open(dbfile, "rb") as file:
+            size = readContainerHeader(file.read(DBA_HEADER.size))[5]
+            file.seek(size)
+            header = file.read(HEADER.size)
+    if len(header) != HEADER.size or not header.startswith(MAGIC):
+        return None
+    return HEADER.unpack(header)[3]
+
+
+def readJournal(file, key):
+    """
+    This generator reads records of the journal one by one.
+    NOTE: if the last record is incomplete (e.g. program was killed while it was writing it)
+    we ignore it, as it never was saved.
+    :param file:
+    journal file opened for binary reading
+    :param key:
+    key of the database, type: Key
+    :return:
+    tuples of operation type, number of record, id of .dba file and operation data
+    :raises InvalidToken:
+    if key is wrong or journal is corrupted
+    """
+    while True:
+        length = file.read(JOURNAL_LENGTH.size)
+        if len(length) != JOURNAL_LENGTH.size:
+            return
+        (length,) = JOURNAL_LENGTH.unpack(length)
+        token = file.read(length)
+        if len(token) != length:
+            return
+
+        data = readStream(io.BytesIO(token), key)
+        if len(data) < JOURNAL_RECORD.size:
+            raise InvalidToken
+        operation, number, snapshot = JOURNAL_RECORD.unpack_from(data)
+        yield operation, number, snapshot, data[JOURNAL_RECORD.size :]
+
+
+def countJournal(journal):
+    """
+    This function counts complete records of the journal without decrypting them, incomplete
+    record at the end of the journal it cuts off, so we can append new records after it.
+    """
+    count = 0
+    offset = 0
+    size = os.path.getsize(journal)
+    with open(journal, "rb+") as file:
+        while True:
+            length = file.read(JOURNAL_LENGTH.size)
+            if len(length) != JOURNAL_LENGTH.size:
+                break
+            (length,) = JOURNAL_LENGTH.unpack(length)
+            if offset + JOURNAL_LENGTH.size + length > size:
+                break
+            offset += JOURNAL_LENGTH.size + length
+            file.seek(offset)
+            count += 1
+        file.truncate(offset)
+    return count
+
+
+def journalBase(journal, key):
+    """
+    This function returns id of .dba file the journal continues.
+    """
+    with open(journal, "rb") as file:
+        for operation, number, snapshot, data in readJournal(file, key):
+            return snapshot
+
+
+def replayJournal(dbname, db, key, aside=None):
+    """
+    This function applies changes saved in journal of the database to the database.
+    Database is already decrypted when we replay its journal, so key is right and journal that
+    can't be read (it's corrupted or encrypted with another key) doesn't prevent database from
+    opening, we set it aside (see setJournalAside) and open database without its changes.
+    :param dbname:
+    name of the database
+    :param db:
+    database loaded from .dba file, type: dict
+    :param key:
+    key of the database, type: Key
+    :param aside:
+    function that we call with new path of the journal if we set it aside
+    :return:
+    database with all saved changes, type: dict
+    """
+    journal = journalFile(dbname)
+    if not os.path.exists(journal):
+        return db
 
+    # here we read and check all records before we apply any of them, so database gets either
+    # all changes of the journal or none of them
+    base = snapshotId(dbname)
+    try:
+        # journal that continues another .dba file (e.g. program was killed right after it
+        # saved the whole database) is obsolete, all its changes are already in .dba file
+        if journalBase(journal, key) != base:
+            return db
 
-def newDatabase(dbname, password):
+        with open(journal, "rb") as file:
+            records = []
+            for i, (operation, number, snapshot, data) in enumerate(
+                readJournal(file, key)
+            ):
+                # records can't be reordered or copied from another journal
+                if number != i or snapshot != base:
+                    raise InvalidToken
+                records.append((operation, data))
+    except (InvalidSignature, InvalidToken):
+        path = setJournalAside(dbname)
+        if aside:
+            aside(path)
+        return db
+
+    for operation, data in records:
+        if operation == JOURNAL_PUT:
+            db.update(akidump.loads(data))
+        elif operation == JOURNAL_DELETE:
+            for name in json.loads(data):
+                db.pop(name, None)
+    return db
+
+
+def setJournalAside(dbname):
+    """
+    This function renames journal of the database that we can't read, so it doesn't prevent
+    database from opening or saving, but changes in it aren't lost if user can recover them.
+    :param dbname:
+    name of the database
+    :return:
+    new path of the journal
+    """
+    journal = journalFile(dbname)
+    path = f"{journal}.{time.strftime('%Y%m%d-%H%M%S')}.corrupt"
+    os.replace(journal, path)
+    return path
+
+
+def removeJournal(dbname):
+    """
+    This function removes journal of the database.
+    """
+    try:
+        os.remove(journalFile(dbname))
+    except FileNotFoundError:
+        pass
+
+
+def blobsFolder(dbname):
+    """
+    This function returns path to blob store of the database.
+    Blob store is a folder near the .dba file where each attached file is stored encrypted
+    in its own file (in chunked format), so we don't need to decrypt them every time we open
+    or save the database.
+    :param dbname:
+    name of the database
+    """
+    return f"{core.const.SRC_DIR}/" + dbname + ".blobs"
+
+
+def storeBlobs(dbname, db, key):
+    """
+    This function writes attached files that aren't in blob store yet to blob store of the
+    database and replaces their content in accounts with references to them.
+    :param dbname:
+    name of the database
+    :param db:
+    database, type: dict
+    :param key:
+    key of the database, type: Key
+    """
+    folder = blobsFolder(dbname)
+    blobs = {}
+    for account in db.values():
+        files = account.attached_files
+        for name in files:
+            content = files[name]
+            if isinstance(content, akidump.Blob):
+                continue
+
+            blob = akidump.Blob(key.blobId(content))
+            path = f"{folder}/{blob.id}"
+            if not os.path.exists(path):
+                blobs[path] = lambda file, content=content: writeStream(
+                    file, key, content
+                )
+            files[name] = blob
+
+    # here we write all new files at once
+    if blobs:
+        os.makedirs(folder, exist_ok=True)
+        writeFiles(blobs)
+
+
+def snapshotDatabase(db):
+    """
+    This function takes snapshot of the database, that we can save in another thread while
+    user keeps changing the database.
+    Account forms never change accounts of the database, they replace them with new ones, so
+    snapshot shares accounts with the database. We copy only accounts with attached files that
+    aren't in blob store yet, because saving replaces content of those files with references
+    to blob store (see storeBlobs).
+    :param db:
+    database, type: dict
+    :return:
+    snapshot of the database and list of pairs of copied accounts and their copies (see
+    adoptBlobs)
     """
-    This function creates empty database and saves it to file.
+    snapshot = dict(db)
+    copies = []
+    for name, account in snapshot.items():
+        files = account._files.values()
+        if any(not isinstance(content, akidump.Blob) for content in files):
+            snapshot[name] = account.copy()
+            copies.append((account, snapshot[name]))
+    return snapshot, copies
+
+
+def adoptBlobs(copies):
+    """
+    When snapshot of the database is saved, its copied accounts reference blob store instead of
+    holding content of attached files, here we make original accounts do the same, so we don't
+    keep content of those files in memory and don't store them again on the next save.
+    :param copies:
+    pairs of accounts and their copies returned by snapshotDatabase
+    """
+    for account, copy in copies:
+        files = copy._files
+        if all(isinstance(content, akidump.Blob) for content in files.values()):
+            account.attached_files = files
+
+
+def loadBlob(dbname, key, content):
+    """
+    This function returns content of attached file.
+    :param dbname:
+    name of the database
+    :param key:
+    key of the database, type: Key
+    :param content:
+    value from attached_files of account, it is either content of the file or Blob
+    :return:
+    content of the file, type: byte string
+    """
+    if not isinstance(content, akidump.Blob):
+        return content
+
+    path = f"{blobsFolder(dbname)}/{content.id}"
+    with open(path, "rb") as file:
+        return bytes(readStream(file, key))
+
+
+def loadBlobs(dbname, db, key):
+    """
+    This function loads content of all attached files of the database from blob store
+    replacing references to them, we need it when we reencrypt the database.
+    """
+    for account in db.values():
+        files = account.attached_files
+        for name in files:
+            files[name] = loadBlob(dbname, key, files[name])
+
+
+def removeUnusedBlobs(dbname, db):
+    """
+    This function removes files from blob store of the database that aren't referenced by
+    any account of the database.
+    """
+    folder = blobsFolder(dbname)
+    if not os.path.isdir(folder):
+        return
+
+    used = set()
+    for account in db.values():
+        for content in account.attached_files.values():
+            if isinstance(content, akidump.Blob):
+                used.add(content.id)
+
+    for blob in os.listdir(folder):
+        if blob not in used:
+            os.remove(f"{folder}/{blob}")
+
+
+def copyBlobs(dbname, newName):
+    """
+    This function copies blob store of the database to blob store of the database with another
+    name, we need it when database is renamed. Files in blob store are never changed (they are
+    named after their content and replaced atomically), so we link them instead of copying
+    when file system allows that.
+    :param dbname:
+    name of the database
+    :param newName:
+    another name of the database
+    """
+    folder = blobsFolder(dbname)
+    if not os.path.isdir(folder):
+        return
+
+    target = blobsFolder(newName)
+    os.makedirs(target, exist_ok=True)
+    for blob in os.listdir(folder):
+        path = f"{target}/{blob}"
+        if os.path.exists(path):
+            continue
+        try:
+            os.link(f"{folder}/{blob}", path)
+        except OSError:
+            shutil.copyfile(f"{folder}/{blob}", path)
+
+
+def removeBlobs(dbname):
+    """
+    This function removes blob store of the database, we call it when we delete the database.
+    """
+    shutil.rmtree(blobsFolder(dbname), ignore_errors=True)
+
+
+def newDatabase(dbname, password, key=None, db=None, cipher=None):
+    """
+    This function creates database and saves it to files, salt and database are written
+    together atomically.
     :param dbname:
     name of the database
     :param password:
     password of the database, type: byte string
+    :param key:
+    key derived from the same password, if it is given we reuse its salt and key instead of
+    generating new ones
+    :param db:
+    accounts of the database, type: dict, by default database is empty
+    :param cipher:
+    cipher of the database (see CIPHERS), by default CIPHER
+    :return:
+    key of the database, type: Key
     """
-    # here we construct path to database and its salt file by concatenating SRC_DIR constant,
-    # database name and .db or .bin extension,
-    # SRC_DIR represents name of folder in which database files are stored.
-    saltfile = f"{core.const.SRC_DIR}/" + dbname + ".bin"
-    dbfile = f"{core.const.SRC_DIR}/" + dbname + ".db"
+    # new keys are derived with parameters calibrated for this machine
+    if not key:
+        cipher = CIPHER if cipher is None else cipher
+        key = deriveKey(password, os.urandom(16), calibrateKdf(), cipher)
+
+    saveDatabase(dbname, db if db is not None else {}, key)
+    return key
+
+
+def migrateDatabase(dbname):
+    """
+    This function migrates database of older versions (.db and .bin files) to .dba file.
+    It doesn't need the key, because body of .dba file is just content of .db file.
+    :param dbname:
+    name of the database
+    """
+    dbfile, saltfile = legacyFiles(dbname)
+    if not (os.path.exists(dbfile) and os.path.exists(saltfile)):
+        return
+
+    # if .dba file already exists it is newer than .db file (program was killed right after
+    # it saved .dba file), so we only remove .db and .bin files
+    if not os.path.exists(databaseFile(dbname)):
+        with open(saltfile, "rb") as file:
+            salt, params = unpackSalt(file.read())
+        with open(dbfile, "rb") as file:
+            body = file.read()
 
-    generateSalt(saltfile)
-    token = encryptDatabase(dbname, {}, password)
+        # old databases are fernet tokens, they have no chunks
+        offsets = indexStream(body) if body.startswith(MAGIC) else []
+        index = DBA_HEADER.size + len(body)
+        header = packContainerHeader(salt, params, len(offsets), index)
+        entries = b"".join(INDEX_ENTRY.pack(offset) for offset in offsets)
+        writeFiles({databaseFile(dbname): header + body + entries})
 
-    with open(dbfile, "wb") as file:
-        file.write(token)
+    removeLegacyFiles(dbname)
+
+
+def removeLegacyFiles(dbname):
+    """
+    This function removes .db and .bin files of the database if there are any.
+    """
+    removed = False
+    for path in legacyFiles(dbname):
+        try:
+            os.remove(path)
+            removed = True
+        except FileNotFoundError:
+            pass
+    if removed:
+        syncFolder(core.const.SRC_DIR)
+
+
+def removeDatabase(dbname):
+    """
+    This function removes all files of the database.
+    """
+    try:
+        os.remove(databaseFile(dbname))
+    except FileNotFoundError:
+        pass
+    removeLegacyFiles(dbname)
+    removeJournal(dbname)
+    removeBlobs(dbname)
 
 
 def isEqual(first, second):
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+"""
+This module provides models for lists of the program.
+"""
+
+import bisect
+
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+class NamesModel(QAbstractListModel):
+    """
+    This class is a model of list of names (e.g. of databases or accounts).
+    Names are kept in sorted array, so we find, add and remove name using binary search without
+    sorting the whole list again. All rows share one icon, and rows are given to the view in
+    batches (see fetchMore), so even huge lists are shown instantly.
+    """
+
+    # this is how many rows view gets at once
+    BATCH = 1000
+
+    def __init__(self, names=(), icon=None, parent=None):
+        """
+        :param names:
+        names that model contains
+        :param icon:
+        path to icon that will be shown near every name
+        :param parent:
+        parent of the model
+        """
+        super().__init__(parent)
+        self.names = sorted(names)
+        self.iconPath = icon
+        self.icon = None
+        self.tooltips = {}
+        # number of rows that view already got
+        self.loaded = min(len(self.names), self.BATCH)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+
+        name = self.names[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role == Qt.DecorationRole and self.iconPath:
+            # we create icon only when it's needed for the first time and share it between
+            # all rows
+            if not self.icon:
+                self.icon = QIcon(self.iconPath)
+            return self.icon
+        if role == Qt.ToolTipRole:
+            return self.tooltips.get(name)
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.loaded < len(self.names)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(self.BATCH, len(self.names) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def fetchAll(self):
+        """
+        This method gives view all rows that it doesn't have yet.
+        """
+        count = len(self.names) - self.loaded
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def row(self, name):
+        """
+        This method returns row of the name or None if model doesn't contain it.
+        """
+        row = bisect.bisect_left(self.names, name)
+        if row < len(self.names) and self.names[row] == name:
+            return row
+        return None
+
+    def __contains__(self, name):
+        return self.row(name) is not None
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        """
+        This method adds name to the model keeping it sorted.
+        """
+        row = bisect.bisect_left(self.names, name)
+        if row < len(self.names) and self.names[row] == name:
+            return
+
+        # rows that view didn't get yet we just insert into array
+        if self.loaded < len(self.names) and row >= self.loaded:
+            self.names.insert(row, name)
+            return
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.insert(row, name)
+        self.loaded += 1
+        self.endInsertRows()
+
+    def remove(self, name):
+        """
+        This method removes name from the model if it's there.
+        """
+        row = self.row(name)
+        if row is None:
+            return
+        self.tooltips.pop(name, None)
+
+        if row >= self.loaded:
+            del self.names[row]
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.names[row]
+        self.loaded -= 1
+        self.endRemoveRows()
+
+    def setToolTip(self, name, tooltip):
+        """
+        This method sets tooltip of the name.
+        """
+        if tooltip is None:
+            self.tooltips.pop(name, None)
+        else:
+            self.tooltips[name] = tooltip
+
+        row = self.row(name)
+        if row is not None and row < self.loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ToolTipRole])
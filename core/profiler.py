@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+"""
+This module provides profiler of startup of PyQtAccounts.
+It's turned on by `--profile-startup` command line option (or `--profile-startup=<path>`),
+then PyQtAccounts records how long every phase of startup takes (imports, connection to X
+server, construction of widgets, git, settings etc.) and writes it to a trace file, that you can
+open in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# this is command line option that turns profiler on
+OPTION = "--profile-startup"
+
+# and this is file where we write trace by default
+TRACE_FILE = "startup-trace.json"
+
+
+class Profiler:
+    """
+    This class records phases of startup, time of every phase is counted from the moment
+    profiler is created (i.e. from the very beginning of startup).
+    When profiler is turned off it records nothing and costs nothing.
+    """
+
+    def __init__(self, enabled=False, path=TRACE_FILE):
+        """
+        :param enabled:
+        whether profiler records phases
+        :param path:
+        path to trace file
+        """
+        self.enabled = enabled
+        self.path = path
+        self.start = time.perf_counter()
+        # here are recorded phases: name, start, duration (in seconds) and name of thread
+        self.events = []
+
+    @classmethod
+    def fromArgs(cls, args):
+        """
+        This method creates profiler that is turned on if command line arguments contain
+        `--profile-startup` option.
+        """
+        for arg in args:
+            if arg == OPTION:
+                return cls(True)
+            if arg.startswith(OPTION + "="):
+                return cls(True, arg[len(OPTION) + 1 :])
+        return cls()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        This context manager records phase of startup that its body does.
+        :param name:
+        name of the phase, if there are several phases with the same name their times sum up
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        """
+        This method records phase that started and ended at given moments (perf_counter).
+        """
+        thread = threading.current_thread().name
+        self.events.append((name, start - self.start, end - start, thread))
+
+    def mark(self, name):
+        """
+        This method records moment of startup (e.g. when event loop starts).
+        """
+        if self.enabled:
+            now = time.perf_counter()
+            self.record(name, now, now)
+
+    def phases(self):
+        """
+        This method returns dict that maps names of phases to their total time in seconds.
+        """
+        result = {}
+        for name, _, duration, _ in self.events:
+            result[name] = result.get(name, 0) + duration
+        return result
+
+    def total(self):
+        """
+        This method returns time from the beginning of startup to the end of the last recorded
+        phase in seconds.
+        """
+        return max(
+            (start + duration for _, start, duration, _ in self.events), default=0
+        )
+
+    def write(self, path=None):
+        """
+        This method writes recorded phases to trace file in Trace Event Format, time in it is in
+        microseconds.
+        """
+        if not self.enabled:
+            return
+
+        threads = {}
+        events = []
+        for name, start, duration, thread in list(self.events):
+            tid = threads.setdefault(thread, len(threads) + 1)
+            events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": round(start * 1e6),
+                    "dur": round(duration * 1e6),
+                    "pid": 1,
+                    "tid": tid,
+                }
+            )
+        for thread, tid in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"name": thread},
+                }
+            )
+
+        trace = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "phases": self.phases(),
+            "total": self.total(),
+        }
+        # trace is written atomically, so nobody reads half-written file
+        path = path or self.path
+        with open(path + ".tmp", "w") as file:
+            json.dump(trace, file, indent=1)
+        os.replace(path + ".tmp", path)
+
+
+# here is profiler of the program, it's turned on from command line
+profiler = Profiler.fromArgs(sys.argv)
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+"""
+This module provides registry of databases (vaults) in `src` directory.
+Registry keeps in memory name, size, modification time, format version and number of accounts
+of every database, so we don't need to scan `src` directory each time we need list of
+databases or want to check whether database with some name exists.
+Registry is saved to `src` directory, so on start we load it instead of scanning directory,
+only names and modification times of databases are saved there, number of accounts is known
+only while the program runs, so that nothing about content of databases is written unencrypted.
+"""
+
+import json
+import os
+import struct
+from collections import namedtuple
+
+import core.const
+from core.getaki import (
+    DBA_MAGIC,
+    databaseFile,
+    legacyFiles,
+    migrateDatabase,
+    writeFiles,
+)
+from core.models import NamesModel
+from cryptography.fernet import InvalidToken
+
+from PyQt5.QtCore import *
+
+# name of the file in `src` directory where registry is saved
+REGISTRY_FILE = ".registry.json"
+
+# magic and format version at the beginning of .dba file
+VERSION_HEADER = struct.Struct(">4sB")
+
+# this is information about a database that registry keeps, `accounts` is None if number of
+# accounts is unknown (e.g. database was changed outside of the program)
+Vault = namedtuple("Vault", "name size mtime version accounts")
+
+
+def folderStamp(folder):
+    """
+    This function returns stamp of the folder that changes every time files are created,
+    removed or renamed in it, or None if folder doesn't exist.
+    """
+    try:
+        stat = os.stat(folder)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def inspectVault(name, accounts=None, old=None):
+    """
+    This function returns information about database reading only header of its file.
+    :param name:
+    name of the database
+    :param accounts:
+    number of accounts in the database if it's known
+    :param old:
+    information about the database we had before, if database file didn't change since then
+    we reuse it (together with number of accounts)
+    :return:
+    Vault or None if there is no such database
+    """
+    path = databaseFile(name)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # databases of older versions that aren't migrated yet consist of .db and .bin files
+        # and have format version 0
+        try:
+            stat = os.stat(f"{core.const.SRC_DIR}/{name}.db")
+        except OSError:
+            return None
+        return Vault(name, stat.st_size, stat.st_mtime_ns, 0, accounts)
+
+    if (
+        accounts is None
+        and old
+        and (old.size, old.mtime) == (stat.st_size, stat.st_mtime_ns)
+    ):
+        return old
+
+    with open(path, "rb") as file:
+        header = file.read(VERSION_HEADER.size)
+    version = None
+    if len(header) == VERSION_HEADER.size:
+        magic, version = VERSION_HEADER.unpack(header)
+        if magic != DBA_MAGIC:
+            version = None
+    return Vault(name, stat.st_size, stat.st_mtime_ns, version, accounts)
+
+
+class Registry(QObject):
+    """
+    This class is registry of databases, it's also a model of database list.
+    Registry follows `src` directory: it refreshes when files in the directory change (we use
+    QFileSystemWatcher for that) and when SRC_DIR constant changes (it does so in tests).
+    """
+
+    # this signal is emitted when databases are added, removed or changed
+    changed = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.folder = None
+        self.stamp = None
+        self.vaults = {}
+        self.model = NamesModel(icon="img/icon.svg")
+        self.watcher = None
+
+    def __contains__(self, name):
+        """
+        Here we check whether database with given name exists, it's a set lookup plus one stat
+        of `src` directory.
+        """
+        self.sync()
+        return name in self.vaults
+
+    def __iter__(self):
+        self.sync()
+        return iter(list(self.model.names))
+
+    def __len__(self):
+        self.sync()
+        return len(self.vaults)
+
+    def __getitem__(self, name):
+        """
+        This method returns information about database with given name (Vault).
+        """
+        self.sync()
+        return self.vaults[name]
+
+    def sync(self):
+        """
+        This method makes sure that registry corresponds to `src` directory.
+        If SRC_DIR constant changed we load registry of new directory, if files in the directory
+        were changed we refresh registry, otherwise it does nothing.
+        """
+        if self.folder != core.const.SRC_DIR:
+            self.load()
+        elif folderStamp(self.folder) != self.stamp:
+            self.refresh()
+
+    def load(self):
+        """
+        This method loads registry of `src` directory from registry file, and if registry file
+        is outdated (i.e. directory changed after registry file was written) it scans directory.
+        """
+        self.folder = core.const.SRC_DIR
+        self.watch()
+
+        path = f"{self.folder}/{REGISTRY_FILE}"
+        try:
+            # we touch registry file every time we write it, so if the directory changed later
+            # its modification time is bigger
+            if os.stat(self.folder).st_mtime_ns <= os.stat(path).st_mtime_ns:
+                # size, format version and number of accounts aren't saved to registry file
+                with open(path) as file:
+                    vaults = [
+                        Vault(name, None, mtime, None, None)
+                        for name, mtime in json.load(file)
+                    ]
+                self.stamp = folderStamp(self.folder)
+                self.setVaults({vault.name: vault for vault in vaults}, save=False)
+                return
+        except (OSError, ValueError, TypeError):
+            pass
+        self.refresh()
+
+    def watch(self):
+        """
+        This method makes QFileSystemWatcher watch `src` directory (instead of the old one).
+        """
+        if not self.watcher:
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.directoryChanged.connect(self.sync)
+
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        if os.path.isdir(self.folder):
+            self.watcher.addPath(self.folder)
+
+    def refresh(self):
+        """
+        This method scans `src` directory and updates registry.
+        """
+        self.stamp = folderStamp(self.folder)
+        names = set()
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    name, extension = os.path.splitext(entry.name)
+                    if extension in (".dba", ".db"):
+                        names.add(name)
+        except OSError:
+            pass
+
+        vaults = {}
+        for name in names:
+            vault = inspectVault(name, old=self.vaults.get(name))
+            if vault:
+                vaults[name] = vault
+        self.setVaults(vaults)
+
+    def migrate(self):
+        """
+        This method migrates databases of older versions (.db and .bin files) to .dba files, we
+        call it on start.
+        Format version isn't saved to registry file, so if registry is loaded from it we check
+        every database whose version is unknown, it's one stat per database.
+        """
+        self.sync()
+        migrated = False
+        for name, vault in list(self.vaults.items()):
+            if vault.version not in (0, None) or not os.path.exists(
+                legacyFiles(name)[0]
+            ):
+                continue
+            try:
+                migrateDatabase(name)
+                migrated = True
+            except (OSError, InvalidToken, struct.error):
+                # database will be migrated on the next start, e.g. when it's copied completely
+                pass
+        if migrated:
+            self.refresh()
+
+    def update(self, name, accounts=None):
+        """
+        This method updates information about database in the registry, we call it every time
+        we create or save a database.
+        :param name:
+        name of the database
+        :param accounts:
+        number of accounts in the database, if it's known
+        """
+        self.sync()
+        vaults = dict(self.vaults)
+        vault = inspectVault(name, accounts, self.vaults.get(name))
+        if vault:
+            vaults[name] = vault
+        else:
+            vaults.pop(name, None)
+        self.stamp = folderStamp(self.folder)
+
+        # we call it after every save of the database, so we write registry file only when
+        # database is added or removed, otherwise only number of accounts and modification
+        # time change and they aren't worth writing to disk on every save
+        self.setVaults(vaults, save=(name in vaults) != (name in self.vaults))
+
+    def remove(self, name):
+        """
+        This method removes database from the registry, we call it when we delete database.
+        """
+        self.sync()
+        vaults = dict(self.vaults)
+        vaults.pop(name, None)
+        self.stamp = folderStamp(self.folder)
+        self.setVaults(vaults)
+
+    def setVaults(self, vaults, save=True):
+        """
+        This method replaces content of registry with `vaults` updating only those rows of the
+        model that changed.
+        :param vaults:
+        dict of Vault instances
+        :param save:
+        whether we should save registry to registry file
+        """
+        if vaults == self.vaults:
+            return
+
+        for name in set(self.vaults) - set(vaults):
+            self.model.remove(name)
+
+        for name, vault in vaults.items():
+            if vault == self.vaults.get(name):
+                continue
+            self.model.add(name)
+            if vault.accounts is None:
+                self.model.setToolTip(name, None)
+            else:
+                self.model.setToolTip(name, f"Акаунтів: {vault.accounts}")
+
+        self.vaults = vaults
+        if save:
+            self.save()
+        self.changed.emit()
+
+    def save(self):
+        """
+        This method saves registry to registry file.
+        """
+        if self.stamp is None:
+            return
+
+        path = f"{self.folder}/{REGISTRY_FILE}"
+        data = json.dumps(
+            [[vault.name, vault.mtime] for vault in self.vaults.values()]
+        ).encode()
+        try:
+            writeFiles({path: data})
+            os.utime(path)
+        except OSError:
+            # registry file is only a cache, we can always scan directory instead
+            return
+        self.stamp = folderStamp(self.folder)
+
+
+# this is the registry of databases that all parts of the program share
+registry = Registry()
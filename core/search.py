@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+"""
+This module provides search of accounts: index of account fields and proxy model that filters
+account list using the index.
+"""
+
+import bisect
+import heapq
+import re
+from collections import defaultdict
+
+from core.utils import normalName
+
+from PyQt5.QtCore import *
+
+# here are attributes of account that search looks in, account name must be the first
+FIELDS = ("account", "name", "email", "comment")
+
+# length of prefixes of words that we index, shorter queries are answered by them
+PREFIX = 2
+
+# ranks of matches, the smaller the rank the higher match is in results
+EXACT, PREFIX_MATCH, NAME_MATCH, FIELD_PREFIX, FIELD_MATCH, FUZZY = range(6)
+
+
+def trigrams(text):
+    """
+    This function returns set of all 3 character substrings of text.
+    """
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def prefixes(text):
+    """
+    This function returns set of prefixes (up to PREFIX characters) of all words of text.
+    """
+    result = set()
+    for word in re.split(r"[\W_]+", text):
+        for length in range(1, min(len(word), PREFIX) + 1):
+            result.add(word[:length])
+    return result
+
+
+def rank(texts, query):
+    """
+    This function ranks account that matches the query.
+    :param texts:
+    normalized fields of account
+    :param query:
+    normalized query
+    """
+    account = texts[0]
+    if account == query:
+        return EXACT
+    if account.startswith(query):
+        return PREFIX_MATCH
+    if query in account:
+        return NAME_MATCH
+    if any(text.startswith(query) for text in texts[1:]):
+        return FIELD_PREFIX
+    return FIELD_MATCH
+
+
+class SearchIndex:
+    """
+    This class is an index of accounts for search.
+    For every account it keeps its normalized fields (account name, name, e-mail and comment),
+    it also maps every trigram of those fields and every short prefix of their words to names
+    of accounts that contain them, so we find candidates without looking at every account.
+    Database window updates the index every time database changes (see DbWindow.changed).
+    Building the index takes time proportional to size of the database, so we build it only
+    when user searches for the first time, not when database is opened.
+    """
+
+    def __init__(self, db):
+        """
+        :param db:
+        database, type: dict
+        """
+        self.db = db
+        self.built = False
+        self.texts = {}
+        self.trigrams = defaultdict(set)
+        self.prefixes = defaultdict(set)
+        # here are sorted pairs of normalized account name and name of account, we use them to
+        # find accounts which names start with query without looking at other accounts
+        self.sorted = []
+        # version changes every time index changes, so results can be cached
+        self.version = 0
+
+    def build(self):
+        """
+        This method builds the index from all accounts of the database.
+        """
+        for name, account in self.db.items():
+            self.add(name, account, insort=False)
+        self.sorted.sort()
+        self.built = True
+
+    def add(self, name, account, insort=True):
+        """
+        This method adds account to the index.
+        :param insort:
+        whether we keep `sorted` list sorted, when we build the whole index we sort it once
+        at the end
+        """
+        texts = tuple(normalName(getattr(account, field)) for field in FIELDS)
+        self.texts[name] = texts
+        if insort:
+            bisect.insort(self.sorted, (texts[0], name))
+        else:
+            self.sorted.append((texts[0], name))
+
+        grams = set()
+        words = set()
+        for text in texts:
+            grams.update(trigrams(text))
+            words.update(prefixes(text))
+        for gram in grams:
+            self.trigrams[gram].add(name)
+        for prefix in words:
+            self.prefixes[prefix].add(name)
+
+    def remove(self, name):
+        """
+        This method removes account from the index if it's there.
+        """
+        texts = self.texts.pop(name, None)
+        if texts is None:
+            return
+
+        row = bisect.bisect_left(self.sorted, (texts[0], name))
+        if row < len(self.sorted) and self.sorted[row] == (texts[0], name):
+            del self.sorted[row]
+
+        keys = [(self.trigrams, trigrams(text)) for text in texts]
+        keys += [(self.prefixes, prefixes(text)) for text in texts]
+        for index, values in keys:
+            for key in values:
+                names = index.get(key)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del index[key]
+
+    def update(self, db, names):
+        """
+        This method updates the index after accounts with given names were created, changed
+        or deleted in the database.
+        """
+        # index that isn't built yet will take all changes from the database when it's built
+        if self.built:
+            for name in names:
+                self.remove(name)
+                if name in db:
+                    self.add(name, db[name])
+        self.version += 1
+
+    def search(self, query, limit=None):
+        """
+        This method searches accounts.
+        :param query:
+        text that user typed in search field
+        :param limit:
+        if it's given, we may return only `limit` best matches (if there are at least `limit`
+        accounts which names start with the query), this is much faster for short queries that
+        match lots of accounts
+        :return:
+        dict that maps names of found accounts to their ranks, or None if query is empty (i.e.
+        all accounts match it). If nothing contains the query we return accounts that share
+        many of its trigrams (so typos are forgiven).
+        """
+        query = normalName(query)
+        if not query:
+            return None
+        if not self.built:
+            self.build()
+
+        if limit is not None:
+            best = self.bestMatches(query, limit)
+            if best is not None:
+                return best
+
+        # short queries are matched against beginnings of words
+        if len(query) < 3:
+            names = self.prefixes.get(query, ())
+            return {name: rank(self.texts[name], query) for name in names}
+
+        # here we intersect sets of accounts that contain every trigram of the query starting
+        # from the smallest one, and then we check that they really contain the query
+        grams = sorted(
+            (self.trigrams.get(gram, ()) for gram in trigrams(query)), key=len
+        )
+        candidates = set(grams[0]).intersection(*grams[1:])
+        result = {}
+        for name in candidates:
+            texts = self.texts[name]
+            if any(query in text for text in texts):
+                result[name] = rank(texts, query)
+        if result:
+            return result
+
+        # fuzzy search: accounts that contain at least third of trigrams of the query (one typo
+        # spoils up to three trigrams)
+        counts = {}
+        for names in grams:
+            for name in names:
+                counts[name] = counts.get(name, 0) + 1
+        needed = max(2, len(grams) // 3)
+        return {
+            name: FUZZY + len(grams) - count
+            for name, count in counts.items()
+            if count >= needed
+        }
+
+    def bestMatches(self, query, limit):
+        """
+        This method returns `limit` first (in order of normalized names) accounts which names
+        start with the query, there are no better matches than them. If there are less than
+        `limit` such accounts it returns None.
+        :param query:
+        normalized query
+        """
+        result = {}
+        row = bisect.bisect_left(self.sorted, (query,))
+        for text, name in self.sorted[row : row + limit]:
+            if not text.startswith(query):
+                return None
+            result[name] = EXACT if text == query else PREFIX_MATCH
+        return result if len(result) == limit else None
+
+
+class GlobalSearch:
+    """
+    This class searches accounts in all opened databases at once.
+    Every database window has its own search index (see DbWindow), here we merge indexes of
+    all windows that are opened now: index of database joins the global search when database
+    is unlocked, follows all changes of the database and leaves it when window is closed
+    (i.e. removed from the list of windows).
+    """
+
+    # this is how many results we return at most
+    LIMIT = 100
+
+    def __init__(self, windows):
+        """
+        :param windows:
+        list of all application windows, first is the main window
+        """
+        self.windows = windows
+        # here are search indexes of opened databases by their names
+        self.indexes = {}
+        # and here we cache results of the last search
+        self.key = None
+        self.results = []
+
+    def sync(self):
+        """
+        This method takes search indexes of all opened databases, indexes of closed databases
+        are forgotten.
+        """
+        self.indexes = {win.name: win.search for win in self.windows[1:]}
+
+    def search(self, query, limit=LIMIT):
+        """
+        This method searches accounts in all opened databases.
+        :param query:
+        text that user typed in search field
+        :param limit:
+        how many results we return at most
+        :return:
+        list of (rank, account name, database name) tuples of the best matches sorted by rank
+        and then by name, list is empty if query is empty
+        """
+        self.sync()
+
+        # results are valid until query or some of indexes changes
+        versions = tuple((name, index.version) for name, index in self.indexes.items())
+        key = (query, limit, versions)
+        if key == self.key:
+            return self.results
+
+        # here we order matches of the same rank by normalized names, as indexes give us best
+        # matches in that order
+        results = []
+        for database, index in self.indexes.items():
+            ranks = index.search(query, limit)
+            if ranks:
+                texts = index.texts
+                results.extend(
+                    (rank, texts[name][0], name, database)
+                    for name, rank in ranks.items()
+                )
+
+        best = heapq.nsmallest(limit, results)
+        self.results = [(rank, name, database) for rank, _, name, database in best]
+        self.key = key
+        return self.results
+
+
+class SearchProxy(QSortFilterProxyModel):
+    """
+    This class is a proxy model of account list, it shows only accounts that match search query
+    and orders them by rank.
+    """
+
+    def __init__(self, index, parent=None):
+        """
+        :param index:
+        search index of the database (SearchIndex)
+        """
+        super().__init__(parent)
+        self.searchIndex = index
+        self.query = ""
+        self.ranks = None
+        self.version = None
+
+    def setQuery(self, query):
+        """
+        This method changes search query and filters the list.
+        """
+        self.query = query
+        self.version = None
+
+        # model of account list gives rows lazily, but we search among all accounts
+        if query and hasattr(self.sourceModel(), "fetchAll"):
+            self.sourceModel().fetchAll()
+        self.invalidate()
+
+        # without query we keep order of the source model (it's sorted already), so we don't
+        # compare rows by rank for nothing
+        self.sort(0 if query else -1)
+
+    def currentRanks(self):
+        """
+        This method returns ranks of accounts that match the query, results are cached until
+        query or index changes.
+        """
+        index = self.searchIndex
+        if self.version != index.version:
+            self.ranks = index.search(self.query)
+            self.version = index.version
+        return self.ranks
+
+    def filterAcceptsRow(self, row, parent):
+        ranks = self.currentRanks()
+        if ranks is None:
+            return True
+        return self.sourceModel().index(row, 0, parent).data() in ranks
+
+    def lessThan(self, left, right):
+        ranks = self.currentRanks() or {}
+        left, right = left.data(), right.data()
+        return (ranks.get(left, 0), left) < (ranks.get(right, 0), right)
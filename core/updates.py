@@ -56,6 +56,7 @@ import threading
 
 from core.const import *
 import core.const
+from core.profiler import profiler
 from core.utils import *
 from core.widgets import *
 
@@ -99,13 +100,15 @@ class Updating(QObject):
         """
         import git
 
-        repo = git.Repo(".")
-        origin = repo.remote()
-        origin.fetch()
+        with profiler.phase("update check"):
+            repo = git.Repo(".")
+            origin = repo.remote()
+            origin.fetch()
 
-        # we fetch all changes and if there new ones then changes list wouldn't be empty
-        # also we get changelog which we will show at the updating dialog if there are updates
-        changes = list(repo.iter_commits("master..origin/master"))
+            # we fetch all changes and if there new ones then changes list wouldn't be empty
+            # also we get changelog which we will show at the updating dialog if there are
+            # updates
+            changes = list(repo.iter_commits("master..origin/master"))
 
         # here we obtain changelog only if necessary, when there are changes,
         # because if we will obtain it always then OS will cache it and user may
@@ -212,16 +215,27 @@ class ShowChangelog(QDialog):
         self.resize(800, 500)
         self.show()
 
-        # here we get current version of PyQtAccounts, parse changelog and set all this as
-        # labels text
-        version = getVersion()
-        changelog = "<h4>PyQtAccounts {}:</h4><ul>".format(version)
+        # here we parse changelog and set it as labels text, current version of PyQtAccounts
+        # we add to it later, when we get it
+        self.changes = ""
         for change in open("change.log"):
-            changelog += "<li>{}</li>\n".format(change)
-        changelog += "</ul>"
-        self.changelogLabel = QLabel(changelog)
+            self.changes += "<li>{}</li>\n".format(change)
+        self.changelogLabel = QLabel()
         self.changelogLabel.setWordWrap(True)
+        self.setVersion("...")
 
         layout = QVBoxLayout()
         layout.addWidget(self.changelogLabel)
         self.setLayout(layout)
+
+        lookupVersion(self.setVersion)
+
+    def setVersion(self, version):
+        """
+        This method shows changelog with version of the program.
+        :param version:
+        version of the program
+        """
+        changelog = "<h4>PyQtAccounts {}:</h4><ul>".format(version)
+        changelog += self.changes + "</ul>"
+        self.changelogLabel.setText(changelog)
@@ -45,13 +45,17 @@
 This module provides helper functions for PyQtAccounts.
 """
 
-import glob
-
+import bisect
 import git
+import json
 import os
 import re
+import unicodedata
+from pathlib import Path
 
 import core.const
+from core.profiler import profiler
+from core.registry import registry
 
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
@@ -59,14 +63,11 @@ from PyQt5.QtCore import *
 
 def getDbList():
     """
-    This function returns list of databases in your `src` directory, path to which is defined by
-    SRC_DIR constant from core.const module.
-    Function finds databases by their .db files.
+    This function returns sorted list of databases in your `src` directory, path to which is
+    defined by SRC_DIR constant from core.const module.
+    Function doesn't scan the directory, it takes databases from the registry.
     """
-    return [
-        os.path.basename(db).replace(".db", "")
-        for db in glob.glob(f"{core.const.SRC_DIR}/*.db")
-    ]
+    return list(registry)
 
 
 def getAkiList(db):
@@ -76,14 +77,227 @@ def getAkiList(db):
     return [acc for acc in db]
 
 
+def normalName(name):
+    """
+    This function returns normalized form of account name, names that differ only in case,
+    surrounding spaces or unicode representation have the same normalized form.
+
+    Example of usage:
+    >>> normalName(' Gmail ') == normalName('GMAIL')
+    True
+    """
+    return unicodedata.normalize("NFKC", name).strip().casefold()
+
+
+class NameIndex:
+    """
+    This class is an index of account names of the database.
+    Account forms use it to check whether account with some name already exists and to warn
+    user about accounts with similar names, both in constant time.
+    Database window updates the index every time database changes (see DbWindow.changed), so
+    we don't build list of names on every keystroke.
+    """
+
+    def __init__(self, db):
+        """
+        Here we build the index from all accounts of the database.
+        :param db:
+        database, type: dict
+        """
+        self.names = set()
+        # normalized names map to sets of names, because several accounts can have the same
+        # normalized name
+        self.normal = {}
+        for name in db:
+            self.add(name)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        """
+        This method adds account name to the index.
+        """
+        self.names.add(name)
+        self.normal.setdefault(normalName(name), set()).add(name)
+
+    def discard(self, name):
+        """
+        This method removes account name from the index if it's there.
+        """
+        if name not in self.names:
+            return
+        self.names.discard(name)
+        normal = normalName(name)
+        self.normal[normal].discard(name)
+        if not self.normal[normal]:
+            del self.normal[normal]
+
+    def similar(self, name, exclude=None):
+        """
+        This method returns name of existing account that is similar to `name` (but not the
+        same), or None if there is no such account.
+        :param name:
+        name that user is typing
+        :param exclude:
+        name of the account being edited, it isn't similar to itself
+        """
+        for other in self.normal.get(normalName(name), ()):
+            if other not in (name, exclude):
+                return other
+
+    def update(self, db, names):
+        """
+        This method updates the index after accounts with given names were created, changed
+        or deleted in the database.
+        """
+        for name in names:
+            if name in db:
+                self.add(name)
+            else:
+                self.discard(name)
+
+
+# here we cache version of the program, it can't change while the program is running
+_version = None
+
+# here we keep version lookups that are still running
+_lookups = set()
+
+
+def headCommit():
+    """
+    This function returns commit that program repository is currently at.
+    We read it straight from .git folder instead of asking git, because it's much faster.
+    :return:
+    hash of the commit or None if we can't find it
+    """
+    try:
+        head = Path(".git/HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            # detached HEAD contains commit hash itself
+            return head
+
+        ref = head[5:]
+        if Path(".git", ref).exists():
+            return Path(".git", ref).read_text().strip()
+
+        # refs that git already packed are stored in packed-refs file
+        for line in Path(".git/packed-refs").read_text().splitlines():
+            if line.endswith(" " + ref):
+                return line.split()[0]
+    except OSError:
+        pass
+    return None
+
+
+def readVersionFile():
+    """
+    This function reads version of the program from version file.
+    :return:
+    version of the program or None if there is no version file or it is out of date, i.e. it
+    was written for another commit (for example program was updated since then)
+    """
+    try:
+        info = json.loads(Path(core.const.VERSION_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+    if info.get("commit") != headCommit():
+        return None
+    return info.get("version")
+
+
+def writeVersionFile(version):
+    """
+    This function saves version of the program to version file, so next time we will not need
+    git to get it.
+    :param version:
+    version of the program
+    """
+    info = {"version": version, "commit": headCommit()}
+    try:
+        Path(core.const.VERSION_FILE).write_text(json.dumps(info))
+    except OSError:
+        # it's only a cache, if we can't write it we will simply ask git again next time
+        pass
+
+
+def cachedVersion():
+    """
+    This function returns version of the program if we can get it without git.
+    :return:
+    version of the program or None if we need git to get it
+    """
+    global _version
+    if _version is None:
+        _version = readVersionFile()
+    return _version
+
+
 def getVersion():
     """
     This function returns current version of the program.
-    Actually it returns last tag of program repository sorted by date.
+    We resolve it only once per process, at first we look into version file and only if it's
+    missing or out of date we ask git for the last tag of program repository sorted by date
+    (this is slow, so better call it not from UI thread, see lookupVersion).
+    """
+    global _version
+    version = cachedVersion()
+    if version is None:
+        with profiler.phase("git"):
+            repo = git.Repo(".")
+            tags = sorted(repo.tags, key=lambda t: t.commit.committed_datetime)
+        version = str(tags[-1]) if tags else ""
+        writeVersionFile(version)
+        _version = version
+    return version
+
+
+class VersionLookup(QObject):
+    """
+    This class represents process that gets version of the program from git.
+    """
+
+    # this is a signal that instance emits with version of the program
+    result = pyqtSignal(str)
+
+    def run(self):
+        """
+        This method gets version of the program and emits it using result signal.
+        """
+        self.result.emit(getVersion())
+
+
+def lookupVersion(callback):
+    """
+    This function passes version of the program to callback.
+    If version is cached or version file is up to date callback is called immediately, otherwise
+    we get version from git in separate thread, so that UI doesn't freeze.
+    :param callback:
+    function that accepts version of the program
     """
-    repo = git.Repo(".")
-    tags = sorted(repo.tags, key=lambda t: t.commit.committed_datetime)
-    return tags[-1]
+    version = cachedVersion()
+    if version is not None:
+        callback(version)
+        return
+
+    thread = QThread()
+    lookup = VersionLookup()
+    lookup.moveToThread(thread)
+    lookup.result.connect(callback)
+    lookup.result.connect(thread.quit)
+    thread.started.connect(lookup.run)
+
+    # here we save references to thread and lookup object until thread finishes, otherwise they
+    # would be garbage collected (or destroyed together with widget that waits for the version)
+    # before lookup does its work
+    _lookups.add((thread, lookup))
+    thread.finished.connect(lambda: _lookups.discard((thread, lookup)))
+    thread.start()
 
 
 def hide(*args):
@@ -95,6 +309,41 @@ def hide(*args):
             arg[widget].hide()
 
 
+class LazyForms(dict):
+    """
+    This class is a dict of forms that creates every form only when it's needed for the first
+    time, so windows appear without building forms that user may never open.
+    Iterating over it gives only forms that are already created, so e.g. `hide` hides only
+    them (forms that aren't created yet aren't shown anyway).
+    """
+
+    def __init__(self, factories):
+        """
+        :param factories:
+        dict that maps names of forms to functions that create them
+        """
+        super().__init__()
+        self.factories = factories
+        self.setups = []
+
+    def __missing__(self, name):
+        form = self.factories[name]()
+        self[name] = form
+        for setup in self.setups:
+            setup(name, form)
+        return form
+
+    def setup(self, function):
+        """
+        This method registers function that is called with name of every form and the form
+        itself when form is created (and right now for forms that are already created), windows
+        use it to give forms their lists, tips etc.
+        """
+        self.setups.append(function)
+        for name, form in list(self.items()):
+            function(name, form)
+
+
 def validName(name):
     """
     This function returns validated name (i.e. without unallowed characters).
@@ -143,36 +392,105 @@ class Index:
         return self.name
 
 
-def set_form_completers(form, db):
+class CompletionIndex:
     """
-    We use this function to set completion for name, email and account name
-    fields of the given form.
-    From `db` (which is database) we get all names,
-    emails and account names to create completers.
+    This class is an index of values that we use for completion in account forms: account
+    names, names (usernames) and e-mails of all accounts of the database.
+    Every field has a QStringListModel that all account forms share, and every value has
+    reference count (number of accounts that have it), so when account is created, edited or
+    deleted we change only rows of values that appeared or disappeared.
     """
 
-    # here we create sets of all emails, names and account names of
-    # accounts of given database, so we can use them for completion
-    emails = set()
-    names = set()
-    accountnames = set()
-    for account in db:
-        a = db[account]
-        accountnames.add(account)
-        emails.add(a.email)
-        names.add(a.name)
+    # here are fields of account forms that we complete and attributes of account for them
+    FIELDS = {
+        "accountInput": "account",
+        "nameInput": "name",
+        "emailInput": "email",
+    }
 
-    # here we create completer for email field of create account form
-    completer = QCompleter(emails)
-    completer.setCaseSensitivity(Qt.CaseInsensitive)
-    form.emailInput.setCompleter(completer)
+    def __init__(self, db):
+        """
+        Here we build the index from all accounts of the database.
+        :param db:
+        database, type: dict
+        """
+        self.models = {field: QStringListModel() for field in self.FIELDS}
+        # sorted values of every field, they are in the same order as rows of its model
+        self.values = {field: [] for field in self.FIELDS}
+        self.counts = {field: {} for field in self.FIELDS}
+        # values that we took from every account, so we know what to remove when it changes
+        self.entries = {}
+
+        for field, attribute in self.FIELDS.items():
+            counts = self.counts[field]
+            for account in db.values():
+                value = getattr(account, attribute)
+                if value:
+                    counts[value] = counts.get(value, 0) + 1
+            self.values[field] = sorted(counts)
+            self.models[field].setStringList(self.values[field])
 
-    # here we create completer for name field of create account form
-    completer = QCompleter(names)
-    completer.setCaseSensitivity(Qt.CaseInsensitive)
-    form.nameInput.setCompleter(completer)
+        for name, account in db.items():
+            self.entries[name] = self.entry(account)
+
+    def entry(self, account):
+        """
+        This method returns values of all fields of account.
+        """
+        return tuple(getattr(account, attribute) for attribute in self.FIELDS.values())
 
-    # here we create completer for accountname field of create account form
-    completer = QCompleter(accountnames)
-    completer.setCaseSensitivity(Qt.CaseInsensitive)
-    form.accountInput.setCompleter(completer)
+    def setCompleters(self, form):
+        """
+        This method sets completers for account name, name and e-mail fields of the form,
+        all completers use shared models of the index.
+        """
+        for field, model in self.models.items():
+            completer = QCompleter(model, form)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            getattr(form, field).setCompleter(completer)
+
+    def update(self, db, names):
+        """
+        This method updates the index after accounts with given names were created, changed
+        or deleted in the database.
+        """
+        for name in names:
+            old = self.entries.pop(name, None)
+            if old:
+                for field, value in zip(self.FIELDS, old):
+                    self.release(field, value)
+            if name in db:
+                self.entries[name] = new = self.entry(db[name])
+                for field, value in zip(self.FIELDS, new):
+                    self.acquire(field, value)
+
+    def acquire(self, field, value):
+        """
+        This method increases reference count of the value, and adds it to the model if it's
+        new.
+        """
+        if not value:
+            return
+        counts = self.counts[field]
+        counts[value] = counts.get(value, 0) + 1
+        if counts[value] == 1:
+            row = bisect.bisect_left(self.values[field], value)
+            self.values[field].insert(row, value)
+            model = self.models[field]
+            model.insertRows(row, 1)
+            model.setData(model.index(row), value)
+
+    def release(self, field, value):
+        """
+        This method decreases reference count of the value, and removes it from the model if
+        no account has it anymore.
+        """
+        if not value:
+            return
+        counts = self.counts[field]
+        counts[value] -= 1
+        if not counts[value]:
+            del counts[value]
+            row = bisect.bisect_left(self.values[field], value)
+            del self.values[field][row]
+            self.models[field].removeRows(row, 1)
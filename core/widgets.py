@@ -116,6 +116,16 @@ class Error(QLabel):
         self.setFont(font)
 
 
+class Warn(Error):
+    """
+    This class is a label that customized for warning, unlike error it has yellow color.
+    """
+
+    def __init__(self, text=""):
+        Error.__init__(self, text)
+        self.setStyleSheet("color: #be9117;")
+
+
 class PasswordField(QHBoxLayout):
     """
     This class is a password field that has button which shows and hides password.
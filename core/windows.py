@@ -46,10 +46,15 @@ This module provides all classes that represent windows or other big elements of
 """
 
 import tarfile
+import threading
+from functools import cached_property
 
 import core.const
 from core.account_forms import *
 from core.getaki import *
+from core.models import NamesModel
+from core.registry import registry
+from core.search import GlobalSearch, SearchIndex, SearchProxy
 from core.updates import *
 
 
@@ -67,12 +72,19 @@ def export(name, path, parent):
         # here we create tar file that contains database files
         # tarfile structure:
         # src
-        # ├── <database name>.bin
-        # └── <database name>.db
+        # ├── <database name>.dba
+        # ├── <database name>.log (only if database has unmerged journal)
+        # └── <database name>.blobs (only if database has attached files)
+        # NOTE: older versions exported .db and .bin files instead of .dba file, we can
+        # import such archives too
 
+        migrateDatabase(name)
         file = tarfile.open(path, "w")
-        file.add(f"{core.const.SRC_DIR}/{name}.db")
-        file.add(f"{core.const.SRC_DIR}/{name}.bin")
+        file.add(databaseFile(name))
+        if os.path.exists(journalFile(name)):
+            file.add(journalFile(name))
+        if os.path.isdir(blobsFolder(name)):
+            file.add(blobsFolder(name))
         file.close()
     except RecursionError:  # to prevent fatal python error
         raise
@@ -101,31 +113,34 @@ def _import(path, parent):
     try:
         # here we try to extract files from tarfile archive to program directory
         tar = tarfile.open(path)
-        for i, file in enumerate(tar.getmembers()):
+        files = []
+        for file in tar.getmembers():
+            # blob store and journal of the database are optional, so we skip them here
+            if ".blobs" in file.name or file.name.endswith(".log"):
+                continue
+
             # here we check integrity of the tarfile, if there are any database file missing
             # we throw an exception
-            if ".db" not in file.name and ".bin" not in file.name:
+            if os.path.splitext(file.name)[1] not in (".dba", ".db", ".bin"):
                 raise TypeError("Невірний файл!")
+            files.append(file)
 
-        # here we obtain name of the database through its files names
-        name = os.path.basename(file.name).replace(".db", "").replace(".bin", "")
-
-        # here we check whether number of files in archive is 2, if not we throw exception,
-        # because file might be corrupted
-        if i != 1:
+        # here we check whether archive contains .dba file or both .db and .bin files (archives
+        # of older versions), if not we throw exception, because file might be corrupted
+        extensions = sorted(os.path.splitext(file.name)[1] for file in files)
+        names = {os.path.splitext(os.path.basename(file.name))[0] for file in files}
+        if extensions not in ([".dba"], [".bin", ".db"]) or len(names) != 1:
             raise TypeError("Невірний файл!")
-        tar.extractall(core.const.SRC_PATH)
 
-        # and here we update database list
-        model = parent.dbs.list.model
-        _list = parent.dbs.list
+        # here we obtain name of the database through its files names
+        name = names.pop()
+        tar.extractall(core.const.SRC_PATH)
 
-        for item in model.findItems(name):
-            model.removeRow(item.row())
+        # databases of older versions we migrate to .dba file right away
+        migrateDatabase(name)
 
-        item = QStandardItem(_list.icon, name)
-        model.appendRow(item)
-        model.sort(0)
+        # and here we update database list
+        registry.update(name)
         parent.dbs.tips["help"].setText("Виберіть базу данних")
     except RecursionError:  # to prevent fatal python error
         raise
@@ -146,13 +161,17 @@ class Panel(QHBoxLayout):
     This class is a panel for buttons, it has 2 buttons: `add` and `edit`.
     """
 
-    def __init__(self, add, edit, delete=None):
+    def __init__(self, add, edit, delete=None, unlock=None):
         """
         This is constructor of the panel.
         :param add:
         function that called when user presses `add` button
         :param edit:
         function that called when user presses `edit` button
+        :param delete:
+        function that called when user presses `delete` button
+        :param unlock:
+        function that called when user presses `unlock` button
         """
         QHBoxLayout.__init__(self)
 
@@ -179,13 +198,22 @@ class Panel(QHBoxLayout):
             self.deleteButton.clicked.connect(delete)
             self.addWidget(self.deleteButton)
 
+        if unlock:
+            # this is `unlock` button it calls unlock function when user presses it.
+            self.unlockButton = QPushButton()
+            self.unlockButton.setIcon(QIcon("img/icon.svg"))
+            self.unlockButton.setIconSize(QSize(22, 22))
+            self.unlockButton.setToolTip("Відкрити декілька баз данних")
+            self.unlockButton.clicked.connect(unlock)
+            self.addWidget(self.unlockButton)
+
 
 class List(QListView):
     """
     This class is list of accounts or databases.
     """
 
-    def __init__(self, lst, icon, forms, windows, tips, select):
+    def __init__(self, lst, icon, forms, windows, tips, select, model=None):
         """
         This is constructor of the list.
         :param lst:
@@ -200,6 +228,8 @@ class List(QListView):
         list of all application tips.
         :param select:
         method that called when user chose item from list.
+        :param model:
+        model of the list (NamesModel), if it's given list shows it instead of `lst`.
         """
         QListView.__init__(self)
         self.forms = forms
@@ -208,14 +238,11 @@ class List(QListView):
         self.select = select
         self.index = None
 
-        # here we create list model and set this model to listview widget.
-        self.icon = QIcon(icon)
-        self.model = QStandardItemModel()
+        # here we create list model and set this model to listview widget, model gives rows
+        # to the list lazily, so all rows have the same height and list doesn't measure them
+        self.model = model if model is not None else NamesModel(lst, icon)
         self.setEditTriggers(QAbstractItemView.NoEditTriggers)
-
-        for name in lst:
-            item = QStandardItem(self.icon, name)
-            self.model.appendRow(item)
+        self.setUniformItemSizes(True)
         self.setModel(self.model)
 
         self.clicked.connect(self.selected)
@@ -275,26 +302,38 @@ class Dbs(QWidget):
         self.tips = tips
 
         # here we create database panel and list
-        self.panel = Panel(self.add, self.edit, self.delete)
+        self.panel = Panel(self.add, self.edit, self.delete, self.unlock)
+        # database list shows the registry of databases, so we don't scan `src` directory
         self.list = List(
-            sorted(getDbList()), "img/icon.svg", forms, windows, tips, selectDb
+            [], "img/icon.svg", forms, windows, tips, selectDb, registry.model
         )
 
-        # and here we assign some stuff to database forms, such as database list, database model,
-        # tips and forms
-        self.forms["edit"].model = self.list.model
-        self.forms["edit"].list = self.list
-        self.forms["edit"].tips = tips
-        self.forms["edit"].forms = forms
-
-        self.forms["create"].list = self.list
-        self.forms["create"].tips = tips
+        # and here we assign some stuff to database forms when they are created, such as
+        # database list, database model, tips and forms
+        self.forms.setup(self.setupForm)
 
         layout = QVBoxLayout()
         layout.addLayout(self.panel)
         layout.addWidget(self.list)
         self.setLayout(layout)
 
+    def setupForm(self, name, form):
+        """
+        This method assigns database list, tips and forms to database form when it's created.
+        :param name:
+        name of the form
+        :param form:
+        the form
+        """
+        if name == "edit":
+            form.model = self.list.model
+            form.list = self.list
+            form.tips = self.tips
+            form.forms = self.forms
+        elif name == "create":
+            form.list = self.list
+            form.tips = self.tips
+
     def add(self):
         """
         This method called when user presses `add` button on the panel.
@@ -311,6 +350,15 @@ class Dbs(QWidget):
         # self.list.index is index that represents currently chosen database at the list
         self.forms["edit"].setDb(self.list.index)
 
+    def unlock(self):
+        """
+        This method called when user presses `unlock` button on the panel.
+        It shows form that opens several databases at once.
+        """
+        hide(self.forms, self.tips)
+        self.forms["unlock"].setDbs()
+        self.forms["unlock"].show()
+
     def delete(self):
         """
         This method deletes database showing confirmation dialog.
@@ -335,16 +383,18 @@ class Dbs(QWidget):
 
         # If users answer is `Yes` we delete database
         if action == QMessageBox.Yes:
-            os.remove(f"{core.const.SRC_DIR}/{name}.db")
-            os.remove(f"{core.const.SRC_DIR}/{name}.bin")
+            # database window can't save database anymore, otherwise it could bring database
+            # back
+            window = next((win for win in self.windows if win.name == name), None)
+            if window:
+                window.teardown()
+            removeDatabase(name)
 
             # and we update database list
-            for item in self.list.model.findItems(name):
-                self.list.model.removeRow(item.row())
-            self.list.model.sort(0)
+            registry.remove(name)
 
             # if there is no databases left we show appropriate tip
-            if not getDbList():
+            if not registry:
                 hide(self.forms, self.tips)
                 self.tips["help"].setText(HELP_TIP_DB)
             else:
@@ -353,13 +403,11 @@ class Dbs(QWidget):
             self.tips["help"].show()
 
             # here we close database window if it were opened
-            for win in self.windows:
-                if win.name == name:
-                    win.ask = False
-                    self.windows.remove(win)
-                    win.closeEvent = lambda *args: None
-                    win.close()
-                    break
+            if window:
+                window.ask = False
+                self.windows.remove(window)
+                window.closeEvent = lambda *args: None
+                window.close()
 
 
 def select_account(obj, index):
@@ -382,7 +430,7 @@ class Accs(QWidget):
     This class is a container for everything that about accounts.
     """
 
-    def __init__(self, name, db, forms, tips, windows):
+    def __init__(self, name, db, forms, tips, windows, search=None):
         """
         This is constructor that creates account panel and list.
         :param name:
@@ -395,8 +443,11 @@ class Accs(QWidget):
         list of all application windows.
         :param tips:
         list of all application tips.
+        :param search:
+        search index of the database (SearchIndex), if it isn't given we create it here.
         """
         QWidget.__init__(self)
+        self.name = name
         self.forms = forms
         self.windows = windows
         self.tips = tips
@@ -405,7 +456,7 @@ class Accs(QWidget):
         # here we create accounts panel and list
         self.panel = Panel(self.add, self.edit)
         self.list = List(
-            sorted(getAkiList(db)),
+            db,
             "img/account.png",
             forms,
             windows,
@@ -413,25 +464,55 @@ class Accs(QWidget):
             select_account,
         )
 
-        # and here we assign some stuff to account forms, such as account list, database name
-        # tips, forms and windows
-        self.forms["create"].list = self.list
-        self.forms["create"].tips = tips
+        # here we create search field, list shows only accounts that match text typed in it
+        # (forms still change the model of the list, proxy follows it)
+        self.search = search if search is not None else SearchIndex(db)
+        self.proxy = SearchProxy(self.search, self)
+        self.proxy.setSourceModel(self.list.model)
+        self.list.setModel(self.proxy)
 
-        self.forms["show"].tips = tips
-        self.forms["show"].forms = forms
+        self.searchInput = QLineEdit()
+        self.searchInput.setPlaceholderText("пошук")
+        self.searchInput.setClearButtonEnabled(True)
+        self.searchInput.textChanged.connect(self.proxy.setQuery)
+        self.searchInput.returnPressed.connect(self.selectFirst)
 
-        self.forms["edit"].forms = forms
-        self.forms["edit"].tips = tips
-        self.forms["edit"].list = self.list
-        self.forms["edit"].windows = windows
-        self.forms["edit"].name = name
+        # and here we assign some stuff to account forms when they are created, such as account
+        # list, database name tips, forms and windows
+        self.forms.setup(self.setupForm)
 
         self.layout = QVBoxLayout()
         self.layout.addLayout(self.panel)
+        self.layout.addWidget(self.searchInput)
         self.layout.addWidget(self.list)
         self.setLayout(self.layout)
 
+    def setupForm(self, name, form):
+        """
+        This method assigns account list, tips, forms and other stuff to account form when it's
+        created.
+        :param name:
+        name of the form
+        :param form:
+        the form
+        """
+        form.tips = self.tips
+        form.forms = self.forms
+        if name in ("create", "edit"):
+            form.list = self.list
+        if name == "edit":
+            form.windows = self.windows
+            form.name = self.name
+
+    def selectFirst(self):
+        """
+        This method called when user presses Enter in search field, it shows the best match.
+        """
+        index = self.proxy.index(0, 0)
+        if index.isValid():
+            self.list.setCurrentIndex(index)
+            self.list.selected(index)
+
     def add(self):
         """
         This method called when user presses `add` button on the panel.
@@ -493,7 +574,7 @@ class MenuBar(QMenuBar):
         self.Help.addAction(
             QIcon("img/info.png"),
             "About",
-            parent.windows[0].about.exec,
+            lambda: parent.windows[0].about.exec(),
             QKeySequence("F1"),
         )
         self.Help.addAction(
@@ -564,9 +645,34 @@ class AppMenuBar(MenuBar):
         self.export.triggered.connect(self.Export)
         self.export.setShortcut(QKeySequence("Ctrl+E"))
 
+        self.unlock = QAction(QIcon("img/icon.svg"), "&Unlock several...")
+        self.unlock.triggered.connect(parent.dbs.panel.unlockButton.click)
+        self.unlock.setShortcut(QKeySequence("Ctrl+U"))
+
+        self.search = QAction(QIcon("img/account.png"), "&Search accounts...")
+        self.search.triggered.connect(self.Search)
+        self.search.setShortcut(QKeySequence("Ctrl+F"))
+
         self.File.insertAction(self.quit, self.new)
         self.File.insertAction(self.quit, self._import)
         self.File.insertAction(self.quit, self.export)
+        self.File.insertAction(self.quit, self.search)
+        self.File.insertAction(self.quit, self.unlock)
+
+    @cached_property
+    def searchPalette(self):
+        """
+        This is search palette that searches accounts in all opened databases, we create it
+        when user opens it for the first time.
+        """
+        return SearchPalette(self.parent.windows, self.parent)
+
+    def Search(self):
+        """
+        This method called when user goes to menu: File -> Search accounts...
+        It shows search palette.
+        """
+        self.searchPalette.popup()
 
     def Import(self):
         """
@@ -643,28 +749,200 @@ class DbMenuBar(MenuBar):
         self.save.setShortcut(QKeySequence("Ctrl+S"))
 
         self.copy = QAction(QIcon("img/copy.png"), "&Copy")
-        self.copy.triggered.connect(parent.accs.forms["show"].copy_email)
+        self.copy.triggered.connect(self.Copy)
         self.copy.setShortcut(QKeySequence("Ctrl+C"))
 
         self.File.insertAction(self.quit, self.new)
         self.File.insertAction(self.quit, self.save)
         self.File.insertAction(self.quit, self.copy)
 
+    def Copy(self):
+        """
+        This method called when user goes to menu: File -> Copy or press Ctrl+C.
+        It copies e-mail or username of chosen account.
+        """
+        # if show account form isn't created yet, user didn't choose any account
+        forms = self.parent.accs.forms
+        if "show" in forms:
+            forms["show"].copy_email()
+
     def Save(self):
         """
         This method called when user goes to menu: File -> Save or press Ctrl+S.
-        It saves database on the disk.
+        It saves database on the disk in another thread, window learns that database is saved
+        from signals of its saving thread (see DbWindow.saved).
+        """
+        generation = self.parent.generation
+        changes = self.parent.changes
+        self.parent.changes = set()
+        self.parent.saving.save(self.parent.db, changes, generation)
+
+        # all changes are being saved now, so auto-save doesn't need to save them
+        if self.parent.autosave:
+            self.parent.autosave.stop()
+
+
+class AutoSave(QObject):
+    """
+    This class saves database automatically when user stops changing it for a while, so bursts
+    of changes are saved at once. If user keeps changing database, we don't wait for a pause
+    longer than maximum latency after the first unsaved change.
+    """
+
+    def __init__(self, save, delay, latency):
+        """
+        :param save:
+        function that saves database
+        :param delay:
+        how many milliseconds we wait after the last change
+        :param latency:
+        how many milliseconds at most we wait after the first unsaved change
+        """
+        QObject.__init__(self)
+        self.save = save
+        self.timer = QTimer(self, singleShot=True, timeout=self.timeout)
+        self.timer.setInterval(delay)
+        self.latencyTimer = QTimer(self, singleShot=True, timeout=self.timeout)
+        self.latencyTimer.setInterval(latency)
+
+    def changed(self):
+        """
+        This method called every time database changes.
+        """
+        self.timer.start()
+        if not self.latencyTimer.isActive():
+            self.latencyTimer.start()
+
+    def isPending(self):
         """
-        # here we obtain database dict, name and password
-        db = self.parent.db
-        name = self.parent.name
-        password = self.parent.password
+        This method returns True if there are changes that auto-save is going to save.
+        """
+        return self.timer.isActive()
 
-        # then we encrypt that database and save it to file
-        token = encryptDatabase(name, db, password)
-        dbfile = f"{core.const.SRC_DIR}/{name}.db"
-        with open(dbfile, "wb") as file:
-            file.write(token)
+    def stop(self):
+        """
+        This method stops waiting for the time to save database.
+        """
+        self.timer.stop()
+        self.latencyTimer.stop()
+
+    def timeout(self):
+        """
+        This method called when it's time to save database.
+        """
+        self.stop()
+        self.save()
+
+
+class Saving(QThread):
+    """
+    This class represents thread that saves database, so that serialization and encryption of
+    big databases don't freeze UI.
+    Database is saved from its snapshot, so user can keep changing it while it's being saved.
+    Snapshots are saved one by one, if database is saved again while thread saves previous
+    snapshot, we save only the latest one after it.
+    """
+
+    # this signal is emitted with generation of the database and number of accounts in it when
+    # snapshot is saved, it also carries copied accounts of the snapshot (see adoptBlobs)
+    saved = pyqtSignal(int, int, object)
+    # this signal is emitted with error message when snapshot can't be saved
+    failed = pyqtSignal(str)
+
+    def __init__(self, name, key):
+        """
+        :param name:
+        name of the database
+        :param key:
+        key of the database, type: Key
+        """
+        QThread.__init__(self)
+        self.name = name
+        self.key = key
+
+        # here is the snapshot that waits to be saved, we replace it with newer one if it
+        # doesn't get saved before the next save
+        self.pending = None
+        self.running = False
+        self.closed = False
+        self.lock = threading.Lock()
+
+        # this is generation of the latest saved snapshot
+        self.generation = 0
+        # and here are names of accounts which changes we failed to save, we save them together
+        # with the next snapshot
+        self.unsaved = set()
+
+    def save(self, db, changes, generation):
+        """
+        This method takes snapshot of the database and saves it in the thread.
+        :param db:
+        database, type: dict
+        :param changes:
+        names of accounts that are created, changed or deleted since the last save
+        :param generation:
+        generation of the database (see DbWindow.changed)
+        """
+        if self.closed:
+            return
+
+        snapshot, copies = snapshotDatabase(db)
+        with self.lock:
+            if self.closed:
+                return
+            # changes of snapshot that isn't saved yet go with the newer one
+            if self.pending is not None:
+                changes = changes | self.pending[2]
+            self.pending = (snapshot, copies, changes, generation)
+            if self.running:
+                return
+            self.running = True
+
+        # thread could have just taken the last snapshot, so we let it finish before we start
+        # it again
+        self.wait()
+        self.start()
+
+    def open(self):
+        """
+        This method allows saving of new snapshots again after the thread was closed.
+        """
+        with self.lock:
+            self.closed = False
+
+    def close(self):
+        """
+        This method stops saving of new snapshots, we close thread before files of the database
+        are rewritten or removed, so that no snapshot is saved over them. Snapshots that are
+        already requested are still saved, use DbWindow.flush to wait for them.
+        """
+        with self.lock:
+            self.closed = True
+
+    def run(self):
+        """
+        This method saves snapshots until there are no more of them.
+        """
+        while True:
+            with self.lock:
+                if self.pending is None:
+                    self.running = False
+                    return
+                snapshot, copies, changes, generation = self.pending
+                self.pending = None
+                changes |= self.unsaved
+
+            # we save changed accounts of the database to its journal, it's much faster than
+            # encrypting and saving the whole database
+            try:
+                saveChanges(self.name, snapshot, self.key, changes)
+            except Exception as err:
+                self.unsaved = changes
+                self.failed.emit(str(err))
+            else:
+                self.unsaved = set()
+                self.generation = generation
+                self.saved.emit(generation, len(snapshot), copies)
 
 
 class DbWindow(QMainWindow):
@@ -672,7 +950,7 @@ class DbWindow(QMainWindow):
     This class is a database window.
     """
 
-    def __init__(self, windows, name, db, password):
+    def __init__(self, windows, name, db, password, key):
         # sourcery skip: use-dict-items
         """
         This is a constructor of window, it initializes all forms, tips and other widgets.
@@ -684,6 +962,10 @@ class DbWindow(QMainWindow):
         dict of the database
         :param password:
         password of the database
+        :param key:
+        key derived from password of the database, window uses it during whole its lifetime
+        to save database, key derivation is slow, so we derive it in another thread together
+        with opening of the database (see Unlocking) and never in the window
         """
         QMainWindow.__init__(self)
         self.resize(1000, 500)
@@ -692,6 +974,7 @@ class DbWindow(QMainWindow):
         self.name = name
         self.db = db
         self.password = password
+        self.key = key
         self.windows = windows
 
         # this attribute represents whether we would show close confirmation dialog on close or
@@ -699,39 +982,46 @@ class DbWindow(QMainWindow):
         # message.
         self.ask = True
 
-        # here we create account forms an tips
+        # here we count changes of the database, account forms increase `generation` every
+        # time they change database and saving remembers which generation is on disk, so we
+        # know whether there are unsaved changes without opening database from disk.
+        self.generation = 0
+        self.saved_generation = 0
+
+        # here are names of accounts that are changed since the last save
+        self.changes = set()
+
+        # and here is thread that saves database
+        self.saving = Saving(name, self.key)
+        self.saving.saved.connect(self.saved)
+        self.saving.failed.connect(self.saveFailed)
+
+        # and here is index for account search (index of account names and completion index
+        # are built together with account forms, see `names` and `completion`)
+        self.search = SearchIndex(db)
+
+        # here we create account tips, account forms are created only when user needs them for
+        # the first time (see LazyForms)
         helpTip = HelpTip(HELP_TIP_ACCS)
-        if getAkiList(db):
+        if db:
             helpTip = HelpTip("Виберіть акаунт")
         helpTip.show()
 
-        create_account_form = CreateAccountForm(self.db, helpTip)
-        edit_account_form = EditAccountForm(self.db, helpTip)
-        show_account_form = ShowAccountForm(self.db)
-
-        set_form_completers(create_account_form, db)
-        set_form_completers(edit_account_form, db)
-
         tips = {"help": helpTip}
-        forms = {
-            "create": create_account_form,
-            "edit": edit_account_form,
-            "show": show_account_form,
-        }
-
-        create_account_form.forms = forms
-        edit_account_form.forms = forms
-        show_account_form.forms = forms
+        forms = LazyForms(
+            {
+                "create": lambda: CreateAccountForm(self.db, helpTip, names=self.names),
+                "edit": lambda: EditAccountForm(self.db, helpTip, self.names),
+                "show": lambda: ShowAccountForm(self.db),
+            }
+        )
 
         splitter = QSplitter()
         for tip in tips:
             splitter.addWidget(tips[tip])
 
-        for form in forms:
-            splitter.addWidget(forms[form])
-
         # and here we create accounts panel and list by instantiating Accs class
-        accs = Accs(name, db, forms, tips, windows)
+        accs = Accs(name, db, forms, tips, windows, self.search)
         sets = QSettings(f'{os.getenv("HOME")}/PyTools', "PyQtAccounts")
         list_width = sets.value("advanced/list_width", 200, type=int)
         accs.setMaximumWidth(list_width)
@@ -740,29 +1030,194 @@ class DbWindow(QMainWindow):
         accs.forms = forms
         accs.tips = tips
         self.accs = accs
+        self.splitter = splitter
+        forms.setup(self.setupForm)
 
         # here we create menu bar for window
         self.menu = DbMenuBar(self)
         self.setMenuBar(self.menu)
 
-        self.settings = windows[0].settings
+        # if user turned auto-save on, database is saved on its own after changes
+        self.autosave = None
+        if sets.value("advanced/autosave", False, type=bool):
+            delay = sets.value("advanced/autosave_delay", AUTOSAVE_DELAY, type=int)
+            latency = sets.value(
+                "advanced/autosave_latency", AUTOSAVE_LATENCY, type=int
+            )
+            self.autosave = AutoSave(self.autoSave, delay * 1000, latency * 1000)
 
         self.setCentralWidget(splitter)
         self.show()
 
+    @property
+    def settings(self):
+        """
+        Settings dialog belongs to the main window (first is the main window).
+        """
+        return self.windows[0].settings
+
+    @cached_property
+    def names(self):
+        """
+        This is index of all account names, account forms share it to validate names.
+        """
+        return NameIndex(self.db)
+
+    @cached_property
+    def completion(self):
+        """
+        This is completion index, create and edit forms share its completion models, and we
+        update them when database changes.
+        """
+        return CompletionIndex(self.db)
+
+    def setupForm(self, name, form):
+        """
+        This method places account form near account list when form is created.
+        :param name:
+        name of the form
+        :param form:
+        the form
+        """
+        if name in ("create", "edit"):
+            self.completion.setCompleters(form)
+        self.splitter.insertWidget(self.splitter.indexOf(self.accs), form)
+
+    def changed(self, *accounts):
+        """
+        Account forms call this method every time they change database (after they changed it).
+        :param accounts:
+        names of created, changed or deleted accounts
+        """
+        self.generation += 1
+        self.changes.update(accounts)
+        if self.autosave:
+            self.autosave.changed()
+        # indexes of account forms that aren't built yet will take all changes from the
+        # database when they're built
+        if "names" in vars(self):
+            self.names.update(self.db, accounts)
+        if "completion" in vars(self):
+            self.completion.update(self.db, accounts)
+        self.search.update(self.db, accounts)
+
+    def showAccount(self, name):
+        """
+        This method shows account in the window as if user chose it in the account list.
+        :param name:
+        name of the account
+        """
+        accs = self.accs
+        model = accs.list.model
+        row = model.row(name)
+        if row is None:
+            return
+
+        # search field of the window could hide the account, so we clear it, and account
+        # could be among rows that list didn't get yet
+        accs.searchInput.clear()
+        if row >= model.loaded:
+            model.fetchAll()
+
+        index = accs.proxy.mapFromSource(model.index(row))
+        accs.list.setCurrentIndex(index)
+        accs.list.scrollTo(index)
+        accs.list.selected(index)
+
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def saved(self, generation, accounts, copies):
+        """
+        This method called when saving thread saved snapshot of the database.
+        :param generation:
+        generation of the saved snapshot
+        :param accounts:
+        number of accounts in the snapshot
+        :param copies:
+        copied accounts of the snapshot (see adoptBlobs)
+        """
+        # now database on disk is the same as it was when snapshot was taken
+        self.saved_generation = max(self.saved_generation, generation)
+        adoptBlobs(copies)
+        registry.update(self.name, accounts)
+        self.statusBar().showMessage("Базу даних збережено.", 3000)
+
+    def saveFailed(self, error):
+        """
+        This method called when saving thread can't save the database.
+        :param error:
+        error message
+        """
+        QMessageBox.critical(
+            self, "Помилка!", f"Не вдалося зберегти базу даних!\n{error}"
+        )
+
+    def autoSave(self):
+        """
+        This method called when auto-save decides to save database, window that is already
+        closed doesn't save anything.
+        """
+        if self in self.windows:
+            self.menu.Save()
+
+    def teardown(self):
+        """
+        This method stops all saving of the database, we call it before database is rewritten
+        or removed (when user changes or deletes it) and its window is closed.
+        It waits until snapshots that are already requested are saved.
+        """
+        if self.autosave:
+            self.autosave.stop()
+        self.saving.close()
+        self.flush()
+
+        # window doesn't need to hear about saved snapshots anymore, they are outdated
+        self.saving.saved.disconnect(self.saved)
+        self.saving.failed.disconnect(self.saveFailed)
+
+    def resume(self):
+        """
+        This method undoes teardown when database couldn't be rewritten after all, so window
+        keeps saving its database.
+        """
+        self.saving.open()
+        self.saving.saved.connect(self.saved)
+        self.saving.failed.connect(self.saveFailed)
+        if self.autosave and self.generation != self.saved_generation:
+            self.autosave.changed()
+
+    def flush(self):
+        """
+        This method waits until saving thread saves all snapshots of the database.
+        """
+        self.saving.wait()
+        self.saved_generation = max(self.saved_generation, self.saving.generation)
+
+    def isSaved(self):
+        """
+        This method returns True if there are no unsaved changes in database.
+        If VERIFY_CLOSE constant is set we verify it by comparing database on disk and database
+        in memory, which is much slower.
+        """
+        self.flush()
+        if core.const.VERIFY_CLOSE:
+            return isEqual(openDatabase(self.name, self.key), self.db)
+        return self.generation == self.saved_generation
+
     def closeEvent(self, event):
         """
         This method called when user closes database window.
         """
-        # here we open database that is currently on disk
-        name = self.name
-        password = self.password
-        db = openDatabase(name, password)
+        # changes that auto-save is going to save we save right away
+        if self.autosave and self.autosave.isPending():
+            self.autosave.timeout()
 
-        # then we compare database on disk and database in memory, if they differ it means that
-        # user changed database, so we will ask him about unsaved changes
-        if isEqual(db, self.db) and self.ask:
+        # if there are no unsaved changes we close window without asking
+        if self.isSaved() and self.ask:
             self.windows.remove(self)
+            self.key.zeroize()
             return
 
         # here we asking user does he sure about exit
@@ -780,11 +1235,103 @@ class DbWindow(QMainWindow):
         # if he answers `Yes` (i.e. he is sure) we close window
         if action == QMessageBox.Yes:
             self.windows.remove(self)
+            self.key.zeroize()
         else:
             # else we ignore event and abort window close
             event.ignore()
 
 
+class SearchPalette(QDialog):
+    """
+    This class is a dialog that searches accounts in all opened databases, it appears when user
+    goes to menu: File -> Search accounts... or presses Ctrl+F in the main window.
+    """
+
+    # this is how many milliseconds we wait after user typed something before we search
+    DELAY = 150
+
+    def __init__(self, windows, parent=None):
+        """
+        :param windows:
+        list of all application windows.
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Пошук акаунтів")
+        self.resize(500, 400)
+        self.windows = windows
+        self.search = GlobalSearch(windows)
+
+        self.searchInput = QLineEdit()
+        self.searchInput.setPlaceholderText("пошук у всіх відкритих базах данних")
+        self.searchInput.setClearButtonEnabled(True)
+        self.searchInput.returnPressed.connect(self.choose)
+
+        # queries that match lots of accounts in many databases take time, so we search only
+        # when user stops typing for a moment
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DELAY)
+        self.timer.timeout.connect(self.refresh)
+        self.searchInput.textChanged.connect(self.timer.start)
+
+        self.results = QListWidget()
+        self.results.setUniformItemSizes(True)
+        self.results.itemActivated.connect(self.choose)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.searchInput)
+        layout.addWidget(self.results)
+        self.setLayout(layout)
+
+    def popup(self):
+        """
+        This method shows the palette, results are refreshed because databases could be opened,
+        closed or changed since the last time.
+        """
+        self.refresh()
+        self.searchInput.selectAll()
+        self.searchInput.setFocus()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def refresh(self):
+        """
+        This method shows accounts that match text typed in search field.
+        """
+        self.timer.stop()
+        self.results.clear()
+        icon = QIcon("img/account.png")
+        for _, account, database in self.search.search(self.searchInput.text()):
+            item = QListWidgetItem(icon, f"{account} — {database}")
+            item.setData(Qt.UserRole, (database, account))
+            self.results.addItem(item)
+
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def choose(self, item=None):
+        """
+        This method shows chosen account in window of its database and hides the palette.
+        :param item:
+        chosen item of results, if it isn't given we take current one.
+        """
+        # user could press Enter before results of what he typed are shown
+        if self.timer.isActive():
+            self.refresh()
+
+        item = item or self.results.currentItem()
+        if item is None:
+            return
+
+        database, account = item.data(Qt.UserRole)
+        for win in self.windows[1:]:
+            if win.name == database:
+                self.hide()
+                win.showAccount(account)
+                return
+
+
 class About(QDialog):
     """
     This class is an About dialog, it appears when user goes to menu: Help -> About or presses F1.
@@ -806,33 +1353,9 @@ class About(QDialog):
         self.titleLayout.addWidget(self.icon)
         self.titleLayout.addWidget(self.title)
 
-        # and here we obtain current programs version to use it in about section of dialog
-        version = str(getVersion())[1:]  # to prevent the appearance of the `v` symbol
-
-        # this is `about` label, it provides information about PyQtAccounts
-        self.about = """<pre>
-
-
-            Author: Bohdan Kolvakh
-            Version {}
-            <b>PyQtAccounts</b> — is a simple account database manager made 
-            using Python 3 and PyQt5.
-            You can easily manage your accounts and store them safely in 
-            encrypted databases.
-            The interface of PyQtAccounts is common and easy to use.
-            PyQtAccounts is completely free and open source project (see our license).
-            Also here you can see PyQtAccounts source code <a 
-            href='https://github.com/Acmpo6ou/PyQtAccounts' 
-            style='color: #3791ff;'>GitHub</a>
-            <span style='color: #37FF91;'>
-            You must know that, according to our privacy policy, 
-            we do not saving nor do we sharing any of your
-            private data such as your account passwords or databases.
-            </span>
-            (c) Copyright 2020 Bohdan Kolvakh
-            </pre>""".format(
-            version
-        )
+        # this is `about` label, it provides information about PyQtAccounts, version of the program
+        # may be not known yet, so we show it later, when we get it
+        self.about = self.aboutText("...")
         self.aboutLabel = QLabel(self.about)
         self.aboutLabel.setOpenExternalLinks(True)
 
@@ -856,6 +1379,49 @@ class About(QDialog):
         self.layout.addLayout(self.titleLayout)
         self.layout.addWidget(self.content)
 
+        # here we obtain current programs version to use it in about section of dialog
+        lookupVersion(self.setVersion)
+
+    def aboutText(self, version):
+        """
+        This method creates text of `about` label.
+        :param version:
+        version of the program
+        :return:
+        text of `about` label
+        """
+        return """<pre>
+
+
+            Author: Bohdan Kolvakh
+            Version {}
+            <b>PyQtAccounts</b> — is a simple account database manager made 
+            using Python 3 and PyQt5.
+            You can easily manage your accounts and store them safely in 
+            encrypted databases.
+            The interface of PyQtAccounts is common and easy to use.
+            PyQtAccounts is completely free and open source project (see our license).
+            Also here you can see PyQtAccounts source code <a 
+            href='https://github.com/Acmpo6ou/PyQtAccounts' 
+            style='color: #3791ff;'>GitHub</a>
+            <span style='color: #37FF91;'>
+            You must know that, according to our privacy policy, 
+            we do not saving nor do we sharing any of your
+            private data such as your account passwords or databases.
+            </span>
+            (c) Copyright 2020 Bohdan Kolvakh
+            </pre>""".format(version)
+
+    def setVersion(self, version):
+        """
+        This method shows version of the program in about section of dialog.
+        :param version:
+        version of the program
+        """
+        # here we remove `v` symbol from the version
+        self.about = self.aboutText(version[1:])
+        self.aboutLabel.setText(self.about)
+
 
 class Settings(QDialog):
     """
@@ -893,7 +1459,7 @@ class Settings(QDialog):
         main_db = self.settings.value("advanced/main_db", "", type=str)
         if main_db:
             dbs.setCurrentText(main_db)
-        elif "main" in getDbList():
+        elif "main" in registry:
             # by default current is main database
             dbs.setCurrentText("main")
 
@@ -931,6 +1497,46 @@ class Settings(QDialog):
         widthLayout.widthNumber = widthNumber
         self.widthLayout = widthLayout
 
+        # here we create checkbox to switch auto-save feature and spin boxes for its delays
+        autosaveHeader = QLabel("<h4>Автозбереження</h4>")
+        autosaveCheckbox = QCheckBox("Зберігати зміни бази данних автоматично")
+        autosaveCheckbox.setChecked(
+            self.settings.value("advanced/autosave", False, type=bool)
+        )
+        autosaveTip = Tip("Зміни застосуються до щойно відкритих баз данних")
+
+        delayLabel = QLabel("Зберігати через (секунд після останньої зміни):")
+        delayNumber = QSpinBox()
+        delayNumber.setRange(1, 3600)
+        delayNumber.setValue(
+            self.settings.value("advanced/autosave_delay", AUTOSAVE_DELAY, type=int)
+        )
+
+        latencyLabel = QLabel("Але не пізніше ніж (секунд після першої зміни):")
+        latencyNumber = QSpinBox()
+        latencyNumber.setRange(1, 3600)
+        latencyNumber.setValue(
+            self.settings.value("advanced/autosave_latency", AUTOSAVE_LATENCY, type=int)
+        )
+
+        delayLayout = QHBoxLayout()
+        delayLayout.addWidget(delayLabel)
+        delayLayout.addWidget(delayNumber)
+        latencyLayout = QHBoxLayout()
+        latencyLayout.addWidget(latencyLabel)
+        latencyLayout.addWidget(latencyNumber)
+
+        autosaveLayout = QVBoxLayout()
+        autosaveLayout.addWidget(autosaveHeader)
+        autosaveLayout.addWidget(autosaveCheckbox)
+        autosaveLayout.addLayout(delayLayout)
+        autosaveLayout.addLayout(latencyLayout)
+        autosaveLayout.addWidget(autosaveTip)
+        autosaveLayout.checkbox = autosaveCheckbox
+        autosaveLayout.delayNumber = delayNumber
+        autosaveLayout.latencyNumber = latencyNumber
+        self.autosaveLayout = autosaveLayout
+
         self.saveButton = GTKButton(APPLY_BUTTON, "Зберегти")
         self.saveButton.clicked.connect(self.save)
         self.closeButton = QPushButton("Скасувати")
@@ -943,6 +1549,7 @@ class Settings(QDialog):
         layout = QVBoxLayout()
         layout.addLayout(mainDbLayout)
         layout.addLayout(widthLayout)
+        layout.addLayout(autosaveLayout)
         layout.addLayout(buttonsLayout)
         self.setLayout(layout)
 
@@ -958,4 +1565,11 @@ class Settings(QDialog):
 
         list_width = self.widthLayout.widthNumber.value()
         self.settings.setValue("advanced/list_width", list_width)
+
+        autosave = self.autosaveLayout.checkbox.isChecked()
+        self.settings.setValue("advanced/autosave", autosave)
+        delay = self.autosaveLayout.delayNumber.value()
+        self.settings.setValue("advanced/autosave_delay", delay)
+        latency = self.autosaveLayout.latencyNumber.value()
+        self.settings.setValue("advanced/autosave_latency", latency)
         self.hide()
@@ -57,6 +57,7 @@ import os
 import time
 import setup
 import core.const
+import core.utils
 
 from PyQtAccounts import *
 from setup import InstallationWizard
@@ -223,6 +224,22 @@ class BaseTest(unittest.TestCase):
             f"Kwargs: {kwargs}"
         )
 
+    def open_database(self, form, press=None):
+        """
+        This method opens database through open database form and waits until database is
+        opened, because opening process of the database runs in another thread.
+        :param form:
+        open database form with name and password of the database already set
+        :param press:
+        function that simulates user action that starts opening, by default we click `Open`
+        button of the form
+        """
+        with self.qbot.waitSignal(form.finished, timeout=10000):
+            if press:
+                press()
+            else:
+                form.openButton.click()
+
     @staticmethod
     def critical(parent, head, text):
         """
@@ -304,6 +321,11 @@ class UnitTest(BaseTest):
         # here we monkeypatch Repo class
         self.monkeypatch.setattr(git, "Repo", Repo)
 
+        # also we forget version that program may already cached and point version file to
+        # nowhere, so that version is taken from our fake repository
+        self.monkeypatch.setattr(core.utils, "_version", None)
+        self.monkeypatch.setattr(core.const, "VERSION_FILE", "missing/.version")
+
 
 class FuncTest(BaseTest):
     """
@@ -367,7 +389,7 @@ class FuncTest(BaseTest):
                 continue
             self.assertFalse(
                 parent.tips[tip].visibility,
-                f"Tip {parent.forms[form]} is visible, but it should not be!",
+                f"Tip {parent.tips[tip]} is visible, but it should not be!",
             )
 
     @staticmethod
@@ -387,8 +409,8 @@ class FuncTest(BaseTest):
         # then we iterate trough every index of the model if we don't find index data of which
         # equal to given `name` parameter then we throw AssertionError with appropriate message
         for i in range(model.rowCount()):
-            index = model.item(i)
-            if index.text() == name:
+            index = model.index(i)
+            if index.data() == name:
                 break
         else:
             raise AssertionError(f"{name} not in the list of {parent}!")
@@ -457,14 +479,13 @@ class DbsTest(FuncTest):
         :param name:
         name of the database
         """
-        # here we check existence of database file and saltfile in the test src directory.
-        self.assertTrue(
-            os.path.exists(f"/home/accounts/test/src/{name}.bin"),
-            f"{name}.bin does not exist!",
-        )
+        # here we check existence of database file in the test src directory, databases of
+        # older versions that aren't migrated yet consist of database file and saltfile.
+        path = f"/home/accounts/test/src/{name}"
         self.assertTrue(
-            os.path.exists(f"/home/accounts/test/src/{name}.db"),
-            f"{name}.db does not exist!",
+            os.path.exists(f"{path}.dba")
+            or (os.path.exists(f"{path}.db") and os.path.exists(f"{path}.bin")),
+            f"{name}.dba does not exist!",
         )
 
     def checkDbNotOnDisk(self, name):
@@ -474,15 +495,12 @@ class DbsTest(FuncTest):
         :param name:
         name of the database
         """
-        # here we check inexistence of database file and saltfile in the test src directory.
-        self.assertFalse(
-            os.path.exists(f"/home/accounts/test/src/{name}.bin"),
-            f"{name}.bin does exist!",
-        )
-        self.assertFalse(
-            os.path.exists(f"/home/accounts/test/src/{name}.db"),
-            f"{name}.db does exist!",
-        )
+        # here we check inexistence of database files in the test src directory.
+        for extension in (".dba", ".db", ".bin"):
+            self.assertFalse(
+                os.path.exists(f"/home/accounts/test/src/{name}{extension}"),
+                f"{name}{extension} does exist!",
+            )
 
 
 class AccsTest(FuncTest):
@@ -514,7 +532,7 @@ class AccsTest(FuncTest):
         self.pass_input = form.passField.passInput
         self.list.selected(Index(name))
         self.pass_input.setText(password)
-        form.openButton.click()
+        self.open_database(form)
 
         # and here we save database window and accs instance
         self.win = self.window.windows[1]
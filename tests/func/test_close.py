@@ -129,3 +129,48 @@ class CloseWhenDatabaseOpenedTest(AccsTest):
 
         # window is closed now
         self.assertFalse(self.window.visibility, "Main window isn't closed!")
+
+    def test_close_database_window_without_changes(self):
+        """
+        This test tests that database window closes without confirmation dialog and without
+        reading database from disk when there are no unsaved changes.
+        """
+        self.monkeypatch.setattr(QMessageBox, "question", self.mess_showed)
+        self.monkeypatch.setattr("core.windows.openDatabase", self.mess_showed)
+        self.win.close()
+
+        self.assertNotIn(
+            self.win,
+            self.window.windows,
+            "Database window without changes isn't closed!",
+        )
+
+    def test_close_database_window_with_unsaved_changes(self):
+        """
+        This test tests that confirmation dialog appears when user closes database window
+        with unsaved changes.
+        """
+        # Tom changes database and tries to close its window without saving
+        self.monkeypatch.setattr("core.windows.openDatabase", self.mess_showed)
+        self.win.changed()
+        self.monkeypatch.setattr(
+            QMessageBox,
+            "question",
+            self.mess(
+                "Увага!",
+                "Ви певні що хочете вийти?\n"
+                "Усі незбережені зміни буде втрачено!\n"
+                "Натисніть Ctrl+S аби зберегти зміни.",
+                button=QMessageBox.No,
+            ),
+        )
+        self.win.close()
+
+        # confirmation dialog appears and he answers `No`, so window is still opened
+        self.assertIn(self.win, self.window.windows)
+
+        # then he saves database and closes window, there is no dialog this time
+        self.monkeypatch.setattr(QMessageBox, "question", self.mess_showed)
+        self.account_menu(0, 1).trigger()
+        self.win.close()
+        self.assertNotIn(self.win, self.window.windows)
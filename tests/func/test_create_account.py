@@ -172,6 +172,30 @@ class CreateAccountTest(AccsTest):
             "create account form is filled!",
         )
 
+    def test_similar_name_warning(self):
+        """
+        This test tests warning about account with similar name.
+        """
+        # Tom wants to create account called `Gmail`, but there is already `gmail` account
+        self.accs.panel.addButton.click()
+        QTest.keyClicks(self.account_name, "Gmail")
+
+        # Warning appears telling him about it, but it isn't an error, so he still can create
+        # the account
+        self.assertTrue(
+            self.form.similarWarning.visibility,
+            "Warning about similar account name does not appear!",
+        )
+        self.assertEqual("Є схожий акаунт: gmail", self.form.similarWarning.text())
+        self.checkNameErrors()
+
+        # Tom then types `2` and warning disappears
+        QTest.keyClicks(self.account_name, "2")
+        self.assertFalse(
+            self.form.similarWarning.visibility,
+            "Warning about similar account name does not disappear!",
+        )
+
     def test_create_button_enabled(self):
         """
         This tests tests whether create button is enabled or not in certain
@@ -161,7 +161,8 @@ class CreateDbTest(DbsTest):
         # Also Toon types password and presses create button
         self.pass_input.setText("something")
         self.pass_repeat_input.setText("something")
-        self.createButton.click()
+        with self.qbot.waitSignal(self.form.finished):
+            self.createButton.click()
 
         # `mydatabase` appears at the database list, cleaned name without any unallowed
         # symbols
@@ -398,7 +399,8 @@ class CreateDbTest(DbsTest):
         QTest.keyClicks(self.pass_repeat_input, "some_password")
 
         # Everything is fine so he presses `create` button
-        self.createButton.click()
+        with self.qbot.waitSignal(self.form.finished):
+            self.createButton.click()
 
         # The create form disappears
         self.checkOnlyVisible(self.dbs.tips["help"])
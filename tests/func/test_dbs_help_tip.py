@@ -74,14 +74,14 @@ class HelpTipTest(SettingsMixin, DbsTest):
         """
         self.dbs.list.selected(Index("database"))
         self.open_form.passField.passInput.setText("some_password")
-        self.open_form.openButton.click()
+        self.open_database(self.open_form)
 
     def test_no_dbs(self):
         """
         This test tests help tip when user has no databases.
         """
         # Ross opens up PyQtAccounts, he has no database yet
-        self.monkeypatch.setattr(glob, "glob", lambda path: [])
+        init_src_folder(self.monkeypatch)
         window = Window()
 
         # There is help tip saying how he can create new database
@@ -50,9 +50,12 @@ import unittest
 import pytest
 import sys
 import os
+import time
 
 from tests.base import DbsTest, init_src_folder, init_accounts_folder
 from core.utils import *
+import core.getaki as getaki
+import core.akidump as akidump
 from PyQtAccounts import *
 
 
@@ -86,7 +89,7 @@ class EditDbTest(DbsTest):
         """
         self.list.selected(Index(name))
         self.open_pass_input.setText(password)
-        self.open_form.openButton.click()
+        self.open_database(self.open_form)
 
     def test_edit_db_warning(self):
         """
@@ -179,7 +182,8 @@ class EditDbTest(DbsTest):
         self.pass_repeat_input.setText("another_password")
 
         # And presses the save button
-        self.saveButton.click()
+        with self.qbot.waitSignal(self.form.finished):
+            self.saveButton.click()
 
         # Edit database form disappears
         self.checkOnlyVisible(self.help)
@@ -190,7 +194,7 @@ class EditDbTest(DbsTest):
         self.checkDbOnDisk("another_database")
 
         # and it is not empty
-        dbsize = os.stat("/home/accounts/test/src/another_database.db").st_size
+        dbsize = os.stat("/home/accounts/test/src/another_database.dba").st_size
         self.assertGreater(
             dbsize,
             100,  # 100 bytes is a size of an empty database
@@ -275,7 +279,8 @@ class EditDbTest(DbsTest):
 
         # Suddenly he changes his mind and presses save button without any
         # change
-        self.saveButton.click()
+        with self.qbot.waitSignal(self.form.finished):
+            self.saveButton.click()
 
         # Edit database form disappears
         self.checkOnlyVisible(self.help)
@@ -290,3 +295,180 @@ class EditDbTest(DbsTest):
         # database window appears and everything is fine
         self.assertTrue(self.window.windows[1])
         self.checkOnlyVisible(self.help)
+
+    def slowSave(self, delay=0.3):
+        """
+        This method opens database and starts saving it slowly, so that saving is still in
+        progress when user edits or deletes the database.
+        :param delay:
+        how many seconds saving takes
+        """
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        self.setUp()
+        self.openDatabase()
+        win = self.window.windows[1]
+
+        def saveChanges(*args):
+            time.sleep(delay)
+            getaki.saveChanges(*args)
+
+        self.monkeypatch.setattr("core.windows.saveChanges", saveChanges)
+        win.changed("gmail")
+        win.menu.Save()
+        self.editButton.click()
+
+    def test_delete_db_while_saving(self):
+        """
+        Here we test that database deleted while it's being saved doesn't come back.
+        """
+        self.slowSave()
+        self.monkeypatch.setattr(
+            QMessageBox,
+            "warning",
+            self.mess(
+                "Увага!",
+                "Ви певні що хочете видалити базу данних" " <i><b>database</b></i>",
+                QMessageBox.Yes,
+            ),
+        )
+        self.form.deleteButton.click()
+        QTest.qWait(500)
+        self.checkDbNotInList("database")
+        self.checkDbNotOnDisk("database")
+
+    def test_change_password_while_saving(self):
+        """
+        Here we test that saving in progress doesn't save anything with the old key after
+        password of the database is changed.
+        """
+        # new key takes a while to derive, so saving must be slower to end after it
+        self.slowSave(1.5)
+        self.pass_input.setText("another_password")
+        self.pass_repeat_input.setText("another_password")
+        with self.qbot.waitSignal(self.form.finished):
+            self.saveButton.click()
+        QTest.qWait(2000)
+
+        # database opens with the new password
+        self.openDatabase("database", "another_password")
+        self.assertEqual(2, len(self.window.windows))
+
+    def pendingAutosave(self):
+        """
+        This method opens database with auto-save turned on and changes it, so that auto-save
+        is pending when user edits or deletes the database.
+        """
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        self.setUp()
+        self.openDatabase()
+        win = self.window.windows[1]
+        win.autosave = AutoSave(win.autoSave, 300, 1000)
+        win.changed("gmail")
+        self.editButton.click()
+
+    def test_delete_db_with_pending_autosave(self):
+        """
+        Here we test that auto-save doesn't bring deleted database back.
+        """
+        self.pendingAutosave()
+        self.monkeypatch.setattr(
+            QMessageBox,
+            "warning",
+            self.mess(
+                "Увага!",
+                "Ви певні що хочете видалити базу данних" " <i><b>database</b></i>",
+                QMessageBox.Yes,
+            ),
+        )
+        self.form.deleteButton.click()
+        QTest.qWait(600)
+        self.checkDbNotInList("database")
+        self.checkDbNotOnDisk("database")
+
+    def test_change_password_with_pending_autosave(self):
+        """
+        Here we test that auto-save doesn't save anything with the old key after password of
+        the database is changed.
+        """
+        self.pendingAutosave()
+        self.pass_input.setText("another_password")
+        self.pass_repeat_input.setText("another_password")
+        with self.qbot.waitSignal(self.form.finished):
+            self.saveButton.click()
+        QTest.qWait(600)
+
+        # database opens with the new password
+        self.openDatabase("database", "another_password")
+        self.assertEqual(2, len(self.window.windows))
+
+    def test_save_failed(self):
+        """
+        Here we test that database window stays opened and keeps saving the database when
+        edited database can't be saved.
+        """
+
+        def newDatabase(*args):
+            raise OSError("Диск переповнений")
+
+        messages = []
+        mess = self.mess(
+            "Помилка!", "Не вдалося зберегти базу данних!\nДиск переповнений"
+        )
+        self.monkeypatch.setattr("core.db_forms.newDatabase", newDatabase)
+        self.monkeypatch.setattr(
+            QMessageBox, "critical", lambda *args: messages.append(mess(*args))
+        )
+
+        # Tom changes password of the database, but there is no space left on disk
+        self.pendingAutosave()
+        self.pass_input.setText("another_password")
+        self.pass_repeat_input.setText("another_password")
+        with self.qbot.waitSignal(self.form.finished):
+            self.saveButton.click()
+
+        # he is told about it and database window stays opened
+        self.assertEqual(1, len(messages))
+        win = self.window.windows[1]
+        self.assertIn(win, self.window.windows)
+        self.assertTrue(win.isEnabled())
+        self.assertTrue(self.form.isEnabled())
+
+        # and window still saves the database, including changes that weren't saved yet
+        self.assertFalse(win.saving.closed)
+        self.assertTrue(win.autosave.isPending())
+
+    def test_rename_failed(self):
+        """
+        Here we test that attached files of the database stay available when database can't be
+        saved under new name.
+        """
+
+        def newDatabase(*args):
+            raise OSError("Диск переповнений")
+
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        self.setUp()
+        self.openDatabase()
+        win = self.window.windows[1]
+
+        # Tom has a file attached to his account, it's in blob store of the database
+        account = win.db["gmail"]
+        account.attached_files = {"file.txt": b"Some file."}
+        getaki.saveDatabase("database", win.db, win.key)
+        self.assertIsInstance(account.attached_files["file.txt"], akidump.Blob)
+
+        # he renames the database, but there is no space left on disk
+        self.monkeypatch.setattr("core.db_forms.newDatabase", newDatabase)
+        self.monkeypatch.setattr(QMessageBox, "critical", self.critical)
+        self.editButton.click()
+        self.name.setText("another_database")
+        with self.qbot.waitSignal(self.form.finished):
+            self.saveButton.click()
+
+        # his file still can be downloaded, and nothing is left of the new database
+        content = account.attached_files["file.txt"]
+        self.assertEqual(b"Some file.", getaki.loadBlob("database", win.key, content))
+        self.assertFalse(os.path.exists(getaki.blobsFolder("another_database")))
@@ -44,6 +44,7 @@
 
 from PyQt5.QtTest import QTest
 from PyQt5.QtCore import *
+from PyQt5 import sip
 import unittest
 import pytest
 import sys
@@ -52,6 +53,7 @@ from tests.base import DbsTest
 from core.utils import *
 from PyQtAccounts import *
 from core.getaki import openDatabase
+import core.getaki as getaki
 
 
 class OpenDbTest(DbsTest):
@@ -95,7 +97,7 @@ class OpenDbTest(DbsTest):
         # Ross opened database
         self.list.selected(Index("database"))
         self.pass_input.setText("some_password")
-        self.form.openButton.click()
+        self.open_database(self.form)
 
         # Then he chose same database in the list again
         self.list.selected(Index("database"))
@@ -112,7 +114,9 @@ class OpenDbTest(DbsTest):
 
         # He accidentally types wrong password and hits Enter
         QTest.keyClicks(self.pass_input, "password")
-        QTest.keyClick(self.pass_input, Qt.Key_Enter)
+        self.open_database(
+            self.form, lambda: QTest.keyClick(self.pass_input, Qt.Key_Enter)
+        )
 
         # The error message appears saying that the password is incorrect
         error = self.form.incorrectPass
@@ -124,7 +128,7 @@ class OpenDbTest(DbsTest):
 
         # Tom then corrects password and now presses `open` button
         self.pass_input.setText("some_password")
-        self.form.openButton.click()
+        self.open_database(self.form)
 
         # The error disappears
         self.assertFalse(
@@ -165,3 +169,113 @@ class OpenDbTest(DbsTest):
             win.db,
             "Database of created database window is incorrect!",
         )
+
+    def test_open_progress_and_cancel(self):
+        """
+        Here we test that database opens in background showing its progress and that user
+        can cancel opening.
+        """
+        # Lea wants to open her database, so she types password and presses `Open`
+        self.list.selected(Index("database"))
+        self.pass_input.setText("some_password")
+        self.form.openButton.click()
+
+        # Progress of opening appears and form is disabled while database is opening
+        self.assertTrue(
+            self.form.progress.visibility,
+            "Progress of opening doesn't appear when database is opening!",
+        )
+        self.assertFalse(
+            self.form.openButton.isEnabled(),
+            "Open button is enabled while database is opening!",
+        )
+        thread = self.form.unlocking.thread()
+
+        # Lea changes her mind and presses `Cancel`
+        self.form.cancelButton.click()
+
+        # Progress disappears and form is enabled again
+        self.assertFalse(self.form.progress.visibility)
+        self.assertTrue(self.form.openButton.isEnabled())
+
+        # and when opening process ends (and its thread is destroyed) there is no database window
+        self.qbot.waitUntil(
+            lambda: sip.isdeleted(thread) or not thread.isRunning(), timeout=10000
+        )
+        self.qbot.wait(100)
+        self.assertEqual(
+            len(self.window.windows),
+            1,
+            "Database window appears even though opening was cancelled!",
+        )
+
+        # then she presses `Open` again and database opens
+        self.open_database(self.form)
+        win = self.window.windows[1]
+        self.assertEqual("database", win.name)
+
+    def test_damaged_database(self):
+        """
+        Here we test that error message appears when database can't be opened not because of
+        password (e.g. its file is damaged).
+        """
+
+        def decryptDatabase(*args):
+            raise ValueError("cannot mmap an empty file")
+
+        messages = []
+        self.monkeypatch.setattr("core.db_forms.decryptDatabase", decryptDatabase)
+        self.monkeypatch.setattr(
+            QMessageBox, "critical", lambda *args: messages.append(self.critical(*args))
+        )
+
+        # Bob opens his database, but its file is damaged
+        self.list.selected(Index("database"))
+        self.pass_input.setText("some_password")
+        self.open_database(self.form)
+
+        # the error message appears and form isn't busy anymore
+        self.assertEqual(1, len(messages))
+        self.assertTrue(self.form.openButton.isEnabled())
+        self.assertFalse(self.form.progress.visibility)
+        self.assertEqual(1, len(self.window.windows))
+
+    def test_unsupported_kdf(self):
+        """
+        Here we test that user is told when database can't be opened because this computer
+        doesn't support algorithm that derives its key.
+        """
+
+        def decryptDatabase(*args):
+            raise getaki.UnsupportedKdf(getaki.ARGON2ID)
+
+        messages = []
+        mess = self.mess(
+            "Помилка!",
+            "Не вдалося відкрити базу данних!\n"
+            "Алгоритм обчислення ключа Argon2id не підтримується на цьому комп'ютері.\n"
+            "Оновіть бібліотеку cryptography.",
+        )
+        self.monkeypatch.setattr("core.db_forms.decryptDatabase", decryptDatabase)
+        self.monkeypatch.setattr(
+            QMessageBox, "critical", lambda *args: messages.append(mess(*args))
+        )
+
+        # Bob opens database created on a computer with Argon2id support
+        self.list.selected(Index("database"))
+        self.pass_input.setText("some_password")
+        self.open_database(self.form)
+
+        # he is told why database can't be opened
+        self.assertEqual(1, len(messages))
+        self.assertEqual(1, len(self.window.windows))
+
+    def test_threads_are_destroyed(self):
+        """
+        Here we test that threads that open databases are destroyed when they finish.
+        """
+        self.list.selected(Index("database"))
+        for _ in range(3):
+            self.pass_input.setText("wrong_password")
+            self.open_database(self.form)
+        self.qbot.waitUntil(lambda: not self.form.findChildren(QThread))
@@ -46,10 +46,12 @@ from PyQt5.QtTest import QTest
 from PyQt5.QtCore import *
 import unittest
 import pytest
+import threading
 import os
 
 from tests.base import AccsTest, init_accounts_folder, init_src_folder
 from core.utils import *
+import core.getaki as getaki
 from PyQtAccounts import *
 
 
@@ -89,7 +91,7 @@ class DbSaveTest(AccsTest):
         pass_input = form.passField.passInput
         _list.selected(Index("import_database"))
         pass_input.setText("import_database")
-        form.openButton.click()
+        self.open_database(form)
         win = window.windows[1]
         return win
 
@@ -230,3 +232,112 @@ class DbSaveTest(AccsTest):
 
         # Then she closes database window and there is now messages
         self.monkeypatch.setattr(QMessageBox, "question", self.mess_showed)
+
+    def edit(self, name):
+        """
+        This method changes name of `firefox` account through edit form.
+        :param name:
+        new name
+        """
+        self.list.selected(Index("firefox"))
+        self.editButton.click()
+        self.name.setText(name)
+        self.saveButton.click()
+
+    def test_save_in_background(self):
+        """
+        Here we test that database is saved in another thread and only the latest snapshot is
+        saved when user saves database several times while it's being saved.
+        """
+        started = threading.Event()
+        saving = threading.Event()
+        snapshots = []
+
+        def saveChanges(name, db, key, changes):
+            started.set()
+            saving.wait(10)
+            snapshots.append((db["firefox"].name, changes))
+            getaki.saveChanges(name, db, key, changes)
+
+        self.monkeypatch.setattr("core.windows.saveChanges", saveChanges)
+
+        # Ross changes his name and saves database, saving takes a while, but he can keep
+        # changing database
+        self.edit("Ross")
+        self.account_menu(0, 1).trigger()
+        started.wait(10)
+        self.edit("Ross G.")
+        self.account_menu(0, 1).trigger()
+        self.edit("Ross Geller")
+        self.account_menu(0, 1).trigger()
+        self.assertEqual([], snapshots)
+
+        # when saving ends his last changes are saved and the intermediate ones are skipped
+        saving.set()
+        self.qbot.waitUntil(lambda: self.win.saved_generation == self.win.generation)
+        self.assertEqual(
+            [("Ross", {"firefox"}), ("Ross Geller", {"firefox"})], snapshots
+        )
+        db = getaki.openDatabase("import_database", self.win.key)
+        self.assertEqual("Ross Geller", db["firefox"].name)
+
+    def test_save_failed(self):
+        """
+        Here we test that user sees error message when database can't be saved and that
+        unsaved changes are saved with the next save.
+        """
+
+        def saveChanges(*args):
+            raise OSError("Диск переповнений")
+
+        messages = []
+        mess = self.mess(
+            "Помилка!", "Не вдалося зберегти базу даних!\nДиск переповнений"
+        )
+        self.monkeypatch.setattr("core.windows.saveChanges", saveChanges)
+        self.monkeypatch.setattr(
+            QMessageBox, "critical", lambda *args: messages.append(mess(*args))
+        )
+
+        # Ross saves his changes, but there is no space left on disk
+        self.edit("Ross Geller")
+        self.account_menu(0, 1).trigger()
+        self.qbot.waitUntil(lambda: bool(messages))
+        self.assertFalse(self.win.isSaved())
+
+        # he frees some space, changes something else and saves database again
+        self.monkeypatch.setattr("core.windows.saveChanges", getaki.saveChanges)
+        self.win.changed()
+        self.account_menu(0, 1).trigger()
+        self.assertTrue(self.win.isSaved())
+
+        # all his changes are saved
+        db = getaki.openDatabase("import_database", self.win.key)
+        self.assertEqual("Ross Geller", db["firefox"].name)
+
+    def test_autosave(self):
+        """
+        Here we test that database is saved automatically when auto-save is turned on.
+        """
+        saves = []
+        self.monkeypatch.setattr(
+            "core.windows.saveChanges", lambda *args: saves.append(args[3])
+        )
+        self.win.autosave = AutoSave(self.win.menu.Save, 100, 1000)
+
+        # Ross turned auto-save on, he changes his name several times and database is saved
+        # only once after he stopped
+        self.edit("Ross")
+        self.edit("Ross Geller")
+        self.assertEqual([], saves)
+        self.qbot.waitUntil(lambda: bool(saves))
+        self.qbot.waitUntil(lambda: self.win.isSaved())
+        self.assertEqual([{"firefox"}], saves)
+
+        # then he changes it again and closes the window right away, there is no dialog and
+        # his change is saved
+        self.monkeypatch.setattr(QMessageBox, "question", self.mess_showed)
+        self.edit("Ross G.")
+        self.win.close()
+        self.assertNotIn(self.win, self.window.windows)
+        self.assertEqual([{"firefox"}, {"firefox"}], saves)
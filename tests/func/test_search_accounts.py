@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from PyQt5.QtTest import QTest
+from PyQt5.QtCore import *
+
+from tests.base import AccsTest
+from core.utils import *
+from PyQtAccounts import *
+
+
+class SearchAccountsTest(AccsTest):
+    """
+    This test class provides all functional tests about searching accounts.
+    """
+
+    def setUp(self):
+        """
+        Here we reassign some widely used variables.
+        """
+        super().setUp()
+        self.search = self.accs.searchInput
+        self.proxy = self.accs.proxy
+
+    def shown(self):
+        """
+        This method returns names of accounts that are shown in the account list.
+        """
+        return [self.proxy.index(i, 0).data() for i in range(self.proxy.rowCount())]
+
+    def test_search(self):
+        """
+        Here we test that account list shows only accounts that match search query.
+        """
+        # Lea has a lot of accounts and she wants to find her gmail account, so she types
+        # `gmail` in search field
+        QTest.keyClicks(self.search, "gmail")
+
+        # account list shows `gmail` account first and then `mega` because its e-mail is
+        # on gmail too
+        self.assertEqual(["gmail", "mega"], self.shown())
+
+        # she presses Enter and `gmail` account is shown
+        QTest.keyClick(self.search, Qt.Key_Return)
+        self.checkOnlyVisible(self.accs.forms["show"])
+        self.assertEqual("gmail", self.accs.list.index.data())
+
+        # then she clears search field and all accounts are in the list again
+        self.search.clear()
+        self.assertEqual(["gmail", "habr", "mega"], self.shown())
+
+    def test_search_updates_on_creation_of_new_account(self):
+        """
+        Here we test that account created while searching appears in the list if it matches
+        the query.
+        """
+        # Tom searches for `gmail`
+        QTest.keyClicks(self.search, "gmail")
+
+        # and creates account `gmail2`
+        form = self.accs.forms["create"]
+        self.accs.panel.addButton.click()
+        form.accountInput.setText("gmail2")
+        form.passField.passInput.setText("password")
+        form.passRepeatField.passInput.setText("password")
+        form.createButton.click()
+
+        # new account appears in the list right after `gmail`
+        self.assertEqual(["gmail", "gmail2", "mega"], self.shown())
+
+    def test_search_in_all_databases(self):
+        """
+        Here we test search palette that searches accounts in all opened databases.
+        """
+        # Emily opens search palette in the main window
+        palette = self.window.menuBar().searchPalette
+        self.window.menuBar().search.trigger()
+        self.assertTrue(palette.visibility)
+
+        # she types `mega` there, and account `mega` is found in the opened database
+        QTest.keyClicks(palette.searchInput, "mega")
+        self.qbot.waitUntil(lambda: palette.results.count())
+        self.assertEqual("mega — database", palette.results.item(0).text())
+
+        # search field of database window hides `mega` account, but when she presses Enter
+        # it is cleared and `mega` account is shown in database window
+        self.search.setText("gmail")
+        QTest.keyClick(palette.searchInput, Qt.Key_Return)
+        self.assertFalse(palette.visibility)
+        self.assertEqual("", self.search.text())
+        self.checkOnlyVisible(self.accs.forms["show"])
+        self.assertEqual("mega", self.accs.list.index.data())
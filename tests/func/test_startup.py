@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+
+from benchmark import profileStartup
+from tests.base import BaseTest
+
+# cold start of PyQtAccounts (from the very first import until event loop starts) must not take
+# longer than this many seconds, budget is generous, so that slow test machines pass, and it
+# can be changed with STARTUP_BUDGET environment variable (benchmark.py measures startup
+# against the real target)
+STARTUP_BUDGET = float(os.getenv("STARTUP_BUDGET", 10))
+
+
+class StartupTest(BaseTest):
+    """
+    This test class checks how fast PyQtAccounts starts.
+    """
+
+    def test_cold_start_budget(self):
+        """
+        Here we launch PyQtAccounts in new process with startup profiler turned on and check
+        that it starts within the budget.
+        """
+        folder = tempfile.mkdtemp()
+        try:
+            trace = profileStartup(folder, timeout=STARTUP_BUDGET * 3)
+        finally:
+            shutil.rmtree(folder)
+
+        self.assertIsNotNone(trace, "PyQtAccounts didn't write startup trace!")
+        for phase in ("imports", "x connection", "settings", "widgets", "event loop"):
+            self.assertIn(phase, trace["phases"], f"Phase `{phase}` isn't recorded!")
+        self.assertLess(
+            trace["total"],
+            STARTUP_BUDGET,
+            f"Startup took {trace['total']:.2f}s, phases: {trace['phases']}",
+        )
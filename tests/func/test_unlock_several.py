@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+"""
+This module contains all functional tests for form that opens several databases at once.
+"""
+
+from PyQt5.QtTest import QTest
+from PyQt5.QtCore import *
+
+from tests.base import DbsTest
+from core.utils import *
+from PyQtAccounts import *
+import core.getaki as getaki
+
+
+class UnlockSeveralTest(DbsTest):
+    """
+    This test class provides all functional tests for unlock several databases form.
+    """
+
+    def setUp(self):
+        """
+        Here we open the form and reassign some widely used variables.
+        """
+        super().setUp()
+        self.dbs.panel.unlockButton.click()
+        self.form = self.dbs.forms["unlock"]
+
+    def check(self, *names):
+        """
+        This method checks given databases in the list of the form.
+        """
+        for i in range(self.form.dbsList.count()):
+            item = self.form.dbsList.item(i)
+            if item.text() in names:
+                item.setCheckState(Qt.Checked)
+
+    def open(self):
+        """
+        This method presses `Open` button and waits until opening process ends.
+        """
+        with self.qbot.waitSignal(self.form.finished, timeout=10000):
+            self.form.openButton.click()
+
+    def test_unlock_several(self):
+        """
+        Here we test that several databases are opened with several passwords at once.
+        """
+        # Lea has several databases, she wants to open `a` and `crypt` at once
+        self.checkOnlyVisible(self.form)
+        self.check("a", "crypt")
+
+        # they have different passwords, so she adds one more password field
+        self.form.passFields[0].passInput.setText("a")
+        self.form.addPassButton.click()
+        self.form.passFields[1].passInput.setText("crypt")
+        self.open()
+
+        # both database windows appear and the form disappears
+        names = {win.name for win in self.window.windows[1:]}
+        self.assertEqual({"a", "crypt"}, names)
+        self.checkOnlyVisible(self.dbs.tips["help"])
+
+        # when she opens the form again opened databases aren't in the list anymore
+        self.dbs.panel.unlockButton.click()
+        items = [
+            self.form.dbsList.item(i).text() for i in range(self.form.dbsList.count())
+        ]
+        self.assertNotIn("a", items)
+        self.assertNotIn("crypt", items)
+
+    def test_wrong_password(self):
+        """
+        Here we test that databases that can't be opened are reported.
+        """
+        # Bob checks `main` and `crypt` but he remembers only password of `crypt`
+        self.check("main", "crypt")
+        self.form.passFields[0].passInput.setText("crypt")
+        self.open()
+
+        # `crypt` is opened, error message says that `main` isn't
+        self.assertEqual(["crypt"], [win.name for win in self.window.windows[1:]])
+        self.assertTrue(self.form.notOpenedError.visibility)
+        self.assertIn("main", self.form.notOpenedError.text())
+        self.assertTrue(self.form.visibility)
+
+        # and the thread that opened databases is destroyed
+        self.qbot.waitUntil(lambda: not self.form.findChildren(QThread))
+
+    def test_journal_set_aside(self):
+        """
+        Here we test that user is warned when journal of the database can't be read and
+        database is opened without changes saved in it.
+        """
+        # `database` has journal that is encrypted with another key
+        key = getaki.loadKey("database", b"some_password")
+        db = getaki.openDatabase("database", key)
+        getaki.saveDatabase("database", db, key)
+        other = getaki.deriveKey(b"other_password", getaki.getSalt("database"))
+        getaki.saveChanges("database", db, other, {next(iter(db))})
+
+        warnings = []
+        self.monkeypatch.setattr(
+            QMessageBox, "warning", lambda *args: warnings.append(args)
+        )
+
+        # Emily opens it with the form that opens several databases
+        self.check("database")
+        self.form.passFields[0].passInput.setText("some_password")
+        self.open()
+
+        # database is opened and she is told where its journal is
+        self.assertEqual(["database"], [win.name for win in self.window.windows[1:]])
+        self.assertEqual(1, len(warnings))
+        win, head, text = warnings[0]
+        self.assertIs(self.window.windows[1], win)
+        self.assertEqual("Увага!", head)
+        path = text.rsplit(" ", 1)[1]
+        self.assertTrue(path.endswith(".corrupt"))
+        self.assertTrue(os.path.exists(path))
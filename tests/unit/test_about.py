@@ -88,7 +88,9 @@ class AboutTest(UnitTest):
         self.patchVersion()
 
         # he opens about dialog and sees correct version number `Version 2.0.6` in about section
+        # after it's loaded
         about = About()
+        self.qbot.waitUntil(lambda: "..." not in about.about)
         self.assertIn(
             "Version 2.0.6", about.about, "Version number in about dialog is incorrect!"
         )
@@ -50,6 +50,7 @@ from unittest.mock import Mock
 import pytest
 import os
 import json
+import pickle
 
 from tests.base import UnitTest
 
@@ -215,3 +216,103 @@ class AkidumpTest(UnitTest):
             "when we try to deserialize data that contains account"
             "without attached files!",
         )
+
+    def test_blobs_serialization(self):
+        """
+        Here we test that attached files that are in blob store are serialized as references
+        to blob store and deserialized back to Blob instances.
+        """
+        account = self.db["gmail"]
+        account.attached_files["photo.png"] = Blob("0123abcd")
+
+        loaded = loads(dumps(self.db))
+        self.assertEqual(
+            loaded,
+            self.db,
+            "Serialization of attached files in blob store is incorrect!",
+        )
+        self.assertEqual({"photo.png": "0123abcd"}, account.to_dict()["attach_blobs"])
+
+    def test_binary_serialization(self):
+        """
+        Here we test that database serialized in binary format is deserialized back unchanged
+        and that `loads` recognizes the format.
+        """
+        self.db["gmail"].attached_files["photo.png"] = Blob("0123abcd")
+        self.db["мега"] = Account("мега", "Том", "", b"\xd0\xbf", "", "", False)
+
+        dump = dumps(self.db, "binary")
+        self.assertTrue(dump.startswith(BINARY_TAG))
+        self.assertEqual(
+            loads(dump), self.db, "Binary serialization of database is incorrect!"
+        )
+
+        # json and obsolete data are still recognized
+        self.assertEqual(loads(dumps(self.db, "json")), self.db)
+
+    def test_binary_truncated(self):
+        """
+        Here we test that truncated data in binary format isn't accepted.
+        """
+        dump = dumps(self.db, "binary")
+        with self.assertRaises(ValueError):
+            loads(dump[:-1])
+        with self.assertRaises(ValueError):
+            loads(dump + b"garbage")
+
+    def test_lazy_decoding(self):
+        """
+        Here we test that password and attached files of loaded accounts are decoded only
+        when they are accessed, and that accounts are still compared correctly.
+        """
+        for format in SERIALIZERS:
+            account = loads(dumps(self.db, format))["gmail"]
+            self.assertTrue(account._encoded)
+            self.assertEqual(account, self.db["gmail"])
+
+            self.assertEqual(
+                {"somefile.txt": b"Some another file.\n<h1></h1>\n"},
+                account.attached_files,
+            )
+            self.assertFalse(account._encoded)
+            self.assertEqual(b"123", account.password)
+
+    def test_account_hash(self):
+        """
+        Here we test that equal accounts have equal hashes and that accounts have no
+        __dict__.
+        """
+        account = loads(dumps(self.db, "binary"))["gmail"]
+        self.assertEqual(hash(account), hash(self.db["gmail"]))
+        self.assertEqual(1, len({account, self.db["gmail"]}))
+        self.assertFalse(hasattr(account, "__dict__"))
+
+    def test_loads_from_memoryview(self):
+        """
+        Here we test that database is deserialized from memoryview of decrypted data and
+        doesn't refer to it afterwards, so the data can be wiped.
+        """
+        buffer = bytearray(dumps(self.db, "binary"))
+        db = loads(memoryview(buffer))
+        buffer[:] = bytes(len(buffer))
+        self.assertEqual(db, self.db)
+
+        content = db["gmail"]._files["somefile.txt"]
+        self.assertIsInstance(content, bytes)
+        self.assertIsInstance(db["gmail"].password, bytes)
+
+        # json is deserialized from memoryview too
+        self.assertEqual(loads(memoryview(dumps(self.db, "json"))), self.db)
+
+    def test_pickle_account(self):
+        """
+        Here we test that account which attached files aren't decoded yet can be pickled
+        (accounts are pickled when databases are opened in another process).
+        """
+        account = loads(dumps(self.db, "binary"))["gmail"]
+        restored = pickle.loads(pickle.dumps(account))
+        self.assertEqual(restored, self.db["gmail"])
+        self.assertEqual(
+            {"somefile.txt": b"Some another file.\n<h1></h1>\n"},
+            restored.attached_files,
+        )
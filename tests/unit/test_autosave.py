@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from core.windows import AutoSave
+
+from tests.base import UnitTest
+
+
+class AutoSaveTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.saves = 0
+        self.autosave = AutoSave(self.save, 100, 300)
+
+    def save(self):
+        self.saves += 1
+
+    def test_debounce(self):
+        """
+        Here we test that burst of changes is saved once after the last change.
+        """
+        for _ in range(5):
+            self.autosave.changed()
+        self.assertTrue(self.autosave.isPending())
+        self.assertEqual(0, self.saves)
+
+        self.qbot.waitUntil(lambda: self.saves == 1)
+        self.qbot.wait(150)
+        self.assertEqual(1, self.saves)
+        self.assertFalse(self.autosave.isPending())
+
+    def test_latency(self):
+        """
+        Here we test that database is saved when user keeps changing it for longer than
+        maximum latency.
+        """
+        for _ in range(12):
+            self.autosave.changed()
+            self.qbot.wait(50)
+        self.assertGreaterEqual(self.saves, 1)
+        self.assertLessEqual(self.saves, 2)
+
+    def test_stop(self):
+        """
+        Here we test that stopped auto-save doesn't save database.
+        """
+        self.autosave.changed()
+        self.autosave.stop()
+        self.qbot.wait(400)
+        self.assertEqual(0, self.saves)
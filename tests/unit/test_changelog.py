@@ -82,6 +82,7 @@ class ChangelogTest(UnitTest):
 
         # then we create ShowChangelog instance and check its changelog label content.
         log = ShowChangelog(None)
+        self.qbot.waitUntil(lambda: "..." not in log.changelogLabel.text())
         right_text = (
             "<h4>PyQtAccounts v2.0.6:</h4><ul><li>Fixed issues.</li>\n"
             "<li>Changelog tested now.</li>\n"
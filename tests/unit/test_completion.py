@@ -50,8 +50,9 @@ from unittest.mock import Mock
 import pytest
 import os
 from core.utils import *
+from core.akidump import Account
 
-from tests.base import AccsTest
+from tests.base import AccsTest, UnitTest
 
 
 class CompletionTest(AccsTest):
@@ -242,3 +243,66 @@ class CompletionTest(AccsTest):
             "Account name completer of create account form isn't updated after "
             "editing account!",
         )
+
+
+class CompletionIndexTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.db = {
+            "gmail": Account("gmail", "Tom", "tom@gmail.com", b"", "", "", True, {}),
+            "habr": Account("habr", "Tom", "tom@habr.com", b"", "", "", True, {}),
+        }
+        self.index = CompletionIndex(self.db)
+
+    def strings(self, field):
+        """
+        This method returns content of completion model of the field.
+        """
+        return self.index.models[field].stringList()
+
+    def test_reference_counting(self):
+        """
+        Here we test that value stays in completion while at least one account has it.
+        """
+        self.assertEqual(["Tom"], self.strings("nameInput"))
+
+        del self.db["gmail"]
+        self.index.update(self.db, ["gmail"])
+        self.assertEqual(["Tom"], self.strings("nameInput"))
+        self.assertEqual(["tom@habr.com"], self.strings("emailInput"))
+
+        self.db["habr"] = Account("habr", "Lea", "", b"", "", "", True, {})
+        self.index.update(self.db, ["habr"])
+        self.assertEqual(["Lea"], self.strings("nameInput"))
+        self.assertEqual([], self.strings("emailInput"))
+
+    def test_sorted_insertion(self):
+        """
+        Here we test that completion models stay sorted when accounts are created.
+        """
+        self.db["a"] = Account("a", "Bob", "bob@gmail.com", b"", "", "", True, {})
+        self.db["z"] = Account("z", "Zed", "zed@gmail.com", b"", "", "", True, {})
+        self.index.update(self.db, ["a", "z"])
+        self.assertEqual(["a", "gmail", "habr", "z"], self.strings("accountInput"))
+        self.assertEqual(["Bob", "Tom", "Zed"], self.strings("nameInput"))
+
+    def test_shared_models(self):
+        """
+        Here we test that completers of different forms share models of the index.
+        """
+        forms = []
+        for i in range(2):
+            form = QWidget()
+            form.accountInput = QLineEdit(form)
+            form.nameInput = QLineEdit(form)
+            form.emailInput = QLineEdit(form)
+            self.index.setCompleters(form)
+            forms.append(form)
+
+        first, second = forms
+        self.assertIs(
+            first.nameInput.completer().model(), second.nameInput.completer().model()
+        )
+        self.assertIs(
+            self.index.models["emailInput"], first.emailInput.completer().model()
+        )
@@ -0,0 +1,647 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from core.getaki import *
+import core.akidump as akidump
+import core.const
+
+from cryptography.fernet import InvalidToken
+import io
+import os
+import pickle
+from types import SimpleNamespace
+
+from tests.base import UnitTest, init_src_folder
+
+
+class KeyTest(UnitTest):
+    def setUp(self):
+        """
+        Here we monkeypatch SRC_DIR, so getaki will look for databases in `tests/src`.
+        """
+        super().setUp()
+        self.monkeypatch.setattr("core.const.SRC_DIR", "tests/src")
+
+    def test_key_opens_database(self):
+        """
+        Here we test that key derived once can be used to open database instead of password.
+        """
+        key = deriveKey(b"some_password", getSalt("database"))
+        self.assertTrue(
+            isEqual(
+                openDatabase("database", key),
+                openDatabase("database", b"some_password"),
+            ),
+            "Database opened with key differs from database opened with password!",
+        )
+
+    def test_key_encrypts_without_derivation(self):
+        """
+        Here we test that encryption with already derived key doesn't derive key again.
+        """
+        key = deriveKey(b"some_password", getSalt("database"))
+        db = openDatabase("database", key)
+
+        # if encryptDatabase tried to derive key it would fail
+        self.monkeypatch.setattr("core.getaki.deriveKey", self.mess_showed)
+        token = encryptDatabase("database", db, key)
+        data = readStream(io.BytesIO(token), key)
+        self.assertTrue(isEqual(akidump.loads(data), db))
+
+    def test_zeroize(self):
+        """
+        Here we test that key can't be used after it is zeroized.
+        """
+        key = deriveKey(b"some_password", getSalt("database"))
+        key.zeroize()
+
+        self.assertEqual(bytes(32), bytes(key._key), "Key is not wiped!")
+        with self.assertRaises(ValueError):
+            openDatabase("database", key)
+
+    def test_wrong_password(self):
+        """
+        Here we test that key derived from wrong password can't open database.
+        """
+        key = deriveKey(b"wrong_password", getSalt("database"))
+        with self.assertRaises(InvalidToken):
+            openDatabase("database", key)
+
+
+class UnlockTest(UnitTest):
+    def setUp(self):
+        """
+        Here we monkeypatch SRC_DIR, so getaki will look for databases in `tests/src`.
+        """
+        super().setUp()
+        self.monkeypatch.setattr("core.const.SRC_DIR", "tests/src")
+
+    def test_pickle_key(self):
+        """
+        Here we test that key passed to another process still opens database.
+        """
+        key = pickle.loads(pickle.dumps(deriveKey(b"crypt", getSalt("crypt"))))
+        self.assertTrue(
+            isEqual(openDatabase("crypt", key), openDatabase("crypt", b"crypt"))
+        )
+
+    def test_unlock_database(self):
+        """
+        Here we test that unlockDatabase tries all passwords and reports which one fits.
+        """
+        i, db, key, aside = unlockDatabase("crypt", [b"wrong_password", b"crypt"])
+        self.assertIsNone(aside)
+        self.assertEqual(1, i)
+        self.assertTrue(isEqual(db, openDatabase("crypt", key)))
+        self.assertIsNone(unlockDatabase("crypt", [b"wrong_password"]))
+
+    def test_unlock_databases(self):
+        """
+        Here we test that unlockDatabases opens all databases that given passwords fit.
+        """
+        results = dict(unlockDatabases(["a", "crypt", "main"], [b"a", b"crypt"]))
+        self.assertEqual({"a", "crypt", "main"}, set(results))
+        self.assertIsNone(results["main"])
+
+        for name in ("a", "crypt"):
+            i, db, key, _ = results[name]
+            self.assertEqual(name.encode(), [b"a", b"crypt"][i])
+            self.assertTrue(isEqual(db, openDatabase(name, name.encode())))
+            # key came from another process, but it still can be used to save database
+            token = encryptDatabase(name, db, key)
+            self.assertTrue(
+                isEqual(akidump.loads(readStream(io.BytesIO(token), key)), db)
+            )
+
+
+class ChunkedFormatTest(UnitTest):
+    def setUp(self):
+        """
+        Here we create key and some data that spans several chunks.
+        """
+        super().setUp()
+        self.key = Key(b"some_password", b"0123456789abcdef")
+        self.data = os.urandom(CHUNK_SIZE * 2 + 100)
+
+    def write(self, data):
+        """
+        This method writes data in chunked format and returns file with it.
+        """
+        file = io.BytesIO()
+        writeStream(file, self.key, data)
+        file.seek(0)
+        return file
+
+    def test_write_and_read(self):
+        """
+        Here we test that data written in chunked format is read back unchanged.
+        """
+        file = self.write(self.data)
+        self.assertEqual(self.data, readStream(file, self.key))
+
+        # empty data is written as a single empty chunk
+        file = self.write(b"")
+        self.assertEqual(b"", readStream(file, self.key))
+
+    def test_read_from_position(self):
+        """
+        Here we test that chunked data is read from current position of the file to its end.
+        """
+        file = io.BytesIO()
+        file.write(b"prefix")
+        writeStream(file, self.key, self.data)
+        file.seek(len(b"prefix"))
+        self.assertEqual(self.data, readStream(file, self.key))
+
+    def test_without_decrypt_into(self):
+        """
+        Here we test that chunks are decrypted with older versions of cryptography too, they
+        can't decrypt into buffer.
+        """
+        file = self.write(self.data)
+        self.key._aead = SimpleNamespace(decrypt=self.key._aead.decrypt)
+        self.assertEqual(self.data, readStream(file, self.key))
+
+    def test_wrong_key(self):
+        """
+        Here we test that chunked data can't be read with another key.
+        """
+        file = self.write(self.data)
+        key = Key(b"wrong_password", b"0123456789abcdef")
+        with self.assertRaises(InvalidToken):
+            readStream(file, key)
+
+    def test_truncated(self):
+        """
+        Here we test that truncated or extended data isn't accepted.
+        """
+        token = self.write(self.data).getvalue()
+
+        # here we drop the last chunk
+        last = CHUNK_HEADER.size + len(self.data) - 2 * CHUNK_SIZE + 16
+        with self.assertRaises(InvalidToken):
+            readStream(io.BytesIO(token[:-last]), self.key)
+
+        with self.assertRaises(InvalidToken):
+            readStream(io.BytesIO(token + b"garbage"), self.key)
+
+    def test_save_and_open_database(self):
+        """
+        Here we test that saved database is opened in chunked format, while databases of
+        the old format (i.e. fernet tokens) are still opened.
+        """
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+
+        # `database` is saved in the old format
+        key = deriveKey(b"some_password", getSalt("database"))
+        db = openDatabase("database", key)
+
+        saveDatabase("database", db, key)
+        with open("/home/accounts/test/src/database.dba", "rb") as file:
+            self.assertEqual(DBA_MAGIC, file.read(len(DBA_MAGIC)))
+        self.assertTrue(isEqual(db, openDatabase("database", b"some_password")))
+
+    def test_decrypted_data_is_wiped(self):
+        """
+        Here we test that decrypted database is wiped after it's deserialized, while opened
+        database still has all its data.
+        """
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        key = deriveKey(b"some_password", getSalt("database"))
+        db = openDatabase("database", key)
+        saveDatabase("database", db, key)
+
+        # here we keep decrypted database to look at it after database is opened
+        buffers = []
+
+        def keepBuffer(*args):
+            buffers.append(decryptDatabase(*args))
+            return buffers[-1]
+
+        self.monkeypatch.setattr("core.getaki.decryptDatabase", keepBuffer)
+        opened = openDatabase("database", key)
+        self.assertEqual(bytes(len(buffers[0])), bytes(buffers[0]))
+        self.assertTrue(isEqual(db, opened))
+
+
+class BlobStoreTest(UnitTest):
+    def setUp(self):
+        """
+        Here we create database with attached file.
+        """
+        super().setUp()
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        self.key = deriveKey(b"some_password", getSalt("database"))
+        self.db = openDatabase("database", self.key)
+        self.content = os.urandom(CHUNK_SIZE + 100)
+        self.db["gmail"].attached_files["file.bin"] = self.content
+
+    def test_save_moves_files_to_blob_store(self):
+        """
+        Here we test that attached files are saved to blob store and loaded only on demand.
+        """
+        saveDatabase("database", self.db, self.key)
+
+        blob = self.db["gmail"].attached_files["file.bin"]
+        self.assertIsInstance(blob, akidump.Blob)
+        self.assertTrue(os.path.exists(f"{blobsFolder('database')}/{blob.id}"))
+
+        # here we open database, its attached file is only a reference to blob store
+        db = openDatabase("database", b"some_password")
+        self.assertEqual(blob, db["gmail"].attached_files["file.bin"])
+        self.assertEqual(self.content, loadBlob("database", self.key, blob))
+
+    def test_unused_blobs_are_removed(self):
+        """
+        Here we test that files detached from all accounts are removed from blob store.
+        """
+        saveDatabase("database", self.db, self.key)
+        blob = self.db["gmail"].attached_files.pop("file.bin")
+
+        saveDatabase("database", self.db, self.key)
+        self.assertFalse(os.path.exists(f"{blobsFolder('database')}/{blob.id}"))
+
+    def test_save_snapshot(self):
+        """
+        Here we test that saving of database snapshot doesn't change the database and that
+        after saving database adopts references to blob store.
+        """
+        snapshot, copies = snapshotDatabase(self.db)
+        account = self.db["gmail"]
+        self.assertIs(self.db["habr"], snapshot["habr"])
+        self.assertEqual([(account, snapshot["gmail"])], copies)
+
+        saveDatabase("database", snapshot, self.key)
+        self.assertEqual(self.content, account.attached_files["file.bin"])
+        blob = snapshot["gmail"].attached_files["file.bin"]
+        self.assertIsInstance(blob, akidump.Blob)
+
+        adoptBlobs(copies)
+        self.assertEqual(blob, account.attached_files["file.bin"])
+        self.assertTrue(isEqual(self.db, openDatabase("database", self.key)))
+
+
+class JournalTest(UnitTest):
+    def setUp(self):
+        """
+        Here we create database of chunked format.
+        """
+        super().setUp()
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        self.key = deriveKey(b"some_password", getSalt("database"))
+        self.db = openDatabase("database", self.key)
+        saveDatabase("database", self.db, self.key)
+        self.dbfile = "/home/accounts/test/src/database.dba"
+
+    def change(self):
+        """
+        This method changes one account and deletes another one.
+        """
+        self.db["gmail"] = akidump.Account("gmail", "Bob", "", b"new", "", "")
+        del self.db["mega"]
+        return {"gmail", "mega"}
+
+    def test_save_changes(self):
+        """
+        Here we test that changes are appended to journal without rewriting .dba file and
+        that they are applied when database is opened.
+        """
+        with open(self.dbfile, "rb") as file:
+            snapshot = file.read()
+
+        saveChanges("database", self.db, self.key, self.change())
+        with open(self.dbfile, "rb") as file:
+            self.assertEqual(snapshot, file.read())
+        self.assertTrue(os.path.exists(journalFile("database")))
+        self.assertTrue(isEqual(self.db, openDatabase("database", b"some_password")))
+
+        # here we save changes one more time
+        self.db["habr"].comment = "Changed comment."
+        saveChanges("database", self.db, self.key, {"habr"})
+        self.assertTrue(isEqual(self.db, openDatabase("database", b"some_password")))
+
+    def test_obsolete_journal(self):
+        """
+        Here we test that journal of the older .dba file isn't applied.
+        """
+        saveChanges("database", self.db, self.key, self.change())
+        with open(journalFile("database"), "rb") as file:
+            journal = file.read()
+
+        # here we save the whole database without `habr` account and restore old journal
+        del self.db["habr"]
+        saveDatabase("database", self.db, self.key)
+        self.assertFalse(os.path.exists(journalFile("database")))
+        with open(journalFile("database"), "wb") as file:
+            file.write(journal)
+
+        self.assertTrue(isEqual(self.db, openDatabase("database", b"some_password")))
+
+    def test_journal_of_another_key(self):
+        """
+        Here we test that journal that can't be decrypted doesn't prevent database from
+        opening, it is set aside instead and database is opened without its changes.
+        """
+        db = openDatabase("database", self.key)
+        other = deriveKey(b"other_password", getSalt("database"))
+        saveChanges("database", self.db, other, self.change())
+
+        paths = []
+        key = loadKey("database", b"some_password")
+        self.assertTrue(isEqual(db, replayJournal("database", db, key, paths.append)))
+        self.assertFalse(os.path.exists(journalFile("database")))
+        self.assertEqual(1, len(paths))
+        self.assertTrue(os.path.exists(paths[0]))
+
+        # database is saved again with its own journal
+        saveChanges("database", self.db, self.key, {"gmail", "mega"})
+        self.assertTrue(isEqual(self.db, openDatabase("database", b"some_password")))
+        self.assertTrue(os.path.exists(paths[0]))
+
+    def test_incomplete_record(self):
+        """
+        Here we test that incomplete record at the end of journal is ignored.
+        """
+        saveChanges("database", self.db, self.key, self.change())
+        with open(journalFile("database"), "ab") as file:
+            file.write(JOURNAL_LENGTH.pack(100) + b"incomplete")
+        self.assertTrue(isEqual(self.db, openDatabase("database", b"some_password")))
+
+        # new records are written instead of the incomplete one
+        self.db["habr"].comment = "Changed comment."
+        saveChanges("database", self.db, self.key, {"habr"})
+        self.assertTrue(isEqual(self.db, openDatabase("database", b"some_password")))
+
+    def test_compaction(self):
+        """
+        Here we test that when journal becomes too big the whole database is saved.
+        """
+        compacted = False
+        for i in range(20):
+            self.db["habr"].comment = "Changed comment." * i
+            saveChanges("database", self.db, self.key, {"habr"})
+            if not os.path.exists(journalFile("database")):
+                compacted = True
+
+        self.assertTrue(compacted)
+        self.assertTrue(isEqual(self.db, openDatabase("database", b"some_password")))
+
+
+class AtomicWriteTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        init_src_folder(self.monkeypatch)
+        self.path = "/home/accounts/test/src/file"
+        with open(self.path, "wb") as file:
+            file.write(b"old content")
+
+    def test_write_files(self):
+        """
+        Here we test that writeFiles replaces content of all files.
+        """
+        writeFiles(
+            {self.path: b"new content", f"{self.path}2": lambda f: f.write(b"2")}
+        )
+        with open(self.path, "rb") as file:
+            self.assertEqual(b"new content", file.read())
+        with open(f"{self.path}2", "rb") as file:
+            self.assertEqual(b"2", file.read())
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+
+    def test_failed_write(self):
+        """
+        Here we test that if writing fails, old content of files is left untouched and no
+        temporary files are left.
+        """
+
+        def fail(file):
+            file.write(b"half of content")
+            raise OSError("No space left on device")
+
+        with self.assertRaises(OSError):
+            writeFiles({f"{self.path}2": b"new file", self.path: fail})
+
+        with open(self.path, "rb") as file:
+            self.assertEqual(b"old content", file.read())
+        self.assertEqual(["file"], os.listdir("/home/accounts/test/src"))
+
+
+class KdfTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        init_src_folder(self.monkeypatch)
+        self.monkeypatch.setattr("core.const.KDF_TIME", 0.05)
+        self.monkeypatch.setattr("core.getaki._calibrated", {})
+
+    def test_salt_file(self):
+        """
+        Here we test that key derivation parameters are saved to .bin file together with salt
+        and that .bin files of the old format (only salt) are still read.
+        """
+        params = KdfParams(SCRYPT, 10, 8, 2)
+        self.assertEqual((b"salt", params), unpackSalt(packSalt(b"salt", params)))
+        self.assertEqual((b"salt", KdfParams()), unpackSalt(b"salt"))
+
+    def test_new_database(self):
+        """
+        Here we test that new database uses calibrated parameters and can be opened.
+        """
+        key = newDatabase("new", b"password")
+        self.assertEqual(calibrateKdf(), key.params)
+        self.assertEqual(key.params, readSaltFile("new")[1])
+        self.assertEqual({}, openDatabase("new", b"password"))
+
+        with self.assertRaises(InvalidToken):
+            openDatabase("new", b"wrong_password")
+
+    def test_scrypt(self):
+        """
+        Here we test that scrypt is used when Argon2id isn't available.
+        """
+        self.monkeypatch.setattr("core.getaki.Argon2id", None)
+        newDatabase("new", b"password")
+        self.assertEqual(SCRYPT, readSaltFile("new")[1].algorithm)
+        self.assertEqual({}, openDatabase("new", b"password"))
+
+
+class CipherTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        init_src_folder(self.monkeypatch)
+        self.monkeypatch.setattr("core.const.KDF_TIME", 0.05)
+        self.monkeypatch.setattr("core.getaki._calibrated", {})
+        self.src = core.const.SRC_DIR
+
+    def test_chacha20_database(self):
+        """
+        Here we test that cipher of the database is recorded in header of its .dba file and
+        that database encrypted with ChaCha20-Poly1305 is opened and saved with the same cipher.
+        """
+        key = newDatabase("new", b"password", cipher=CHACHA20_POLY1305)
+        self.assertEqual(CHACHA20_POLY1305, readSaltFile("new")[2])
+
+        db = openDatabase("new", b"password")
+        db["gmail"] = akidump.Account(
+            "gmail", "Tom", "tom@gmail.com", b"123", "01.01.2000", "", False, {}
+        )
+        saveChanges("new", db, loadKey("new", b"password"), {"gmail"})
+        self.assertTrue(isEqual(db, openDatabase("new", b"password")))
+
+        # the same derived key can't open it with another cipher
+        aes = Key.restore(bytes(key._key), key.salt, key.params, AES_GCM)
+        with self.assertRaises(InvalidToken):
+            openDatabase("new", aes)
+
+    def test_version_1_header(self):
+        """
+        Here we test that .dba files of version 1 (without cipher in header) are opened with
+        AES-GCM.
+        """
+        key = newDatabase("new", b"password")
+        with open(f"{self.src}/new.dba", "rb") as file:
+            data = file.read()
+        salt, params, chunks, index, cipher, size = readContainerHeader(data)
+        self.assertEqual((AES_GCM, DBA_HEADER.size), (cipher, size))
+
+        # here we write header as version 1 did, offsets of chunks are relative to the body,
+        # so only offset of chunk index changes
+        shift = DBA_HEADER.size - DBA_HEADER_V1.size
+        header = DBA_HEADER_V1.pack(
+            DBA_MAGIC,
+            1,
+            params.algorithm,
+            params.cost,
+            params.memory,
+            params.parallelism,
+            salt,
+            chunks,
+            index - shift,
+        )
+        with open(f"{self.src}/new.dba", "wb") as file:
+            file.write(header + data[size:])
+
+        self.assertEqual(AES_GCM, readSaltFile("new")[2])
+        self.assertEqual({}, openDatabase("new", b"password"))
+
+    def test_unknown_cipher(self):
+        """
+        Here we test that .dba file with unknown cipher isn't opened.
+        """
+        newDatabase("new", b"password")
+        with open(f"{self.src}/new.dba", "rb+") as file:
+            file.seek(5)
+            file.write(b"\xff")
+        with self.assertRaises(InvalidToken):
+            openDatabase("new", b"password")
+
+
+class ContainerTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        self.src = "/home/accounts/test/src"
+
+    def test_migrate_database(self):
+        """
+        Here we test that .db and .bin files of older versions are migrated to .dba file
+        without password and that migrated database is opened.
+        """
+        db = openDatabase("database", b"some_password")
+        migrateDatabase("database")
+
+        self.assertEqual(["database.dba"], os.listdir(self.src))
+        self.assertTrue(isEqual(db, openDatabase("database", b"some_password")))
+
+    def test_migrate_chunked_database(self):
+        """
+        Here we test that database of chunked format is migrated with its chunk index.
+        """
+        key = loadKey("database", b"some_password")
+        db = openDatabase("database", key)
+        db["gmail"].comment = "x" * CHUNK_SIZE * 2
+
+        # here we create .db and .bin files as older versions did
+        with open(f"{self.src}/database.db", "wb") as file:
+            writeStream(file, key, akidump.dumps(db, SERIALIZER))
+        migrateDatabase("database")
+
+        with open(f"{self.src}/database.dba", "rb") as file:
+            header = readContainerHeader(file.read())
+        self.assertEqual((getSalt("database"), KdfParams(), 3), header[:3])
+        self.assertFalse(os.path.exists(f"{self.src}/database.db"))
+        self.assertEqual(
+            "x" * CHUNK_SIZE * 2, openDatabase("database", key)["gmail"].comment
+        )
+
+    def test_corrupted_index(self):
+        """
+        Here we test that .dba file with corrupted chunk index isn't opened.
+        """
+        key = loadKey("database", b"some_password")
+        db = openDatabase("database", key)
+        saveDatabase("database", db, key)
+
+        with open(f"{self.src}/database.dba", "rb+") as file:
+            file.seek(-INDEX_ENTRY.size, os.SEEK_END)
+            file.write(INDEX_ENTRY.pack(DBA_HEADER.size))
+        with self.assertRaises(InvalidToken):
+            openDatabase("database", key)
+
+    def test_remove_database(self):
+        """
+        Here we test that removeDatabase removes all files of the database.
+        """
+        key = loadKey("database", b"some_password")
+        db = openDatabase("database", key)
+        db["gmail"].attached_files["file"] = b"content"
+        saveDatabase("database", db, key)
+        saveChanges("database", db, key, {"gmail"})
+
+        removeDatabase("database")
+        self.assertEqual([], os.listdir(self.src))
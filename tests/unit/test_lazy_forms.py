@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from core.utils import LazyForms, hide
+
+from tests.base import UnitTest
+
+
+class Form:
+    def __init__(self, name):
+        self.name = name
+        self.hidden = False
+
+    def hide(self):
+        self.hidden = True
+
+
+class LazyFormsTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.created = []
+        self.forms = LazyForms(
+            {
+                "create": lambda: self.create("create"),
+                "edit": lambda: self.create("edit"),
+            }
+        )
+
+    def create(self, name):
+        self.created.append(name)
+        return Form(name)
+
+    def test_lazy(self):
+        """
+        Here we test that forms are created only once and only when they are needed.
+        """
+        self.assertEqual([], self.created)
+        self.assertNotIn("create", self.forms)
+
+        form = self.forms["create"]
+        self.assertIs(form, self.forms["create"])
+        self.assertEqual(["create"], self.created)
+        self.assertEqual(["create"], list(self.forms))
+
+        with self.assertRaises(KeyError):
+            self.forms["show"]
+
+    def test_setup(self):
+        """
+        Here we test that setup functions are called for every created form, including forms
+        that were created before function was registered.
+        """
+        self.forms["edit"]
+        setups = []
+        self.forms.setup(lambda name, form: setups.append((name, form.name)))
+        self.assertEqual([("edit", "edit")], setups)
+
+        self.forms["create"]
+        self.assertEqual([("edit", "edit"), ("create", "create")], setups)
+
+    def test_hide(self):
+        """
+        Here we test that hiding forms doesn't create forms that don't exist yet.
+        """
+        form = self.forms["edit"]
+        hide(self.forms)
+        self.assertTrue(form.hidden)
+        self.assertEqual(["edit"], self.created)
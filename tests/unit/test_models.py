@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from PyQt5.QtCore import *
+
+from core.models import NamesModel
+
+from tests.base import UnitTest
+
+
+class NamesModelTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.monkeypatch.setattr(NamesModel, "BATCH", 3)
+        self.model = NamesModel(["e", "a", "c", "g", "i"], "img/account.png")
+
+    def rows(self):
+        """
+        This method returns names that model gave to the view.
+        """
+        return [self.model.index(i).data() for i in range(self.model.rowCount())]
+
+    def test_lazy_population(self):
+        """
+        Here we test that model gives rows to the view in batches.
+        """
+        self.assertEqual(["a", "c", "e"], self.rows())
+        self.assertTrue(self.model.canFetchMore(QModelIndex()))
+
+        self.model.fetchMore(QModelIndex())
+        self.assertEqual(["a", "c", "e", "g", "i"], self.rows())
+        self.assertFalse(self.model.canFetchMore(QModelIndex()))
+
+    def test_add(self):
+        """
+        Here we test that names are added at their places, and rows that view didn't get yet
+        are given later.
+        """
+        self.model.add("b")
+        self.model.add("h")
+        self.model.add("b")
+        self.assertEqual(["a", "b", "c", "e"], self.rows())
+
+        self.model.fetchAll()
+        self.assertEqual(["a", "b", "c", "e", "g", "h", "i"], self.rows())
+        self.model.add("z")
+        self.assertEqual("z", self.rows()[-1])
+
+    def test_remove(self):
+        """
+        Here we test that names are removed both from loaded and not loaded rows.
+        """
+        self.model.remove("c")
+        self.model.remove("i")
+        self.model.remove("x")
+        self.assertEqual(["a", "e", "g"], self.model.names)
+        self.assertEqual(["a", "e"], self.rows())
+        self.assertNotIn("c", self.model)
+
+    def test_shared_icon_and_tooltip(self):
+        """
+        Here we test that all rows share one icon and that tooltips are shown.
+        """
+        first = self.model.index(0).data(Qt.DecorationRole)
+        second = self.model.index(1).data(Qt.DecorationRole)
+        self.assertEqual(first.cacheKey(), second.cacheKey())
+
+        self.model.setToolTip("c", "Акаунтів: 3")
+        self.assertEqual("Акаунтів: 3", self.model.index(1).data(Qt.ToolTipRole))
+        self.assertIsNone(self.model.index(0).data(Qt.ToolTipRole))
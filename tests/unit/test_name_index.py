@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from core.utils import NameIndex, normalName
+
+from tests.base import UnitTest
+
+
+class NameIndexTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.db = {"gmail": None, "Habr": None}
+        self.index = NameIndex(self.db)
+
+    def test_contains(self):
+        """
+        Here we test that index contains exactly the names of accounts.
+        """
+        self.assertIn("gmail", self.index)
+        self.assertNotIn("Gmail", self.index)
+        self.assertEqual(2, len(self.index))
+
+    def test_similar(self):
+        """
+        Here we test that names that differ only in case or spaces are similar.
+        """
+        self.assertEqual("gmail", self.index.similar(" GMail"))
+        self.assertEqual("Habr", self.index.similar("habr"))
+        self.assertIsNone(self.index.similar("gmail"))
+        self.assertIsNone(self.index.similar("habr", exclude="Habr"))
+        self.assertIsNone(self.index.similar("mega"))
+        self.assertEqual(normalName("ﬁle"), normalName("FILE"))
+
+    def test_update(self):
+        """
+        Here we test that index follows created, renamed and deleted accounts.
+        """
+        self.db["mega"] = None
+        del self.db["gmail"]
+        self.db["Gmail"] = None
+        self.index.update(self.db, ["mega", "gmail", "Gmail"])
+        self.assertEqual({"Gmail", "Habr", "mega"}, self.index.names)
+        self.assertEqual("Gmail", self.index.similar("gmail"))
+
+        del self.db["Gmail"]
+        self.index.update(self.db, ["Gmail"])
+        self.assertIsNone(self.index.similar("gmail"))
+        self.assertNotIn("gmail", self.index.normal)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+import tempfile
+import threading
+
+from core.profiler import Profiler
+
+from tests.base import UnitTest
+
+
+class ProfilerTest(UnitTest):
+    def test_from_args(self):
+        """
+        Here we test that profiler is turned on only by `--profile-startup` option.
+        """
+        self.assertFalse(Profiler.fromArgs(["PyQtAccounts.py"]).enabled)
+
+        profiler = Profiler.fromArgs(["PyQtAccounts.py", "--profile-startup"])
+        self.assertTrue(profiler.enabled)
+        self.assertEqual("startup-trace.json", profiler.path)
+
+        profiler = Profiler.fromArgs(
+            ["PyQtAccounts.py", "--profile-startup=/tmp/t.json"]
+        )
+        self.assertEqual("/tmp/t.json", profiler.path)
+
+    def test_disabled(self):
+        """
+        Here we test that turned off profiler records nothing.
+        """
+        profiler = Profiler()
+        with profiler.phase("imports"):
+            pass
+        profiler.mark("event loop")
+        self.assertEqual([], profiler.events)
+
+    def test_phases(self):
+        """
+        Here we test that phases with the same name sum up and that trace file contains all
+        phases with threads they ran in.
+        """
+        profiler = Profiler(True)
+        profiler.record("imports", profiler.start, profiler.start + 0.5)
+        profiler.record("imports", profiler.start + 1, profiler.start + 1.25)
+        thread = threading.Thread(
+            target=lambda: profiler.record("git", profiler.start, profiler.start + 2)
+        )
+        thread.start()
+        thread.join()
+        profiler.mark("event loop")
+
+        self.assertEqual(0.75, profiler.phases()["imports"])
+        self.assertEqual(2, profiler.total())
+
+        path = os.path.join(tempfile.mkdtemp(), "trace.json")
+        profiler.write(path)
+        with open(path) as file:
+            trace = json.load(file)
+
+        events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(
+            ["imports", "imports", "git", "event loop"], [e["name"] for e in events]
+        )
+        self.assertEqual(500000, events[0]["dur"])
+        self.assertNotEqual(events[0]["tid"], events[2]["tid"])
+        self.assertEqual(2, trace["total"])
+        self.assertFalse(os.path.exists(path + ".tmp"))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from core.getaki import *
+from core.registry import *
+
+import json
+import os
+
+from tests.base import UnitTest, init_src_folder
+
+
+class RegistryTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        init_src_folder(self.monkeypatch)
+        self.copyDatabase("database")
+        self.copyDatabase("main")
+        self.src = "/home/accounts/test/src"
+        self.registry = Registry()
+
+    def names(self):
+        """
+        This method returns names of databases shown by the model of the registry.
+        """
+        model = self.registry.model
+        return [model.index(i).data() for i in range(model.rowCount())]
+
+    def test_scan(self):
+        """
+        Here we test that registry finds databases of older versions without migrating them.
+        """
+        self.assertEqual(["database", "main"], list(self.registry))
+        self.assertEqual(["database", "main"], self.names())
+        self.assertTrue(os.path.exists(f"{self.src}/database.db"))
+        self.assertEqual(0, self.registry["database"].version)
+        self.assertIsNone(self.registry["database"].accounts)
+
+    def test_migrate(self):
+        """
+        Here we test that registry migrates databases of older versions on start.
+        """
+        self.registry.migrate()
+        self.assertEqual(["database", "main"], list(self.registry))
+        self.assertTrue(os.path.exists(f"{self.src}/database.dba"))
+        self.assertFalse(os.path.exists(f"{self.src}/database.db"))
+        self.assertEqual(DBA_VERSION, self.registry["database"].version)
+
+    def test_update_and_remove(self):
+        """
+        Here we test that model of the registry stays sorted when databases are created and
+        removed.
+        """
+        self.assertIn("main", self.registry)
+        newDatabase("a", b"password")
+        self.registry.update("a", 0)
+        newDatabase("m", b"password")
+        self.registry.update("m", 0)
+        self.assertEqual(["a", "database", "m", "main"], self.names())
+        self.assertEqual(0, self.registry["m"].accounts)
+
+        removeDatabase("database")
+        self.registry.remove("database")
+        self.assertEqual(["a", "m", "main"], self.names())
+        self.assertNotIn("database", self.registry)
+
+    def test_load_without_scan(self):
+        """
+        Here we test that registry is loaded from registry file without scanning directory,
+        and that only names and modification times of databases are saved there.
+        """
+        self.registry.migrate()
+        self.registry.update("database", 3)
+        with open(f"{self.src}/{REGISTRY_FILE}") as file:
+            saved = json.load(file)
+        self.assertEqual(["database", "main"], sorted(name for name, _ in saved))
+        self.assertTrue(all(len(vault) == 2 for vault in saved))
+
+        def scandir(path):
+            raise AssertionError("Directory is scanned!")
+
+        # only the new registry is loaded, the old one doesn't follow directory anymore
+        self.registry.watcher.blockSignals(True)
+        self.monkeypatch.setattr(os, "scandir", scandir)
+        registry = Registry()
+        registry.migrate()
+        self.assertEqual(["database", "main"], list(registry))
+        self.assertIsNone(registry["database"].accounts)
+
+    def test_update_without_writing(self):
+        """
+        Here we test that registry file isn't written when database is only saved again, only
+        when databases are added.
+        """
+        self.registry.migrate()
+        writes = []
+        self.monkeypatch.setattr(
+            "core.registry.writeFiles", lambda files: writes.append(files)
+        )
+
+        self.registry.update("database", 3)
+        self.assertEqual([], writes)
+        self.assertEqual(3, self.registry["database"].accounts)
+
+        newDatabase("a", b"password")
+        self.registry.update("a", 0)
+        self.assertEqual(1, len(writes))
+
+    def test_external_changes(self):
+        """
+        Here we test that registry notices databases created and removed by somebody else.
+        """
+        self.registry.migrate()
+        self.assertEqual(["database", "main"], list(self.registry))
+        self.copyDatabase("crypt")
+        os.remove(f"{self.src}/main.dba")
+        self.assertEqual(["crypt", "database"], list(self.registry))
+        self.assertEqual(["crypt", "database"], self.names())
+
+    def test_src_dir_changes(self):
+        """
+        Here we test that registry follows SRC_DIR constant.
+        """
+        self.assertIn("database", self.registry)
+        self.monkeypatch.setattr("core.const.SRC_DIR", "/home/accounts/test")
+        self.assertEqual([], list(self.registry))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+
+from PyQt5.QtGui import QStandardItem, QStandardItemModel
+
+from core.akidump import Account
+from core.search import *
+
+from tests.base import UnitTest
+
+
+def account(name, username="", email="", comment=""):
+    return Account(name, username, email, b"", "", comment, True, {})
+
+
+class SearchIndexTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.db = {
+            "gmail": account("gmail", "Tom", "tom@gmail.com", "My main e-mail"),
+            "habr": account("habr", "Lea", "spheromancer@habr.com"),
+            "mega": account("mega", "Bob", "bobgreen@gmail.com", "Cloud storage"),
+        }
+        self.index = SearchIndex(self.db)
+
+    def test_empty_query(self):
+        """
+        Here we test that empty query matches everything and doesn't build the index.
+        """
+        self.assertIsNone(self.index.search(" "))
+        self.assertFalse(self.index.built)
+
+    def test_ranks(self):
+        """
+        Here we test that matches in account name are ranked higher than matches in other
+        fields.
+        """
+        ranks = self.index.search("GMAIL")
+        self.assertEqual({"gmail": EXACT, "mega": FIELD_MATCH}, ranks)
+        self.assertEqual({"habr": FIELD_PREFIX}, self.index.search("sphero"))
+        self.assertEqual({"mega": FIELD_MATCH}, self.index.search("storage"))
+
+    def test_short_query(self):
+        """
+        Here we test that short queries match beginnings of words.
+        """
+        self.assertEqual({"habr"}, set(self.index.search("ha")))
+        self.assertEqual({"mega"}, set(self.index.search("cl")))
+        self.assertEqual({}, self.index.search("ou"))
+
+    def test_fuzzy(self):
+        """
+        Here we test that query with typo still finds the account.
+        """
+        self.assertEqual({}, self.index.search("xyzw"))
+        self.assertIn("mega", self.index.search("storgae"))
+
+    def test_update(self):
+        """
+        Here we test that index follows created, changed and deleted accounts.
+        """
+        self.index.search("gmail")
+        version = self.index.version
+
+        self.db["google"] = account("google", "Tony Stark", "google@gmail.com")
+        del self.db["mega"]
+        self.db["gmail"] = account("gmail", "Tom", "tom@ukr.net")
+        self.index.update(self.db, ["google", "mega", "gmail"])
+
+        self.assertNotEqual(version, self.index.version)
+        self.assertEqual({"gmail", "google"}, set(self.index.search("gmail")))
+        self.assertEqual({"google"}, set(self.index.search("stark")))
+        self.assertNotIn("cloud", str(self.index.texts))
+        self.assertNotIn("mega", set().union(*self.index.trigrams.values()))
+        self.assertEqual(
+            [("gmail", "gmail"), ("google", "google"), ("habr", "habr")],
+            self.index.sorted,
+        )
+
+    def test_limit(self):
+        """
+        Here we test that with limit index returns only best matches when there are enough
+        accounts which names start with query.
+        """
+        self.db["gmail2"] = account("gmail2")
+        self.index.update(self.db, ["gmail2"])
+        self.assertEqual({"gmail": EXACT}, self.index.search("gmail", 1))
+        self.assertEqual(
+            {"gmail": PREFIX_MATCH, "gmail2": PREFIX_MATCH}, self.index.search("gm", 2)
+        )
+        # there aren't enough such accounts, so we search as usual
+        self.assertEqual(
+            {"gmail": EXACT, "gmail2": PREFIX_MATCH, "mega": FIELD_MATCH},
+            self.index.search("gmail", 3),
+        )
+
+
+class SearchProxyTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.db = {
+            "gmail": account("gmail", "Tom", "tom@gmail.com"),
+            "mail": account("mail", "Tom", "tom@ukr.net"),
+            "mega": account("mega", "Bob", "bobgreen@gmail.com"),
+        }
+        self.model = QStandardItemModel()
+        for name in sorted(self.db):
+            self.model.appendRow(QStandardItem(name))
+        self.index = SearchIndex(self.db)
+        self.proxy = SearchProxy(self.index)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.sort(0)
+
+    def rows(self):
+        """
+        This method returns names of accounts that proxy shows.
+        """
+        return [self.proxy.index(i, 0).data() for i in range(self.proxy.rowCount())]
+
+    def test_filter(self):
+        """
+        Here we test that proxy shows only matching accounts ordered by rank.
+        """
+        self.assertEqual(["gmail", "mail", "mega"], self.rows())
+        self.proxy.setQuery("mail")
+        self.assertEqual(["mail", "gmail", "mega"], self.rows())
+        self.proxy.setQuery("")
+        self.assertEqual(["gmail", "mail", "mega"], self.rows())
+
+    def test_new_account(self):
+        """
+        Here we test that account created while query is typed appears in the list if it
+        matches the query.
+        """
+        self.proxy.setQuery("mail")
+        self.db["mailbox"] = account("mailbox")
+        self.index.update(self.db, ["mailbox"])
+        self.model.appendRow(QStandardItem("mailbox"))
+        self.assertEqual(["mail", "mailbox", "gmail", "mega"], self.rows())
+
+
+class GlobalSearchTest(UnitTest):
+    def setUp(self):
+        super().setUp()
+        self.work = {
+            "gmail": account("gmail", "Tom", "tom@work.com"),
+            "jira": account("jira", "Tom", "tom@work.com"),
+        }
+        self.home = {
+            "gmail": account("gmail", "Tom", "tom@gmail.com"),
+            "mega": account("mega", "Tom", "tom@gmail.com"),
+        }
+        # first is the main window
+        self.windows = [
+            SimpleNamespace(name=""),
+            SimpleNamespace(name="work", search=SearchIndex(self.work)),
+            SimpleNamespace(name="home", search=SearchIndex(self.home)),
+        ]
+        self.search = GlobalSearch(self.windows)
+
+    def test_search(self):
+        """
+        Here we test that results from all opened databases are merged and ordered by rank.
+        """
+        self.assertEqual([], self.search.search(""))
+        self.assertEqual(
+            [
+                (EXACT, "gmail", "home"),
+                (EXACT, "gmail", "work"),
+                (FIELD_MATCH, "mega", "home"),
+            ],
+            self.search.search("gmail"),
+        )
+        self.assertEqual([(EXACT, "gmail", "home")], self.search.search("gmail", 1))
+
+    def test_changes(self):
+        """
+        Here we test that global search follows changes of databases and closed databases.
+        """
+        self.search.search("gmail")
+        self.home["gmail2"] = account("gmail2")
+        self.windows[2].search.update(self.home, ["gmail2"])
+        self.assertIn((PREFIX_MATCH, "gmail2", "home"), self.search.search("gmail"))
+
+        # database window is closed
+        del self.windows[2]
+        self.assertEqual([(EXACT, "gmail", "work")], self.search.search("gmail"))
+        self.assertNotIn("home", self.search.indexes)
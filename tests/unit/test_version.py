@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+#  Copyright (c) 2020-2021. Bohdan Kolvakh
+#  This file is part of PyQtAccounts.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  PyQtAccounts is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  PyQtAccounts is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+# PyQtAccounts is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# PyQtAccounts is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with PyQtAccounts.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This test module contains all unit tests for functions that resolve version of PyQtAccounts.
+"""
+
+import json
+import shutil
+import tempfile
+import git
+
+from tests.base import UnitTest
+import core.const
+import core.utils
+from core.utils import *
+
+
+class VersionTest(UnitTest):
+    """
+    This class contains all unit tests for version lookup of PyQtAccounts.
+    """
+
+    def setUp(self):
+        """
+        In this method we patch version and create temporary folder for version file.
+        """
+        super().setUp()
+        self.patchVersion()
+        self.folder = tempfile.mkdtemp()
+        self.file = os.path.join(self.folder, ".version")
+        self.monkeypatch.setattr(core.const, "VERSION_FILE", self.file)
+
+    def tearDown(self):
+        """
+        Here we remove temporary folder.
+        """
+        super().tearDown()
+        shutil.rmtree(self.folder)
+
+    def breakGit(self):
+        """
+        This method makes any use of git fail, so we can check that version was taken without it.
+        """
+
+        def Repo(*args):
+            raise AssertionError("git shouldn't be used!")
+
+        self.monkeypatch.setattr(git, "Repo", Repo)
+
+    def test_version_file(self):
+        """
+        Version that we get from git should be saved to version file and next time taken from it.
+        """
+        self.assertEqual(getVersion(), "v2.0.6")
+        info = json.load(open(self.file))
+        self.assertEqual(info, {"version": "v2.0.6", "commit": headCommit()})
+
+        # next time program starts it doesn't need git
+        self.monkeypatch.setattr(core.utils, "_version", None)
+        self.breakGit()
+        self.assertEqual(cachedVersion(), "v2.0.6")
+        self.assertEqual(getVersion(), "v2.0.6")
+
+    def test_version_cached(self):
+        """
+        Version should be resolved only once per process.
+        """
+        getVersion()
+        os.remove(self.file)
+        self.breakGit()
+        self.assertEqual(getVersion(), "v2.0.6")
+
+    def test_version_file_out_of_date(self):
+        """
+        Version file that was written for another commit (i.e. before update) should be ignored.
+        """
+        with open(self.file, "w") as file:
+            json.dump({"version": "v1.0.0", "commit": "0" * 40}, file)
+
+        self.assertIsNone(cachedVersion())
+        self.assertEqual(getVersion(), "v2.0.6")
+
+    def test_lookup_version(self):
+        """
+        lookupVersion should get version from git in separate thread when it isn't cached.
+        """
+        versions = []
+        lookupVersion(versions.append)
+        self.qbot.waitUntil(lambda: bool(versions))
+        self.assertEqual(versions, ["v2.0.6"])
+
+        # now version is cached and callback is called immediately
+        lookupVersion(versions.append)
+        self.assertEqual(versions, ["v2.0.6", "v2.0.6"])